@@ -0,0 +1,67 @@
+"""p50/p99 latency of Predictor.predict_batch for 1, 100 and 10k-record batches.
+
+Run from the project root (trains a small throwaway model if --model is missing):
+    python benchmarks/bench_predict.py --model models/model.pkl
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from inst414_project.features import PLATFORM_GROUPS
+from inst414_project.modeling.predict import Predictor
+from inst414_project.modeling.train import save_model, train
+
+
+def make_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(1, 9, n).round(1)
+    return pd.DataFrame({
+        "hours_social_media": hours,
+        "sleep_hours": rng.uniform(4, 9, n).round(1),
+        "addiction_score": rng.integers(1, 10, n),
+        "heavy_user": (hours > 6).astype("int64"),
+        "sleep_ok": rng.integers(0, 2, n),
+        "platform_group": rng.choice(PLATFORM_GROUPS, n),
+        "acad_impact": (hours + rng.normal(0, 1, n) > 5).astype("float64"),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", type=Path, default=Path("models/model.pkl"))
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    ap.add_argument("--calls", type=int, default=500)
+    args = ap.parse_args()
+
+    model_path = args.model
+    if not model_path.exists():
+        logger.remove()
+        model_path = Path(tempfile.mkdtemp()) / "model.pkl"
+        bundle, _ = train(make_records(5_000), ["gbm"], n_folds=2, max_workers=1)
+        save_model(bundle, model_path)
+    predictor = Predictor(model_path)
+    print(f"model: {predictor.bundle['name']} {predictor.bundle['params']}")
+
+    print(f"{'batch':>7} {'input':<7} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'rows/s':>12}")
+    for n in args.sizes:
+        frame = make_records(n, seed=1).drop(columns="acad_impact")
+        cases = [("dicts", frame.to_dict("records")), ("frame", frame)]
+        calls = max(20, min(args.calls, 2_000_000 // n))
+        for name, batch in cases:
+            predictor.predict_batch(batch)  # warm-up
+            times = np.empty(calls)
+            for i in range(calls):
+                t0 = time.perf_counter()
+                predictor.predict_batch(batch)
+                times[i] = time.perf_counter() - t0
+            p50, p99 = np.percentile(times, [50, 99]) * 1e3
+            print(f"{n:>7,} {name:<7} {calls:>6} {p50:>9.3f} {p99:>9.3f} {n / np.median(times):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
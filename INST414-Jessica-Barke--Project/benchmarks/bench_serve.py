@@ -0,0 +1,156 @@
+"""Sustained throughput and latency of the scoring server under concurrent load.
+
+Starts `inst414_project.modeling.serve` in a subprocess, then for each
+--concurrency level keeps that many keep-alive clients posting --records
+records per request for --duration seconds. With --reload-every the model
+file is rewritten during the run to show hot reloads under load.
+
+Run from the project root (trains a small throwaway model if --model is missing):
+    python benchmarks/bench_serve.py --model models/model.pkl --concurrency 1 16 64
+"""
+import argparse
+import asyncio
+from pathlib import Path
+import pickle
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_predict import make_records
+from loguru import logger
+import numpy as np
+
+from inst414_project.modeling.serve import ScoreClient
+from inst414_project.modeling.train import save_model, train
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with ScoreClient(port=port) as client:
+                return await client.request("GET", "/healthz")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def load(port, concurrency, duration, payloads):
+    """Latencies (s) of every request and the number of failures."""
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], 0
+
+    async def client_loop(i):
+        nonlocal errors
+        async with ScoreClient(port=port) as client:
+            k = i
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    await client.score(payloads[k % len(payloads)])
+                except RuntimeError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+                k += concurrency
+
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    return np.array(latencies), errors
+
+
+async def reloader(model_path, bundles, every):
+    i = 0
+    while True:
+        await asyncio.sleep(every)
+        i += 1
+        save_model(bundles[i % len(bundles)], model_path)
+
+
+async def level(port, concurrency, args, payloads, model_path, bundles):
+    """One concurrency level, with the model rewritten meanwhile if asked."""
+    bg = None
+    if args.reload_every:
+        bg = asyncio.create_task(reloader(model_path, bundles, args.reload_every))
+    try:
+        return await load(port, concurrency, args.duration, payloads)
+    finally:
+        if bg:
+            bg.cancel()
+
+
+def server_metrics(port):
+    async def get():
+        async with ScoreClient(port=port) as client:
+            return (await client.request("GET", "/metrics"))[1].decode()
+
+    text = asyncio.run(get())
+    return {m[0]: float(m[1]) for m in re.findall(r"^(inst414_\w+) ([\d.e+-]+)$", text, re.M)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", type=Path, default=Path("models/model.pkl"))
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    ap.add_argument("--duration", type=float, default=10.0, help="Seconds per level.")
+    ap.add_argument("--records", type=int, default=1, help="Records per request.")
+    ap.add_argument("--max-batch", type=int, default=512)
+    ap.add_argument("--max-wait-ms", type=float, default=2.0)
+    ap.add_argument("--reload-every", type=float, default=0.0, help="Rewrite the model (s).")
+    args = ap.parse_args()
+
+    logger.remove()
+    # the server watches a copy, so --reload-every never touches the real model
+    model_path = Path(tempfile.mkdtemp()) / "model.pkl"
+    if args.model.exists():
+        bundles = [pickle.loads(args.model.read_bytes())]
+    else:
+        bundles = [train(make_records(5_000, seed=s), ["gbm"], n_folds=2, max_workers=1)[0]
+                   for s in (0, 1)]
+    save_model(bundles[0], model_path)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "inst414_project.modeling.serve", "--model-path", str(model_path),
+         "--port", str(port), "--max-batch", str(args.max_batch),
+         "--max-wait-ms", str(args.max_wait_ms), "--reload-interval", "0.5"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_ready(port))
+        frame = make_records(2_000, seed=1).drop(columns="acad_impact")
+        rows = frame.to_dict("records")
+        payloads = [rows[i:i + args.records] for i in range(0, len(rows), args.records)]
+
+        print(f"{'clients':>7} {'requests':>9} {'req/s':>9} {'rows/s':>10} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'batch':>7} {'errors':>6} {'reloads':>7}")
+        for concurrency in args.concurrency:
+            before = server_metrics(port)
+            t0 = time.perf_counter()
+            lat, errors = asyncio.run(level(port, concurrency, args, payloads, model_path, bundles))
+            wall = time.perf_counter() - t0
+            after = server_metrics(port)
+            batches = after["inst414_batch_rows_count"] - before["inst414_batch_rows_count"]
+            scored = after["inst414_rows_scored_total"] - before["inst414_rows_scored_total"]
+            reloads = after["inst414_model_reloads_total"] - before["inst414_model_reloads_total"]
+            p50, p99 = np.percentile(lat, [50, 99]) * 1e3
+            print(f"{concurrency:>7} {len(lat):>9,} {len(lat) / wall:>9,.0f} "
+                  f"{len(lat) * args.records / wall:>10,.0f} {p50:>8.2f} {p99:>8.2f} "
+                  f"{scored / max(batches, 1):>7.1f} {errors:>6} {reloads:>7.0f}")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cold-start budget for the inst414 CLI, measured with ``python -X importtime``.
+
+Each case runs in a fresh interpreter; the best of --repeat runs is compared
+with benchmarks/startup_budget.json. Exits 1 if a case is over budget
+(baseline * (1 + --tolerance)) or imports a heavy module it should not.
+
+Run from the project root:
+    python benchmarks/bench_startup.py             # check
+    python benchmarks/bench_startup.py --update    # record a new baseline
+"""
+import argparse
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+BUDGET_FILE = Path(__file__).with_name("startup_budget.json")
+HEAVY = ["pandas", "numpy", "pyarrow", "matplotlib", "seaborn", "sklearn", "scipy"]
+
+# name -> (interpreter args, heavy modules the case may import)
+CASES = {
+    "import package": (["-c", "import inst414_project"], []),
+    "import cli": (["-c", "import inst414_project.cli"], []),
+    "inst414 --help": (["-m", "inst414_project", "--help"], []),
+    "inst414 cache --help": (["-m", "inst414_project", "cache", "--help"], []),
+    "inst414 plots --help": (
+        ["-m", "inst414_project", "plots", "--help"],
+        ["pandas", "numpy", "pyarrow", "matplotlib"],
+    ),
+}
+
+
+def importtime(args):
+    """Total import time (ms) and the set of top-level packages imported."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True, text=True, check=True,
+    )
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip().split(".")[0])
+        if not name.startswith("  "):  # top level: one leading space
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--update", action="store_true", help="Write the measured times as baseline.")
+    args = ap.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    measured, failures = {}, []
+    print(f"{'case':<24} {'best ms':>9} {'budget ms':>10}  heavy modules")
+    for name, (cmd, allowed) in CASES.items():
+        runs = [importtime(cmd) for _ in range(args.repeat)]
+        best = min(t for t, _ in runs)
+        heavy = sorted(m for m in HEAVY if m in runs[0][1])
+        measured[name] = round(best, 1)
+        limit = budget.get(name, float("inf")) * (1 + args.tolerance)
+        print(f"{name:<24} {best:>9.1f} {limit:>10.1f}  {', '.join(heavy) or '-'}")
+        if unexpected := [m for m in heavy if m not in allowed]:
+            failures.append(f"{name}: imports {', '.join(unexpected)}")
+        if not args.update and best > limit:
+            failures.append(f"{name}: {best:.1f} ms > {limit:.1f} ms")
+
+    if args.update:
+        BUDGET_FILE.write_text(json.dumps(measured, indent=2) + "\n")
+        print(f"Baseline written to {BUDGET_FILE}")
+    if failures:
+        sys.exit("Startup regression:\n  " + "\n  ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Speedup of the vectorized to_num/map_platform over the original row-wise versions.
+
+Run from the project root:
+    python benchmarks/bench_transforms.py --rows 1000000 --rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.features import map_platform, to_num
+
+PLATFORMS = ["Instagram", "TikTok", "Facebook", "WhatsApp", "Twitter", "LinkedIn",
+             "WeChat", "Snapchat", "LINE", "KakaoTalk", "VKontakte", "YouTube"]
+
+
+# --- original implementations from notebooks/02_cleaning_pipeline.py ---
+def to_num_rowwise(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors="coerce")
+    extr = series.astype(str).str.extract(r"(-?\d+\.?\d*)", expand=False)
+    return pd.to_numeric(extr, errors="coerce")
+
+
+def map_platform_rowwise(x):
+    if pd.isna(x): return "Other"
+    s = str(x).lower()
+    if any(k in s for k in ["tiktok","short","reels","youtube"]): return "Short-video"
+    if any(k in s for k in ["instagram","insta","snap","pinterest"]): return "Image-centric"
+    if any(k in s for k in ["linkedin","reddit","quora","discord"]): return "Professional/Forum"
+    return "Other"
+
+
+def make_columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.normal(5, 1.3, n).round(1).astype(str).astype(object)
+    dirty = rng.random(n)
+    hours[dirty < 0.02] = "5.2 hrs"
+    hours[(dirty >= 0.02) & (dirty < 0.03)] = "about 3"
+    hours[(dirty >= 0.03) & (dirty < 0.04)] = None
+    platform = rng.choice(PLATFORMS, n).astype(object)
+    platform[rng.random(n) < 0.01] = None
+    return pd.Series(hours, dtype="str"), pd.Series(platform, dtype="str")
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, action="append")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'rows':>11} {'transform':<13} {'row-wise s':>11} {'vectorized s':>13} {'speedup':>8}")
+    for n in args.rows or [1_000_000, 10_000_000]:
+        hours, platform = make_columns(n)
+        cases = [
+            ("to_num", lambda: to_num_rowwise(hours), lambda: to_num(hours)),
+            ("map_platform", lambda: platform.map(map_platform_rowwise),
+             lambda: map_platform(platform)),
+        ]
+        for name, old, new in cases:
+            t_old, r_old = best_of(old, args.repeat)
+            t_new, r_new = best_of(new, args.repeat)
+            pd.testing.assert_series_equal(r_old, r_new, check_dtype=False,
+                                           check_categorical=False)
+            print(f"{n:>11,} {name:<13} {t_old:>11.3f} {t_new:>13.3f} {t_old/t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
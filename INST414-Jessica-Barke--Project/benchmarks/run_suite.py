@@ -0,0 +1,205 @@
+"""Time and memory-profile every pipeline stage on synthetic raw data.
+
+Each (size, stage) runs in a fresh interpreter so peak RSS belongs to that
+stage alone. Results are appended to benchmarks/history.jsonl (one JSON
+object per line, tagged with the git commit) and compared with the last
+run of the same size/stage on this host.
+
+Run from the project root:
+    python benchmarks/run_suite.py                      # 10k and 1M rows
+    python benchmarks/run_suite.py --size 10m --stage clean --stage eda_stats
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = Path(__file__).with_name(".data")  # generated inputs, reused across runs
+HISTORY = Path(__file__).with_name("history.jsonl")
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+STAGES = ["clean", "features", "eda_stats", "figures", "train", "predict"]
+
+
+# ---- stages (run inside the child process; return rows processed) ----
+def stage_clean(work, opts):
+    from inst414_project.dataset import stream_clean
+
+    stats, _ = stream_clean(work / "raw.csv", [work / "clean.parquet"], opts.chunksize)
+    return stats.rows
+
+
+def feature_set(work):
+    """The feature version the later stages share (materialized by ``features``)."""
+    from inst414_project.features import load_features
+
+    return load_features(source=work / "clean.parquet", root=work / "features")
+
+
+def stage_features(work, opts):
+    from inst414_project.features import materialize
+
+    return materialize(source=work / "clean.parquet", root=work / "features").rows
+
+
+def stage_eda_stats(work, opts):
+    from inst414_project.stats import moments_from_table, write_eda_tables
+
+    acc = moments_from_table(feature_set(work).table(), batch_size=opts.chunksize)
+    (work / "reports").mkdir(exist_ok=True)
+    write_eda_tables(acc, work / "reports")
+    return acc.rows
+
+
+def stage_figures(work, opts):
+    from inst414_project.plots import EDA_FIGURES, aggregate_batches, render_figures
+
+    # cold: build the aggregates from the rows, then render every figure from them
+    fs = feature_set(work)
+    agg = aggregate_batches(fs.table().to_batches(opts.chunksize))
+    errors = render_figures(EDA_FIGURES, agg, work / "figures")
+    if errors:
+        raise RuntimeError(f"figures failed: {', '.join(errors)}")
+    return fs.rows
+
+
+def stage_train(work, opts):
+    from inst414_project.modeling.train import save_model, train
+
+    fs = feature_set(work)
+    bundle, _ = train(
+        fs, n_folds=3, time_budget=opts.train_budget or None, sample=opts.train_rows
+    )
+    save_model(bundle, work / "model.pkl")
+    return min(fs.rows, opts.train_rows)
+
+
+def stage_predict(work, opts):
+    from inst414_project.modeling.predict import Predictor
+
+    predictor = Predictor(work / "model.pkl")
+    return predictor.score_features(feature_set(work), work / "predictions.parquet", opts.chunksize)
+
+
+def peak_rss_mb():
+    """This process's high-water RSS; VmHWM resets on exec, unlike ru_maxrss."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KiB
+
+
+def child(stage, work, opts):
+    """Run one stage and print its measurements as a JSON line."""
+    from loguru import logger
+
+    logger.remove()
+    t0, c0 = time.perf_counter(), time.process_time()
+    rows = globals()[f"stage_{stage}"](Path(work), opts)
+    wall = time.perf_counter() - t0
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    print(json.dumps({
+        "rows_out": rows,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(time.process_time() - c0 + kids.ru_utime + kids.ru_stime, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "children_peak_rss_mb": round(kids.ru_maxrss / 1024, 1),
+    }))
+
+
+# ---- driver ----
+def raw_input(rows, seed):
+    path = DATA / f"raw_{rows}_{seed}.csv"
+    if not path.exists():
+        print(f"generating {path.name} ...", flush=True)
+        tmp = path.with_suffix(".tmp")
+        subprocess.run([sys.executable, "-m", "inst414_project.synthetic", "--rows", str(rows),
+                        "--seed", str(seed), "--output-path", str(tmp)], cwd=ROOT, check=True)
+        tmp.replace(path)
+    return path
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout
+
+    return git("rev-parse", "--short", "HEAD").strip(), bool(git("status", "--porcelain", "--", "."))
+
+
+def last_runs():
+    last = {}
+    if HISTORY.exists():
+        for line in HISTORY.read_text().splitlines():
+            rec = json.loads(line)
+            if rec.get("status") == "ok":
+                last[(rec["host"], rec["rows"], rec["stage"])] = rec
+    return last
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", choices=SIZES, action="append")
+    ap.add_argument("--stage", choices=STAGES, action="append")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunksize", type=int, default=1_000_000)
+    ap.add_argument("--train-rows", type=int, default=200_000, help="Sample size for training.")
+    ap.add_argument("--train-budget", type=float, default=600, help="Search time budget (s).")
+    ap.add_argument("--fail-over", type=float, default=0, help="Exit 1 if a stage is this "
+                    "fraction slower than its last run (e.g. 0.2); 0 = report only.")
+    ap.add_argument("--child", nargs=2, metavar=("STAGE", "WORKDIR"), help=argparse.SUPPRESS)
+    opts = ap.parse_args()
+    if opts.child:
+        return child(*opts.child, opts)
+
+    commit, dirty = git_commit()
+    previous = last_runs()
+    regressions = []
+    print(f"{'rows':>11} {'stage':<10} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'rows/s':>12} {'vs last':>8}")
+    for size in opts.size or ["10k", "1m"]:
+        rows = SIZES[size]
+        work = DATA / f"run_{rows}"
+        work.mkdir(parents=True, exist_ok=True)
+        link = work / "raw.csv"
+        link.unlink(missing_ok=True)
+        link.symlink_to(raw_input(rows, opts.seed))
+        for stage in opts.stage or STAGES:
+            cmd = [sys.executable, __file__, "--child", stage, str(work),
+                   "--chunksize", str(opts.chunksize), "--train-rows", str(opts.train_rows),
+                   "--train-budget", str(opts.train_budget)]
+            proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            rec = {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": commit, "dirty": dirty, "host": platform.node(),
+                "cpus": os.cpu_count(), "python": platform.python_version(),
+                "rows": rows, "stage": stage,
+            }
+            if proc.returncode:
+                rec |= {"status": "failed", "error": proc.stderr.strip().splitlines()[-1:]}
+                print(f"{rows:>11,} {stage:<10} FAILED: {rec['error']}")
+            else:
+                rec |= {"status": "ok", **json.loads(proc.stdout.strip().splitlines()[-1])}
+                rec["rows_per_s"] = round(rec["rows_out"] / rec["wall_s"]) if rec["wall_s"] else None
+                prev = previous.get((rec["host"], rows, stage))
+                delta = rec["wall_s"] / prev["wall_s"] - 1 if prev and prev["wall_s"] else None
+                if delta is not None and opts.fail_over and delta > opts.fail_over:
+                    regressions.append(f"{rows:,} {stage}: {delta:+.0%} vs {prev['commit']}")
+                print(f"{rows:>11,} {stage:<10} {rec['wall_s']:>8.2f} {rec['cpu_s']:>8.2f} "
+                      f"{max(rec['peak_rss_mb'], rec['children_peak_rss_mb']):>8.0f} {rec['rows_per_s'] or 0:>12,} "
+                      f"{'' if delta is None else f'{delta:+.0%}':>8}")
+            with open(HISTORY, "a") as f:
+                f.write(json.dumps(rec) + "\n")
+    if regressions:
+        sys.exit("Regressions:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
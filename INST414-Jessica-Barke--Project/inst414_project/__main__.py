@@ -0,0 +1,3 @@
+from inst414_project.cli import app
+
+app(prog_name="inst414")
@@ -0,0 +1,475 @@
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import time
+from typing import Annotated
+
+from loguru import logger
+import typer
+
+from inst414_project.config import (
+    CLEAN_DATA_DIR,
+    FIGURES_DIR,
+    MODELS_DIR,
+    PROCESSED_DATA_DIR,
+    PROJ_ROOT,
+    RAW_DATA_DIR,
+    REPORTS_DIR,
+    setup,
+)
+from inst414_project.perf import start_run, track
+
+app = typer.Typer()
+
+CACHE_DIR = PROJ_ROOT / ".cache" / "stages"
+# Default LRU cap on stored stage outputs; override with INST414_CACHE_MAX_BYTES
+MAX_CACHE_BYTES = 2 * 1024**3
+
+PKG = PROJ_ROOT / "inst414_project"
+NOTEBOOKS = PROJ_ROOT / "notebooks"
+CARDS = PROJ_ROOT / "cards"
+FEATURES = PROCESSED_DATA_DIR / "features" / "primary.json"  # current feature version
+CLEAN_PARTS = CLEAN_DATA_DIR / "primary_clean.parts"  # batches added by `dataset ingest`
+
+
+@dataclass
+class Stage:
+    """One pipeline step: a script plus the files it reads and writes.
+
+    ``inputs`` should list everything that can change the outputs (data,
+    the script itself and the package modules it imports); the stage is
+    skipped when their content and the previous outputs are unchanged.
+    ``deps`` names the stages that must finish first (see ``pipeline.py``).
+    """
+
+    name: str
+    script: Path
+    inputs: list[Path] = field(default_factory=list)
+    outputs: list[Path] = field(default_factory=list)
+    optional: bool = False  # failures are logged, not fatal (was `|| true`)
+    deps: list[str] = field(default_factory=list)
+
+
+_EDA_FIGURES = [
+    "fig1_hours_hist.png",
+    "fig2_acad_impact_hist.png",
+    "fig3_scatter_impact_vs_hours.png",
+    "fig4_impact_by_platform.png",
+    "fig5_corr.png",
+    "fig6_group_means_ci.png",
+    "fig_missingness.png",
+    "fig_cleaning_pipeline.png",
+    "fig3_addiction_hist.png",
+]
+
+# cards -> acquisition -> clean -> {features -> {eda, train -> predict}, inventory};
+# the secondary dataset hangs off acquisition. Listed in a valid run order.
+SPRINT2_STAGES = [
+    Stage(
+        "cards",
+        CARDS / "card2csv.py",
+        inputs=[
+            CARDS / "addiction_card" / "dataset-metadata.json",
+            CARDS / "productivity_card" / "dataset-metadata.json",
+        ],
+        outputs=[CARDS / "addiction_card.csv", CARDS / "productivity_card.csv"],
+    ),
+    Stage(
+        "acquisition",
+        NOTEBOOKS / "01_data_acquisition.py",
+        inputs=[
+            CARDS / "addiction_card.csv",
+            CARDS / "productivity_card.csv",
+            RAW_DATA_DIR / "social_media_addiction_vs_relationships.csv",
+            RAW_DATA_DIR / "social_media_vs_productivity.csv",
+        ],
+        outputs=[REPORTS_DIR / "cards_summary.csv"],
+        deps=["cards"],
+    ),
+    Stage(
+        "clean",
+        NOTEBOOKS / "02_cleaning_pipeline.py",
+        inputs=[
+            RAW_DATA_DIR / "social_media_addiction_vs_relationships.csv",
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "features.py",
+            PKG / "perf.py",
+            PKG / "schema.py",
+        ],
+        outputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_DATA_DIR / "primary_clean.csv",
+            REPORTS_DIR / "cleaning_log.md",
+        ],
+        deps=["acquisition"],
+    ),
+    Stage(
+        "features",
+        PKG / "features.py",
+        inputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_PARTS,
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "schema.py",
+        ],
+        outputs=[FEATURES],
+        deps=["clean"],
+    ),
+    Stage(
+        "eda",
+        NOTEBOOKS / "03_eda.py",
+        inputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_PARTS,
+            FEATURES,
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "features.py",
+            PKG / "plots.py",
+            PKG / "stats.py",
+        ],
+        outputs=[
+            REPORTS_DIR / "summary_stats.csv",
+            REPORTS_DIR / "correlations.csv",
+            REPORTS_DIR / "group_means_impact_by_heavy_sleep.csv",
+            REPORTS_DIR / "group_means_impact_by_heavy_sleep_bootstrap.csv",
+            REPORTS_DIR / "group_tests_impact_by_heavy_sleep_permutation.csv",
+            *(FIGURES_DIR / f for f in _EDA_FIGURES),
+        ],
+        deps=["features"],
+    ),
+    Stage(
+        "inventory",
+        NOTEBOOKS / "make_variable_inventory_qssr.py",
+        inputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_PARTS,
+            RAW_DATA_DIR / "social_media_vs_productivity.csv",
+            PKG / "config.py",
+            PKG / "features.py",
+            PKG / "schema.py",
+        ],
+        outputs=[
+            REPORTS_DIR / "variable_inventory_qssr.csv",
+            REPORTS_DIR / "variable_inventory_qssr.md",
+        ],
+        deps=["clean"],
+    ),
+    Stage(
+        "train",
+        NOTEBOOKS / "04_models_qssr.py",
+        inputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_PARTS,
+            FEATURES,
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "features.py",
+            PKG / "modeling" / "train.py",
+        ],
+        outputs=[MODELS_DIR / "model.pkl", REPORTS_DIR / "model_cv_results.csv"],
+        deps=["features"],
+    ),
+    Stage(
+        "predict",
+        PKG / "modeling" / "predict.py",
+        inputs=[
+            CLEAN_DATA_DIR / "primary_clean.parquet",
+            CLEAN_PARTS,
+            FEATURES,
+            MODELS_DIR / "model.pkl",
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "features.py",
+        ],
+        outputs=[PROCESSED_DATA_DIR / "test_predictions.csv"],
+        deps=["train"],
+    ),
+    Stage(
+        "secondary_productivity",
+        NOTEBOOKS / "05_secondary_productivity.py",
+        inputs=[
+            RAW_DATA_DIR / "social_media_vs_productivity.csv",
+            PKG / "config.py",
+            PKG / "dataset.py",
+            PKG / "features.py",
+            PKG / "schema.py",
+            PKG / "stats.py",
+        ],
+        outputs=[
+            CLEAN_DATA_DIR / "secondary_clean.parquet",
+            CLEAN_DATA_DIR / "secondary_clean.csv",
+            REPORTS_DIR / "secondary_cleaning_log.md",
+            REPORTS_DIR / "secondary_summary_stats.csv",
+            REPORTS_DIR / "secondary_correlations.csv",
+            REPORTS_DIR / "group_means_productivity_by_heavy_sleep.csv",
+            REPORTS_DIR / "secondary_ols_prod_actual.csv",
+        ],
+        optional=True,  # the secondary raw file is not always downloaded
+        deps=["acquisition"],
+    ),
+]
+
+
+def _rel(path: Path) -> str:
+    path = Path(path).resolve()
+    return str(path.relative_to(PROJ_ROOT)) if path.is_relative_to(PROJ_ROOT) else str(path)
+
+
+def _stored(art_dir: Path, path: Path) -> Path:
+    return art_dir / _rel(path).lstrip("/")
+
+
+class StageCache:
+    """Content-hashed manifest of stage fingerprints plus an LRU artifact store."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int | None = None):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        self.artifacts_dir = self.root / "artifacts"
+        # read at construction so a value from .env (loaded by setup()) applies
+        self.max_bytes = max_bytes or int(
+            os.environ.get("INST414_CACHE_MAX_BYTES", str(MAX_CACHE_BYTES))
+        )
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+        else:
+            self.manifest = {"stamps": {}, "stages": {}, "artifacts": {}}
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+        tmp.replace(self.manifest_path)
+
+    # ---- hashing ----
+    def digest(self, path: Path) -> str | None:
+        """sha256 of a file, memoized on (size, mtime) so big raw files hash once.
+
+        A directory hashes the names and digests of the files in it.
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        if path.is_dir():
+            h = hashlib.sha256()
+            for p in sorted(q for q in path.rglob("*") if q.is_file()):
+                h.update(f"{p.relative_to(path)}={self.digest(p)}\n".encode())
+            return h.hexdigest()
+        st = path.stat()
+        key = _rel(path)
+        stamp = self.manifest["stamps"].get(key)
+        if stamp and stamp[0] == st.st_size and stamp[1] == st.st_mtime_ns:
+            return stamp[2]
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        self.manifest["stamps"][key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, stage: Stage) -> str:
+        h = hashlib.sha256()
+        h.update(stage.name.encode())
+        for path in [stage.script, *stage.inputs]:
+            h.update(f"{_rel(path)}={self.digest(path)}\n".encode())
+        for path in stage.outputs:
+            h.update(f"out:{_rel(path)}\n".encode())
+        return h.hexdigest()
+
+    # ---- lookups ----
+    def is_fresh(self, stage: Stage, fp: str) -> bool:
+        rec = self.manifest["stages"].get(stage.name)
+        if not rec or rec["fingerprint"] != fp:
+            return False
+        return all(self.digest(p) == rec["outputs"].get(_rel(p)) for p in stage.outputs)
+
+    def restore(self, stage: Stage, fp: str) -> bool:
+        """Copy a previously stored set of outputs back into place."""
+        entry = self.manifest["artifacts"].get(fp)
+        src_dir = self.artifacts_dir / fp
+        if not entry or not stage.outputs or not src_dir.exists():
+            return False
+        for p in stage.outputs:
+            if not _stored(src_dir, p).exists():
+                return False
+        for p in stage.outputs:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(_stored(src_dir, p), p)
+        entry["last_used"] = time.time()
+        return True
+
+    # ---- updates ----
+    def record(self, stage: Stage, fp: str, wall_s: float | None = None):
+        prev = self.manifest["stages"].get(stage.name, {})
+        self.manifest["stages"][stage.name] = {
+            "fingerprint": fp,
+            "outputs": {_rel(p): self.digest(p) for p in stage.outputs},
+            "ran_at": time.time(),
+            # last run time, kept across restores; the scheduler's cost estimate
+            "wall_s": wall_s if wall_s is not None else prev.get("wall_s"),
+        }
+
+    def last_wall(self, name: str, default: float = 1.0) -> float:
+        return self.manifest["stages"].get(name, {}).get("wall_s") or default
+
+    def store(self, stage: Stage, fp: str):
+        if not stage.outputs:
+            return
+        dst_dir = self.artifacts_dir / fp
+        size = 0
+        for p in stage.outputs:
+            dst = _stored(dst_dir, p)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(p, dst)
+            size += dst.stat().st_size
+        self.manifest["artifacts"][fp] = {
+            "stage": stage.name,
+            "bytes": size,
+            "last_used": time.time(),
+        }
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used artifact sets until under ``max_bytes``."""
+        arts = self.manifest["artifacts"]
+        total = sum(a["bytes"] for a in arts.values())
+        for fp in sorted(arts, key=lambda k: arts[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= arts.pop(fp)["bytes"]
+            shutil.rmtree(self.artifacts_dir / fp, ignore_errors=True)
+            logger.info(f"Evicted cached artifacts {fp[:12]}")
+
+    def invalidate(self, names: list[str] | None = None):
+        stages = self.manifest["stages"]
+        for name in list(stages) if names is None else names:
+            stages.pop(name, None)
+        for fp, art in list(self.manifest["artifacts"].items()):
+            if names is None or art["stage"] in names:
+                del self.manifest["artifacts"][fp]
+                shutil.rmtree(self.artifacts_dir / fp, ignore_errors=True)
+
+
+def command(stage: Stage) -> list[str]:
+    """Package modules run with ``-m`` (their imports need the package); others as scripts."""
+    script = Path(stage.script).resolve()
+    if script.is_relative_to(PKG):
+        module = ".".join(script.relative_to(PKG.parent).with_suffix("").parts)
+        return [sys.executable, "-m", module]
+    return [sys.executable, str(script)]
+
+
+def run_stage(stage: Stage):
+    with track(f"stage.{stage.name}"):
+        subprocess.run(command(stage), cwd=PROJ_ROOT, check=True)
+
+
+def reuse(stage: Stage, cache: StageCache, force: bool = False) -> tuple[str | None, str]:
+    """Whether ``stage`` can be skipped: ("missing" | "fresh" | "restored" | None, fingerprint)."""
+    if not stage.script.exists():
+        logger.warning(f"[{stage.name}] {_rel(stage.script)} not found; skipping")
+        return "missing", ""
+    fp = cache.fingerprint(stage)
+    if not force and cache.is_fresh(stage, fp):
+        logger.info(f"[{stage.name}] unchanged; skipped")
+        return "fresh", fp
+    if not force and cache.restore(stage, fp):
+        cache.record(stage, fp)
+        cache.save()
+        logger.info(f"[{stage.name}] restored outputs from cache")
+        return "restored", fp
+    return None, fp
+
+
+def commit(stage: Stage, cache: StageCache, fp: str, wall_s: float | None = None):
+    """Check a finished stage wrote its outputs, then record and store them."""
+    missing = [_rel(p) for p in stage.outputs if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"[{stage.name}] did not write {', '.join(missing)}")
+    cache.record(stage, fp, wall_s)
+    cache.store(stage, fp)
+    cache.save()
+
+
+def run_stages(stages: list[Stage], cache: StageCache, force: bool = False):
+    """Run ``stages`` one after another in list order (see ``pipeline.py`` for the DAG)."""
+    for stage in stages:
+        state, fp = reuse(stage, cache, force)
+        if state:
+            continue
+        logger.info(f"[{stage.name}] running {_rel(stage.script)}")
+        t0 = time.perf_counter()
+        try:
+            run_stage(stage)
+        except subprocess.CalledProcessError as e:
+            if not stage.optional:
+                cache.save()
+                raise
+            logger.warning(f"[{stage.name}] failed with exit code {e.returncode}; continuing")
+            continue
+        commit(stage, cache, fp, time.perf_counter() - t0)
+
+
+def select(names: list[str] | None) -> list[Stage]:
+    if not names:
+        return SPRINT2_STAGES
+    known = {s.name: s for s in SPRINT2_STAGES}
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise typer.BadParameter(f"unknown stage(s): {', '.join(unknown)}; known: {list(known)}")
+    return [s for s in SPRINT2_STAGES if s.name in names]
+
+
+@app.command()
+def run(
+    stages: Annotated[
+        list[str] | None, typer.Argument(help="Stages to run (default: all).")
+    ] = None,
+    force: bool = typer.Option(False, "--force", help="Re-run even if nothing changed."),
+    max_bytes: int = typer.Option(
+        MAX_CACHE_BYTES, envvar="INST414_CACHE_MAX_BYTES", help="Size cap for cached artifacts."
+    ),
+):
+    start_run()
+    cache = StageCache(max_bytes=max_bytes)
+    try:
+        run_stages(select(stages), cache, force=force)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Stage failed with exit code {e.returncode}")
+        raise typer.Exit(e.returncode)
+    logger.success("Pipeline up to date.")
+
+
+@app.command()
+def invalidate(
+    stages: Annotated[
+        list[str] | None, typer.Argument(help="Stages to forget (default: all).")
+    ] = None,
+):
+    cache = StageCache()
+    cache.invalidate([s.name for s in select(stages)] if stages else None)
+    cache.save()
+    logger.success("Stage cache invalidated.")
+
+
+@app.command()
+def status():
+    cache = StageCache()
+    for stage in SPRINT2_STAGES:
+        if not stage.script.exists():
+            state = "missing script"
+        else:
+            state = "fresh" if cache.is_fresh(stage, cache.fingerprint(stage)) else "stale"
+        logger.info(f"{stage.name:<24} {state}")
+    cache.save()
+
+
+if __name__ == "__main__":
+    setup()
+    app()
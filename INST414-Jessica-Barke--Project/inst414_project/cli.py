@@ -0,0 +1,60 @@
+import importlib
+
+import typer
+from typer.core import TyperCommand, TyperGroup
+
+from inst414_project.config import setup
+
+# name -> (module with a Typer ``app``, help line). The module, and with it
+# pandas/matplotlib/sklearn, is imported only when its command actually runs.
+COMMANDS = {
+    "dataset": ("inst414_project.dataset", "Clean the primary raw CSV or ingest a new batch."),
+    "features": ("inst414_project.features", "Materialize the versioned feature store."),
+    "stats": (
+        "inst414_project.stats",
+        "Write the EDA summary, correlation and group-mean tables.",
+    ),
+    "plots": ("inst414_project.plots", "Render the EDA figures in parallel."),
+    "train": ("inst414_project.modeling.train", "Cross-validated model search -> model.pkl."),
+    "predict": ("inst414_project.modeling.predict", "Score a clean CSV/Parquet file in chunks."),
+    "serve": ("inst414_project.modeling.serve", "Local HTTP scoring server with hot reload."),
+    "cache": ("inst414_project.cache", "Run Sprint 2 stages through the content-hashed cache."),
+    "pipeline": ("inst414_project.pipeline", "Run the stage DAG in parallel; report timing."),
+}
+
+
+def load_command(name: str) -> typer.core.TyperCommand | TyperGroup:
+    module, help_text = COMMANDS[name]
+    cmd = typer.main.get_command(importlib.import_module(module).app)
+    cmd.name = name
+    cmd.short_help = help_text
+    return cmd
+
+
+class LazyGroup(TyperGroup):
+    """Lists ``COMMANDS`` from their help lines; imports one only to run it."""
+
+    def list_commands(self, ctx):
+        return [*super().list_commands(ctx), *COMMANDS]
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.commands or cmd_name not in COMMANDS:
+            return super().get_command(ctx, cmd_name)
+        return TyperCommand(cmd_name, help=COMMANDS[cmd_name][1])  # listing only
+
+    def resolve_command(self, ctx, args):
+        if args and args[0] in COMMANDS:
+            return args[0], load_command(args[0]), args[1:]
+        return super().resolve_command(ctx, args)
+
+
+app = typer.Typer(cls=LazyGroup, no_args_is_help=True, help="INST414 project pipeline.")
+
+
+@app.callback()
+def main():
+    setup()
+
+
+if __name__ == "__main__":
+    app()
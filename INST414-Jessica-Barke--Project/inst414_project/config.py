@@ -1,18 +1,12 @@
 from pathlib import Path
 
-from dotenv import load_dotenv
-from loguru import logger
-
-# Load environment variables from .env file if it exists
-load_dotenv()
-
 # Paths
 PROJ_ROOT = Path(__file__).resolve().parents[1]
-logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
 
 DATA_DIR = PROJ_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 INTERIM_DATA_DIR = DATA_DIR / "interim"
+CLEAN_DATA_DIR = DATA_DIR / "clean"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
 EXTERNAL_DATA_DIR = DATA_DIR / "external"
 
@@ -21,12 +15,37 @@ MODELS_DIR = PROJ_ROOT / "models"
 REPORTS_DIR = PROJ_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
 
-# If tqdm is installed, configure loguru with tqdm.write
-# https://github.com/Delgan/loguru/issues/135
-try:
-    from tqdm import tqdm
+_configured = False
+
+
+def setup():
+    """Load ``.env`` and configure logging, once per process.
+
+    Entry points call this instead of doing it at import time, so
+    importing the package (workers, tests, ``--help``) stays cheap.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    from dotenv import load_dotenv
+    from loguru import logger
+
+    # Load environment variables from .env file if it exists
+    load_dotenv()
+    logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
+
+    # If tqdm is installed, configure loguru with tqdm.write
+    # https://github.com/Delgan/loguru/issues/135
+    try:
+        from tqdm import tqdm
+
+        logger.remove(0)
+        logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
+    except ModuleNotFoundError:
+        pass
+
+    from inst414_project.perf import enable_summary
 
-    logger.remove(0)
-    logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
-except ModuleNotFoundError:
-    pass
+    enable_summary()
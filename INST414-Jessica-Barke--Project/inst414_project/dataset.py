@@ -1,29 +1,965 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+import hashlib
+import io
+from itertools import pairwise
+import json
+import math
+import os
 from pathlib import Path
+import pickle
+import shutil
+import tempfile
+from typing import Annotated
 
 from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 import typer
 
-from inst414_project.config import PROCESSED_DATA_DIR, RAW_DATA_DIR
+from inst414_project.config import CLEAN_DATA_DIR, INTERIM_DATA_DIR, RAW_DATA_DIR, setup
+from inst414_project.features import map_platform, to_num
+from inst414_project.perf import track
+from inst414_project.schema import COMPACT_DTYPES, compact, fits_int8
 
 app = typer.Typer()
 
+PRIMARY_RAW = RAW_DATA_DIR / "social_media_addiction_vs_relationships.csv"
+PRIMARY_CLEAN = CLEAN_DATA_DIR / "primary_clean.csv"
+PRIMARY_CLEAN_PARQUET = CLEAN_DATA_DIR / "primary_clean.parquet"
+SECONDARY_RAW = RAW_DATA_DIR / "social_media_vs_productivity.csv"
+SECONDARY_CLEAN_PARQUET = CLEAN_DATA_DIR / "secondary_clean.parquet"
+INGEST_STATE = INTERIM_DATA_DIR / "ingest_state.pkl"
+
+# Column map (raw primary dataset)
+HOURS_COL = "Avg_Daily_Usage_Hours"
+SLEEP_COL = "Sleep_Hours_Per_Night"
+PLAT_COL = "Most_Used_Platform"
+DV_COL = "Affects_Academic_Performance"  # "Yes"/"No"
+ADD_COL = "Addicted_Score"
+
+IMPUTE_COLS = ["hours_social_media", "sleep_hours", "acad_impact", "addiction_score"]
+CLEAN_COLUMNS = [
+    "hours_social_media",
+    "sleep_hours",
+    "platform_primary",
+    "addiction_score",
+    "acad_impact",
+    "heavy_user",
+    "sleep_ok",
+    "platform_group",
+]
+HEAVY_QUANTILE = 0.75
+SLEEP_OK_HOURS = 7
+YES_NO = {"yes": 1.0, "no": 0.0, "true": 1.0, "false": 0.0}
+
+
+@dataclass(frozen=True)
+class Flag:
+    """Derived 0/1 column ``source >= cutoff``; NA while ``source`` has no values."""
+
+    name: str
+    source: str
+    cutoff: float | None = None
+    quantile: float | None = None  # cutoff = this quantile of the imputed source
+
+
+@dataclass(frozen=True)
+class CleanSpec:
+    """Declarative cleaning recipe for one raw survey file.
+
+    Raw columns are renamed and coerced by kind (``numeric`` through
+    ``to_num``, ``yes_no`` to 1/0, ``text`` as is); ``bounds`` null
+    out-of-range values, ``impute`` columns get whole-file medians, and
+    ``flags`` plus the ``platform`` grouping are derived last. ``columns``
+    is the output order. Every step is a column operation, so the same
+    engine runs in memory, chunked or over byte ranges in parallel.
+    """
+
+    name: str
+    raw: Path
+    clean: Path
+    numeric: dict = field(default_factory=dict)  # clean name -> raw column
+    text: dict = field(default_factory=dict)
+    yes_no: dict = field(default_factory=dict)
+    bounds: dict = field(default_factory=dict)  # clean name -> (low, high), inclusive
+    impute: list = field(default_factory=list)
+    flags: list = field(default_factory=list)
+    platform: tuple | None = None  # (platform column, group column)
+    columns: list = field(default_factory=list)
+
+    @property
+    def sketched(self) -> list[str]:
+        """Columns whose value counts the first pass keeps (medians, cutoffs, dtypes)."""
+        return list(dict.fromkeys([*self.impute, *(f.source for f in self.flags), *self.yes_no]))
+
+    @property
+    def digest(self) -> str:
+        """sha256 of the recipe; file names count, their directories do not."""
+        recipe = asdict(self) | {"raw": self.raw.name, "clean": self.clean.name}
+        return hashlib.sha256(json.dumps(recipe, sort_keys=True).encode()).hexdigest()
+
+
+PRIMARY = CleanSpec(
+    name="primary",
+    raw=PRIMARY_RAW,
+    clean=PRIMARY_CLEAN_PARQUET,
+    numeric={
+        "hours_social_media": HOURS_COL,
+        "sleep_hours": SLEEP_COL,
+        "addiction_score": ADD_COL,
+    },
+    text={"platform_primary": PLAT_COL},
+    yes_no={"acad_impact": DV_COL},
+    bounds={"hours_social_media": (0, 24), "sleep_hours": (0, 24)},
+    impute=IMPUTE_COLS,
+    flags=[
+        Flag("heavy_user", "hours_social_media", quantile=HEAVY_QUANTILE),
+        Flag("sleep_ok", "sleep_hours", cutoff=SLEEP_OK_HOURS),
+    ],
+    platform=("platform_primary", "platform_group"),
+    columns=CLEAN_COLUMNS,
+)
+# social_media_vs_productivity.csv (Kaggle card: 30k rows, NaNs in the
+# productivity, sleep and stress columns, outliers in usage and notifications)
+SECONDARY = CleanSpec(
+    name="secondary",
+    raw=SECONDARY_RAW,
+    clean=SECONDARY_CLEAN_PARQUET,
+    numeric={
+        "hours_social_media": "daily_social_media_time",
+        "notifications": "number_of_notifications",
+        "work_hours": "work_hours_per_day",
+        "prod_perceived": "perceived_productivity_score",
+        "prod_actual": "actual_productivity_score",
+        "stress_level": "stress_level",
+        "sleep_hours": "sleep_hours",
+        "screen_before_sleep": "screen_time_before_sleep",
+        "job_satisfaction": "job_satisfaction_score",
+    },
+    text={"platform_pref": "social_platform_preference", "job_type": "job_type"},
+    yes_no={"uses_focus_apps": "uses_focus_apps"},
+    bounds={
+        "hours_social_media": (0, 24),
+        "work_hours": (0, 24),
+        "sleep_hours": (0, 24),
+        "screen_before_sleep": (0, 24),
+        "notifications": (0, np.inf),
+        "prod_perceived": (0, 10),
+        "prod_actual": (0, 10),
+        "stress_level": (1, 10),
+        "job_satisfaction": (0, 10),
+    },
+    impute=[
+        "hours_social_media",
+        "sleep_hours",
+        "prod_perceived",
+        "prod_actual",
+        "stress_level",
+        "job_satisfaction",
+    ],
+    flags=[
+        Flag("heavy_user", "hours_social_media", quantile=HEAVY_QUANTILE),
+        Flag("sleep_ok", "sleep_hours", cutoff=SLEEP_OK_HOURS),
+    ],
+    platform=("platform_pref", "platform_group"),
+    columns=[
+        "hours_social_media",
+        "notifications",
+        "work_hours",
+        "sleep_hours",
+        "screen_before_sleep",
+        "stress_level",
+        "job_satisfaction",
+        "uses_focus_apps",
+        "platform_pref",
+        "job_type",
+        "prod_perceived",
+        "prod_actual",
+        "heavy_user",
+        "sleep_ok",
+        "platform_group",
+    ],
+)
+SPECS = {spec.name: spec for spec in (PRIMARY, SECONDARY)}
+
+
+def _yes_no(series: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(series)  # each distinct answer is normalized once
+    lut = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower().map(YES_NO)
+    return np.append(lut.to_numpy(dtype="float64"), np.nan)[codes]
+
+
+def coerce_raw(df0: pd.DataFrame, spec: CleanSpec = PRIMARY) -> pd.DataFrame:
+    """Rename, type coercion, Yes/No mapping and sanity bounds; no imputation yet."""
+    out = pd.DataFrame(index=df0.index)
+    for c, raw in spec.numeric.items():
+        out[c] = to_num(df0[raw])
+    for c, raw in spec.text.items():
+        out[c] = df0[raw]
+    for c, raw in spec.yes_no.items():
+        out[c] = _yes_no(df0[raw])
+
+    # Basic sanity bounds (keep rows; null invalids)
+    for c, (lo, hi) in spec.bounds.items():
+        out[c] = out[c].mask((out[c] < lo) | (out[c] > hi))
+    return out
+
+
+def finish_clean(
+    out: pd.DataFrame, medians: dict, cutoffs: dict, spec: CleanSpec = PRIMARY
+) -> pd.DataFrame:
+    """Impute with the given medians, then derive the flags and platform groups."""
+    for c in spec.impute:
+        if pd.notna(medians.get(c)):
+            out[c] = out[c].fillna(medians[c])
+
+    na = pd.Series(pd.NA, index=out.index, dtype="Int64")
+    for f in spec.flags:
+        cut = cutoffs[f.name]
+        out[f.name] = (out[f.source] >= cut).astype("Int64") if pd.notna(cut) else na
+    if spec.platform:
+        src, dst = spec.platform
+        out[dst] = map_platform(out[src])
+    return out[spec.columns]
+
+
+def clean_frame(df0: pd.DataFrame, spec: CleanSpec = PRIMARY) -> pd.DataFrame:
+    """In-memory cleaning (the original single-pass path), with pandas statistics."""
+    with track("clean.frame", rows_in=len(df0)) as t:
+        out = coerce_raw(df0, spec)
+        dtypes = CleanStats(spec).update(out).dtypes
+        medians = {c: out[c].median() if out[c].notna().any() else np.nan for c in spec.impute}
+        cutoffs = {}
+        for f in spec.flags:
+            src = out[f.source]
+            if pd.notna(medians.get(f.source, np.nan)):
+                src = src.fillna(medians[f.source])
+            if not src.notna().any():
+                cutoffs[f.name] = np.nan
+            else:
+                cutoffs[f.name] = f.cutoff if f.quantile is None else src.quantile(f.quantile)
+        out = finish_clean(out, medians, cutoffs, spec).astype(dtypes)
+        t.rows_out = len(out)
+    return out
+
+
+class CountSketch:
+    """Exact, mergeable value -> count sketch.
+
+    Memory grows with the number of distinct values (survey answers are
+    coarse, e.g. hours to one decimal), never with the number of rows.
+    Quantiles reproduce pandas/numpy ``linear`` interpolation exactly.
+    """
+
+    def __init__(self):
+        self.counts = pd.Series(dtype="int64")
+        self.n_null = 0
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, series: pd.Series) -> "CountSketch":
+        self.n_null += int(series.isna().sum())
+        vc = series.dropna().value_counts()
+        self.counts = vc if self.counts.empty else self.counts.add(vc, fill_value=0)
+        return self
+
+    def add_value(self, value, count: int) -> "CountSketch":
+        if count:
+            self.counts = self.counts.add(pd.Series({value: count}), fill_value=0)
+        return self
+
+    def merge(self, other: "CountSketch") -> "CountSketch":
+        self.counts = (
+            other.counts if self.counts.empty else self.counts.add(other.counts, fill_value=0)
+        )
+        self.n_null += other.n_null
+        return self
+
+    def value_counts(self) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct values (ascending) and their counts."""
+        counts = self.counts.sort_index()
+        return counts.index.to_numpy(dtype="float64"), counts.to_numpy().astype("int64")
+
+    def _kth(self, values, cum, k):
+        return values[np.searchsorted(cum, k, side="right")]
+
+    def quantile(self, q: float) -> float:
+        n = self.n
+        if n == 0:
+            return np.nan
+        counts = self.counts.sort_index()
+        values = counts.index.to_numpy(dtype="float64")
+        cum = counts.to_numpy().astype("int64").cumsum()
+        virtual = (n - 1) * q
+        lo = math.floor(virtual)
+        a = self._kth(values, cum, lo)
+        b = self._kth(values, cum, min(lo + 1, n - 1))
+        gamma = virtual - lo
+        diff = b - a
+        return b - diff * (1 - gamma) if gamma >= 0.5 else a + diff * gamma
+
+    def median(self) -> float:
+        n = self.n
+        if n == 0:
+            return np.nan
+        counts = self.counts.sort_index()
+        values = counts.index.to_numpy(dtype="float64")
+        cum = counts.to_numpy().astype("int64").cumsum()
+        a = self._kth(values, cum, (n - 1) // 2)
+        b = self._kth(values, cum, n // 2)
+        return np.mean([a, b])
+
+
+@dataclass
+class CleanStats:
+    """Mergeable first-pass statistics for the streaming cleaner."""
+
+    spec: CleanSpec = PRIMARY
+    rows: int = 0
+    sketches: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        for c in self.spec.sketched:
+            self.sketches.setdefault(c, CountSketch())
+
+    def update(self, out: pd.DataFrame) -> "CleanStats":
+        self.rows += len(out)
+        for c, sk in self.sketches.items():
+            sk.update(out[c])
+        return self
+
+    def merge(self, other: "CleanStats") -> "CleanStats":
+        self.rows += other.rows
+        for c, sk in self.sketches.items():
+            sk.merge(other.sketches[c])
+        return self
+
+    @property
+    def medians(self) -> dict:
+        return {c: self.sketches[c].median() for c in self.spec.impute}
+
+    @property
+    def cutoffs(self) -> dict:
+        """Flag name -> cutoff; NaN when the flag's source column has no values."""
+        medians = self.medians
+        out = {}
+        for f in self.spec.flags:
+            sk = self.sketches[f.source]
+            if sk.n == 0:
+                out[f.name] = np.nan
+            elif f.quantile is None:
+                out[f.name] = f.cutoff
+            else:
+                imputed = CountSketch().merge(sk)
+                if f.source in medians:
+                    imputed.add_value(medians[f.source], sk.n_null)
+                out[f.name] = imputed.quantile(f.quantile)
+        return out
+
+    @property
+    def q75(self) -> float:
+        """The heavy_user cutoff (75th percentile of imputed hours)."""
+        return self.cutoffs.get("heavy_user", np.nan)
+
+    @property
+    def dtypes(self) -> dict:
+        """Compact dtypes of the cleaned columns, decided once for the whole file.
+
+        Every chunk is cast the same way, so CSV text and Parquet types do
+        not depend on chunk boundaries. Text columns stay strings on disk
+        (Parquet dictionary-encodes them) and become categories on load.
+        """
+        spec, medians, cutoffs = self.spec, self.medians, self.cutoffs
+        dtypes = {c: COMPACT_DTYPES.get(c, "float32") for c in spec.columns}
+        dtypes |= dict.fromkeys(spec.text, "str")
+        for c in spec.columns:
+            if dtypes[c] != "int8":
+                continue
+            sk = self.sketches.get(c)
+            if sk is None:  # not sketched: missing values may turn up in any chunk
+                dtypes[c] = "Int8"
+                continue
+            values = sk.counts.index.to_series()
+            if sk.n_null and pd.notna(medians.get(c, np.nan)):
+                values = pd.concat([values, pd.Series([medians[c]])])
+            if not fits_int8(values):
+                dtypes[c] = "float32"
+            elif sk.n_null and c not in medians or sk.n == 0 and sk.n_null:
+                dtypes[c] = "Int8"
+        for f in spec.flags:
+            dtypes[f.name] = "int8" if pd.notna(cutoffs[f.name]) else "Int8"
+        return dtypes
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to a ``.csv`` or zstd ``.parquet`` file.
+
+    The Parquet schema (including the pandas metadata that restores
+    categoricals and nullable ``Int64``) is fixed by the first chunk.
+    Rewriting a Parquet file drops its ingested increments; ``append``
+    (CSV only) adds rows to an existing file without a header.
+    """
+
+    def __init__(self, path: Path, append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._schema = None
+        if append and self.path.suffix == ".parquet":
+            raise ValueError("Parquet files cannot be appended to; write a new part instead")
+        if append and self.path.exists():
+            self._file = open(self.path, "a", newline="")  # noqa: SIM115
+        elif self.path.suffix == ".parquet":
+            shutil.rmtree(increments_dir(self.path), ignore_errors=True)
+
+    def write(self, df: pd.DataFrame):
+        if self.path.suffix == ".parquet":
+            schema = self._schema or arrow_schema(df)
+            self.write_table(pa.Table.from_pandas(df, schema, preserve_index=False))
+        else:
+            header = self._file is None
+            if header:
+                self._file = open(self.path, "w", newline="")  # noqa: SIM115
+            df.to_csv(self._file, header=header, index=False)
+
+    def write_table(self, table: pa.Table):
+        """Write an Arrow table (Parquet only); the first one fixes the schema."""
+        if self._file is None:
+            self._schema = table.schema
+            self._file = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        self._file.write_table(table)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def arrow_schema(df: pd.DataFrame) -> pa.Schema:
+    """Arrow schema (with pandas metadata) for ``df``; all-null columns become strings."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for i, f in enumerate(schema):
+        if pa.types.is_null(f.type):  # all-missing first chunk
+            schema = schema.set(i, f.with_type(pa.large_string()))
+    return schema
+
+
+def increments_dir(path: Path) -> Path:
+    """Where ``ingest`` puts the cleaned Parquet parts of appended batches."""
+    return Path(path).with_suffix(".parts")
+
+
+def clean_parts(path: Path) -> list[Path]:
+    """A clean Parquet followed by its ingested parts, in ingest order.
+
+    Every reader of a clean Parquet goes through this list, so ingested rows
+    are counted everywhere or nowhere.
+    """
+    path = Path(path)
+    return [path, *sorted(increments_dir(path).glob("*.parquet"))]
+
+
+def write_clean(df: pd.DataFrame, path: Path = PRIMARY_CLEAN_PARQUET):
+    with ChunkWriter(path) as w:
+        w.write(df)
+
+
+def read_clean(columns: list[str] | None = None, path: Path = PRIMARY_CLEAN_PARQUET):
+    """Load the cleaned frame, reading only ``columns``.
+
+    Parquet (plus any ingested parts) is read through a memory map; if
+    only the CSV exists it is parsed instead. Either way the columns come
+    back in the compact ``schema.COMPACT_DTYPES`` (categorical platforms,
+    float32 hours, int8 scores and flags).
+    """
+    path = Path(path)
+    if path.suffix == ".parquet" and path.exists():
+        tables = [pq.read_table(p, columns=columns, memory_map=True) for p in clean_parts(path)]
+        table = pa.concat_tables(tables, promote_options="permissive")
+        for i, f in enumerate(table.schema):
+            if COMPACT_DTYPES.get(f.name) == "category" and f.type in (
+                pa.string(),
+                pa.large_string(),
+            ):
+                # category codes straight from Arrow, no Python strings in between
+                table = table.set_column(i, f.name, table.column(i).dictionary_encode())
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(path.with_suffix(".csv"), usecols=columns)
+    return compact(df)
+
+
+def read_raw_chunks(src: Path, chunksize: int):
+    return pd.read_csv(src, chunksize=chunksize)
+
+
+def _describe(stats: CleanStats) -> str:
+    cutoffs = {k: float(v) for k, v in stats.cutoffs.items()}
+    return f"cutoffs={cutoffs} | medians={ {c: float(m) for c, m in stats.medians.items()} }"
+
+
+def scan_stats(src: Path, chunksize: int, spec: CleanSpec = PRIMARY) -> CleanStats:
+    """Pass 1: gather medians and flag cutoffs without holding the file."""
+    stats = CleanStats(spec)
+    with track("clean.scan") as t:
+        for chunk in tqdm(read_raw_chunks(src, chunksize), desc="scan", unit="chunk"):
+            stats.update(coerce_raw(chunk, spec))
+        t.rows_in = stats.rows
+    return stats
+
+
+def stream_clean(
+    src: Path, dst, chunksize: int = 1_000_000, spec: CleanSpec = PRIMARY
+) -> tuple[CleanStats, dict]:
+    """Two-pass chunked cleaning; peak memory is bounded by ``chunksize``.
+
+    ``dst`` is one output path or a list of them (``.csv``/``.parquet``).
+
+    Returns the first-pass statistics and, per imputed column, the
+    (non-null count, sum) of the cleaned output for diagnostics.
+    """
+    with track("clean.stream") as t:
+        stats = scan_stats(src, chunksize, spec)
+        medians, cutoffs, dtypes = stats.medians, stats.cutoffs, stats.dtypes
+        logger.info(f"Scanned {stats.rows} {spec.name} rows | {_describe(stats)}")
+
+        totals = {c: [0, 0.0] for c in spec.impute}
+        writers = [ChunkWriter(p) for p in (dst if isinstance(dst, (list, tuple)) else [dst])]
+        try:
+            with track("clean.write", rows_in=stats.rows) as tw:
+                for chunk in tqdm(read_raw_chunks(src, chunksize), desc="clean", unit="chunk"):
+                    out = finish_clean(coerce_raw(chunk, spec), medians, cutoffs, spec)
+                    out = out.astype(dtypes)
+                    for c in spec.impute:
+                        totals[c][0] += int(out[c].notna().sum())
+                        totals[c][1] += float(out[c].sum())
+                    for w in writers:
+                        w.write(out)
+                tw.rows_out = stats.rows
+        finally:
+            for w in writers:
+                w.close()
+        t.rows_in = t.rows_out = stats.rows
+    return stats, totals
+
+
+# ---- partitioned cleaning: the two streaming passes spread over processes ----
+class _RangeReader(io.RawIOBase):
+    """Read-only view of bytes ``[start, end)`` of a file."""
+
+    def __init__(self, path: Path, start: int, end: int):
+        self._f = open(path, "rb")  # noqa: SIM115
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buf) -> int:
+        n = self._f.readinto(memoryview(buf)[: min(len(buf), self._left)])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def split_ranges(src: Path, parts: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """Header columns and up to ``parts`` byte ranges of ``src`` cut at line ends.
+
+    Assumes no quoted field spans lines, which holds for the survey exports.
+    """
+    size = Path(src).stat().st_size
+    with open(src, "rb") as f:
+        header = f.readline()
+        cuts = [f.tell()]
+        for i in range(1, parts):
+            f.seek(max(cuts[0] + (size - cuts[0]) * i // parts - 1, cuts[-1]))
+            f.readline()  # finish the line the cut landed in
+            cuts.append(f.tell())
+    cuts.append(size)
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    return columns, [(a, b) for a, b in pairwise(cuts) if b > a]
+
+
+def read_range_chunks(src: Path, columns: list[str], start: int, end: int, chunksize: int):
+    reader = io.BufferedReader(_RangeReader(src, start, end), buffer_size=1 << 20)
+    return pd.read_csv(reader, header=None, names=columns, chunksize=chunksize)
+
+
+def _scan_range(src, columns, start, end, chunksize, spec) -> CleanStats:
+    stats = CleanStats(spec)
+    with read_range_chunks(src, columns, start, end, chunksize) as chunks:
+        for chunk in chunks:
+            stats.update(coerce_raw(chunk, spec))
+    return stats
+
+
+def _clean_range(src, columns, start, end, chunksize, stats, part_dir, i, fmts) -> dict:
+    """Pass 2 over one range: write its cleaned rows as CSV text and/or Arrow IPC."""
+    spec = stats.spec
+    medians, cutoffs, dtypes = stats.medians, stats.cutoffs, stats.dtypes
+    totals = {c: [0, 0.0] for c in spec.impute}
+    csv_file = open(part_dir / f"{i}.csv", "w", newline="") if "csv" in fmts else None  # noqa: SIM115
+    ipc, schema = None, None
+    try:
+        with read_range_chunks(src, columns, start, end, chunksize) as chunks:
+            for chunk in chunks:
+                out = finish_clean(coerce_raw(chunk, spec), medians, cutoffs, spec)
+                out = out.astype(dtypes)
+                for c in spec.impute:
+                    totals[c][0] += int(out[c].notna().sum())
+                    totals[c][1] += float(out[c].sum())
+                if csv_file is not None:
+                    out.to_csv(csv_file, header=False, index=False)
+                if "parquet" in fmts:
+                    if ipc is None:
+                        schema = arrow_schema(out)
+                        ipc = pa.ipc.new_file(part_dir / f"{i}.arrow", schema)
+                    ipc.write_table(pa.Table.from_pandas(out, schema, preserve_index=False))
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if ipc is not None:
+            ipc.close()
+    return {"totals": totals, "schema": schema}
+
+
+def parallel_clean(
+    src: Path,
+    dst,
+    chunksize: int = 1_000_000,
+    max_workers: int | None = None,
+    spec: CleanSpec = PRIMARY,
+) -> tuple[CleanStats, dict]:
+    """``stream_clean`` over line-aligned byte ranges of ``src``, one per worker.
+
+    Pass 1 workers return mergeable ``CleanStats`` for their range; the
+    merged medians and cutoffs drive pass 2, where each worker imputes and
+    derives flags for its range and writes a CSV/Arrow part. Parts are
+    stitched in range order and Parquet is re-chunked at ``chunksize``
+    rows, so every output is byte-identical to the serial path (the
+    diagnostic totals may differ in the last float digits).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    paths = [Path(p) for p in (dst if isinstance(dst, (list, tuple)) else [dst])]
+    fmts = {p.suffix.lstrip(".") for p in paths}
+    columns, ranges = split_ranges(src, max_workers)
+    if not ranges:  # header only: nothing to split, the serial path writes empty outputs
+        return stream_clean(src, paths, chunksize, spec)
+    paths[0].parent.mkdir(parents=True, exist_ok=True)
+    with track("clean.parallel") as t, ProcessPoolExecutor(len(ranges)) as pool:
+        with track("clean.scan"):
+            futures = [
+                pool.submit(_scan_range, src, columns, a, b, chunksize, spec) for a, b in ranges
+            ]
+            stats = CleanStats(spec)
+            for fut in futures:
+                stats.merge(fut.result())
+        logger.info(
+            f"Scanned {stats.rows} {spec.name} rows in {len(ranges)} ranges | {_describe(stats)}"
+        )
+
+        totals = {c: [0, 0.0] for c in spec.impute}
+        with (
+            track("clean.write", rows_in=stats.rows),
+            tempfile.TemporaryDirectory(dir=paths[0].parent, prefix=".parts-") as tmp,
+        ):
+            part_dir = Path(tmp)
+            futures = [
+                pool.submit(_clean_range, src, columns, a, b, chunksize, stats, part_dir, i, fmts)
+                for i, (a, b) in enumerate(ranges)
+            ]
+            results = [fut.result() for fut in futures]
+            for r in results:
+                for c in spec.impute:
+                    totals[c][0] += r["totals"][c][0]
+                    totals[c][1] += r["totals"][c][1]
+            for p in paths:
+                if p.suffix == ".parquet":
+                    _stitch_parquet(part_dir, len(ranges), results[0]["schema"], p, chunksize)
+                else:
+                    _stitch_csv(part_dir, len(ranges), p, spec.columns)
+        t.rows_in = t.rows_out = stats.rows
+    return stats, totals
+
+
+def _stitch_csv(part_dir: Path, n: int, path: Path, columns: list[str]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+    with open(path, "ab") as f:
+        for i in range(n):
+            with open(part_dir / f"{i}.csv", "rb") as part:
+                shutil.copyfileobj(part, f, 1 << 20)
+
+
+def _stitch_parquet(part_dir: Path, n: int, schema: pa.Schema, path: Path, chunksize: int):
+    # the first range starts at row 0, so its first chunk fixes the schema as in serial
+    tables = [
+        pa.ipc.open_file(pa.memory_map(str(part_dir / f"{i}.arrow"))).read_all() for i in range(n)
+    ]
+    table = pa.concat_tables([t.cast(schema) for t in tables])
+    with ChunkWriter(path) as w:
+        for offset in range(0, table.num_rows, chunksize):
+            # one contiguous array per column, so pages split exactly as in serial
+            w.write_table(table.slice(offset, chunksize).combine_chunks())
+
+
+def clean_dataset(
+    spec: CleanSpec,
+    src: Path | None = None,
+    dst=None,
+    chunksize: int = 0,
+    workers: int = 1,
+) -> int:
+    """Clean one dataset with the engine its size calls for; returns the row count.
+
+    ``chunksize`` 0 loads the whole file, otherwise rows are streamed in
+    chunks; ``workers`` other than 1 splits the file over processes (0 =
+    one per core). Paths default to the spec's raw and clean files.
+    """
+    src = Path(src or spec.raw)
+    outputs = dst if isinstance(dst, (list, tuple)) else [dst or spec.clean]
+    if workers != 1:
+        stats, _ = parallel_clean(src, outputs, chunksize or 1_000_000, workers or None, spec)
+        return stats.rows
+    if chunksize > 0:
+        stats, _ = stream_clean(src, outputs, chunksize, spec)
+        return stats.rows
+    out = clean_frame(pd.read_csv(src), spec)
+    for p in outputs:
+        write_clean(out, p)
+    return len(out)
+
+
+def clean_datasets(
+    specs: list[CleanSpec], chunksize: int = 0, workers: int = 1, csv: bool = True
+) -> dict:
+    """Clean several datasets at once, one process each; returns rows per dataset.
+
+    Datasets whose raw file is missing are skipped with a warning.
+    """
+    jobs = {}
+    for spec in specs:
+        if not spec.raw.exists():
+            logger.warning(f"Skipping {spec.name}: {spec.raw} not found")
+            continue
+        jobs[spec.name] = (spec, spec.raw, clean_outputs(spec.clean, csv), chunksize, workers)
+    if len(jobs) <= 1:
+        return {name: clean_dataset(*job) for name, job in jobs.items()}
+    with track("clean.datasets") as t, ProcessPoolExecutor(len(jobs)) as pool:
+        futures = {name: pool.submit(clean_dataset, *job) for name, job in jobs.items()}
+        rows = {name: fut.result() for name, fut in futures.items()}
+        t.rows_out = sum(rows.values())
+    return rows
+
+
+def clean_outputs(path: Path, csv: bool = True) -> list[Path]:
+    """``path`` plus, with ``csv``, the CSV copy written next to a Parquet file."""
+    path = Path(path)
+    return [path, path.with_suffix(".csv")] if csv and path.suffix != ".csv" else [path]
+
+
+@dataclass
+class IngestState:
+    """Running aggregates persisted between ``ingest`` calls."""
+
+    stats: CleanStats
+    moments: object  # inst414_project.stats.Moments
+    flags_q75: float  # heavy_user cutoff the last full clean flagged rows with
+    raw_bytes: int  # raw CSV size after the last ingest; any other change => rebuild
+    clean_mtime_ns: int
+    batches: list = field(default_factory=list)
+    needs_rederive: bool = False
+
+
+def build_state(raw: Path, clean: Path, chunksize: int = 1_000_000) -> IngestState:
+    """Full-history bootstrap: one scan of the raw CSV and the clean Parquet."""
+    from inst414_project.stats import moments_from_parquet
+
+    stats = scan_stats(raw, chunksize)
+    return IngestState(
+        stats=stats,
+        moments=moments_from_parquet(clean, batch_size=chunksize),
+        flags_q75=stats.q75,
+        raw_bytes=raw.stat().st_size,
+        clean_mtime_ns=clean.stat().st_mtime_ns,
+    )
+
+
+def load_state(raw: Path, clean: Path, state_path: Path = INGEST_STATE) -> IngestState:
+    if state_path.exists():
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+        if (
+            state.raw_bytes == raw.stat().st_size
+            and state.clean_mtime_ns == clean.stat().st_mtime_ns
+        ):
+            return state
+        logger.info("Raw or clean data changed outside ingest; rebuilding aggregate state")
+    return build_state(raw, clean)
+
+
+def save_state(state: IngestState, state_path: Path = INGEST_STATE):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f)
+    tmp.replace(state_path)
+
+
+def _raw_header(batch: pd.DataFrame, raw: Path) -> list[str]:
+    header = pd.read_csv(raw, nrows=0).columns
+    missing = [c for c in header if c not in batch.columns]
+    if missing:
+        raise ValueError(f"batch is missing raw columns: {', '.join(missing)}")
+    return list(header)
+
+
+def _append_raw(batch: pd.DataFrame, raw: Path, header: list[str]):
+    with open(raw, "rb+") as f:
+        f.seek(0, 2)
+        if f.tell():
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    batch[header].to_csv(raw, mode="a", header=False, index=False)
+
+
+@track("ingest")
+def ingest(
+    batch_path: Path,
+    raw: Path = PRIMARY_RAW,
+    clean: Path = PRIMARY_CLEAN_PARQUET,
+    state_path: Path = INGEST_STATE,
+) -> dict:
+    """Append one raw batch and clean only its rows.
+
+    The batch is cleaned with the running medians and heavy_user cutoff,
+    written as a new Parquet part (and appended to the clean CSV if there
+    is one), then appended to the raw CSV; the quantile sketches and EDA
+    moments are updated in place. If any write fails, the part is removed
+    and the raw and clean CSVs are truncated back, so raw, clean and state
+    stay in step. Cost is proportional to the batch, not the history.
+    If the q75 cutoff moves, the historical heavy_user flags (and EDA group
+    means) are stale: the state records ``needs_rederive`` until the next
+    full clean.
+    """
+    state = load_state(raw, clean, state_path)
+    batch = pd.read_csv(batch_path)
+    header = _raw_header(batch, raw)
+
+    q75_before = state.stats.q75
+    coerced = coerce_raw(batch)
+    state.stats.update(coerced)
+    stats = state.stats
+    out = finish_clean(coerced, stats.medians, stats.cutoffs)
+    out = out.astype(stats.dtypes)
+
+    state.moments.update(out)
+    q75 = stats.q75
+    if not (q75 == state.flags_q75 or (pd.isna(q75) and pd.isna(state.flags_q75))):
+        state.needs_rederive = True
+    state.batches.append(Path(batch_path).name)
+
+    part = increments_dir(clean) / f"part-{len(clean_parts(clean)) - 1:05d}.parquet"
+    clean_csv = clean.with_suffix(".csv")
+    sizes = {p: p.stat().st_size for p in (raw, clean_csv) if p.exists()}
+    try:
+        write_clean(out, part)
+        if clean_csv in sizes:
+            with ChunkWriter(clean_csv, append=True) as w:
+                w.write(out)
+        _append_raw(batch, raw, header)  # raw last: it is what load_state checks
+        state.raw_bytes = raw.stat().st_size
+        save_state(state, state_path)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        for p, size in sizes.items():
+            with open(p, "rb+") as f:
+                f.truncate(size)
+        raise
+    return {
+        "rows": len(out),
+        "total_rows": stats.rows,
+        "q75_before": float(q75_before),
+        "q75": float(q75),
+        "medians": {c: float(m) for c, m in stats.medians.items()},
+        "needs_rederive": state.needs_rederive,
+    }
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = RAW_DATA_DIR / "dataset.csv",
-    output_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    # ----------------------------------------------
+    input_path: Path | None = None,
+    output_path: Path | None = None,
+    dataset: Annotated[
+        list[str] | None, typer.Option(help=f"Datasets to clean: {', '.join(SPECS)}.")
+    ] = None,
+    chunksize: int = typer.Option(0, help="Rows per chunk; 0 loads the whole file."),
+    csv: bool = typer.Option(True, help="Also write a CSV copy next to the Parquet file."),
+    workers: int = typer.Option(
+        1, help="Processes for partitioned cleaning; 0 = one per core, 1 = serial."
+    ),
+):
+    names = dataset or ["primary"]
+    unknown = [n for n in names if n not in SPECS]
+    if unknown:
+        raise typer.BadParameter(f"unknown dataset(s): {', '.join(unknown)}")
+    if len(names) > 1:
+        if input_path or output_path:
+            raise typer.BadParameter("--input-path/--output-path need a single --dataset")
+        logger.info(f"Cleaning {', '.join(names)} datasets concurrently...")
+        rows = clean_datasets([SPECS[n] for n in names], chunksize, workers, csv)
+        logger.success(f"Saved clean datasets | rows={rows}")
+        return
+
+    spec = SPECS[names[0]]
+    logger.info(f"Cleaning {spec.name} dataset...")
+    outputs = clean_outputs(output_path or spec.clean, csv)
+    rows = clean_dataset(spec, input_path, outputs, chunksize, workers)
+    logger.success(f"Saved {', '.join(map(str, outputs))} | rows={rows}")
+
+
+@app.command("ingest")
+def ingest_cmd(
+    batch_path: Path,
+    raw_path: Path = PRIMARY_RAW,
+    clean_path: Path = PRIMARY_CLEAN_PARQUET,
+    reports: bool = typer.Option(False, help="Rewrite the EDA tables from the running moments."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Processing dataset...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Processing dataset complete.")
-    # -----------------------------------------
+    logger.info(f"Ingesting {batch_path}...")
+    report = ingest(batch_path, raw_path, clean_path)
+    logger.info(
+        f"Cleaned {report['rows']} new rows (total {report['total_rows']}) | "
+        f"q75 {report['q75_before']} -> {report['q75']}"
+    )
+    if report["needs_rederive"]:
+        logger.warning(
+            "heavy_user cutoff moved since the last full clean; re-run `dataset.py main` "
+            "to re-derive historical heavy_user flags"
+        )
+    if reports:
+        from inst414_project.stats import write_eda_tables
+
+        with open(INGEST_STATE, "rb") as f:
+            write_eda_tables(pickle.load(f).moments)
+    logger.success("Ingest complete.")
 
 
 if __name__ == "__main__":
+    setup()
     app()
@@ -1,29 +1,329 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import cached_property
+import hashlib
+import json
+import os
 from pathlib import Path
+import shutil
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 import typer
 
-from inst414_project.config import PROCESSED_DATA_DIR
+from inst414_project.config import PROCESSED_DATA_DIR, setup
+from inst414_project.perf import track
 
 app = typer.Typer()
 
+FEATURE_STORE_DIR = PROCESSED_DATA_DIR / "features"
+FEATURE_LAYOUT = 1  # bump when MODEL_FEATURES or the transforms below change
+
+NUM_PATTERN = r"(-?\d+\.?\d*)"
+
+# First matching keyword wins, so the order of this mapping matters.
+PLATFORM_KEYWORDS = {
+    "Short-video": ["tiktok", "short", "reels", "youtube"],
+    "Image-centric": ["instagram", "insta", "snap", "pinterest"],
+    "Professional/Forum": ["linkedin", "reddit", "quora", "discord"],
+}
+PLATFORM_GROUPS = [*PLATFORM_KEYWORDS, "Other"]
+
+MODEL_NUMERIC = ["hours_social_media", "sleep_hours", "addiction_score", "heavy_user", "sleep_ok"]
+MODEL_INTERACTIONS = {"heavy_user_x_sleep_ok": ("heavy_user", "sleep_ok")}
+MODEL_FEATURES = [
+    *MODEL_NUMERIC,
+    *MODEL_INTERACTIONS,
+    *(f"platform_group_{g}" for g in PLATFORM_GROUPS),
+]
+MODEL_STANDARDIZED = ["hours_social_media", "sleep_hours", "addiction_score"]
+MODEL_TARGET = "acad_impact"
+
+
+def to_num(series: pd.Series) -> pd.Series:
+    """Coerce a raw column to numbers, e.g. ``"5.2 hrs"`` -> 5.2.
+
+    Survey answers repeat heavily, so each distinct value is parsed once:
+    ``pd.to_numeric`` for values that are a plain ``NUM_PATTERN`` number,
+    and the regex for the rest (so ``"1e3"`` is 1 and ``"inf"`` is NaN,
+    as with the regex alone). Results are broadcast back through the codes.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors="coerce")
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    plain = uniques.astype(str).str.fullmatch(rf"\s*{NUM_PATTERN}\s*")
+    parsed = pd.to_numeric(uniques, errors="coerce")
+    failed = parsed.isna() | ~plain.to_numpy(dtype=bool)
+    if failed.any():
+        extr = uniques[failed].astype(str).str.extract(NUM_PATTERN, expand=False)
+        parsed = parsed.astype("float64")
+        parsed[failed] = pd.to_numeric(extr, errors="coerce")
+    values = parsed.to_numpy()
+    if (codes == -1).any():
+        values = np.append(values.astype("float64"), np.nan)  # code -1 (missing) -> NaN
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def platform_group_of(value) -> str:
+    """Scalar platform rule; ``map_platform`` applies it once per category."""
+    if pd.isna(value):
+        return "Other"
+    s = str(value).lower()
+    for group, keys in PLATFORM_KEYWORDS.items():
+        if any(k in s for k in keys):
+            return group
+    return "Other"
+
+
+def map_platform(series: pd.Series) -> pd.Series:
+    """Vectorized platform grouping returning a categorical Series.
+
+    Each distinct platform is resolved once and the result is broadcast
+    back through the category codes.
+    """
+    codes, uniques = pd.factorize(series)
+    group_codes = np.array(
+        [PLATFORM_GROUPS.index(platform_group_of(u)) for u in uniques]
+        + [PLATFORM_GROUPS.index("Other")],  # code -1 (missing) -> Other
+        dtype="int8",
+    )
+    return pd.Series(
+        pd.Categorical.from_codes(group_codes[codes], categories=PLATFORM_GROUPS),
+        index=series.index,
+        name=series.name,
+    )
+
+
+def add_interactions(x: np.ndarray) -> np.ndarray:
+    """Fill the ``MODEL_INTERACTIONS`` columns of ``x`` from its numeric columns."""
+    for j, (a, b) in enumerate(MODEL_INTERACTIONS.values(), start=len(MODEL_NUMERIC)):
+        np.multiply(x[:, MODEL_NUMERIC.index(a)], x[:, MODEL_NUMERIC.index(b)], out=x[:, j])
+    return x
+
+
+def model_matrix(df: pd.DataFrame, scaler: dict | None = None) -> np.ndarray:
+    """Float64 design matrix in ``MODEL_FEATURES`` order.
+
+    ``platform_group`` is one-hot encoded over the fixed ``PLATFORM_GROUPS``
+    so training and scoring agree even when a batch lacks some groups.
+    With a ``scaler`` (see ``fit_scaler``) the numerics are standardized.
+    """
+    k = len(MODEL_NUMERIC)
+    x = np.zeros((len(df), len(MODEL_FEATURES)))
+    x[:, :k] = df[MODEL_NUMERIC].to_numpy(dtype="float64", na_value=np.nan)
+    add_interactions(x)
+    codes = pd.Categorical(df["platform_group"], categories=PLATFORM_GROUPS).codes
+    rows = np.flatnonzero(codes >= 0)
+    x[rows, k + len(MODEL_INTERACTIONS) + codes[rows]] = 1.0
+    return x if scaler is None else standardize(x, scaler)
+
+
+def fit_scaler(x: np.ndarray) -> dict:
+    """Per-column ``center``/``scale`` lists: mean and std of ``MODEL_STANDARDIZED``, else 0/1."""
+    center, scale = np.zeros(x.shape[1]), np.ones(x.shape[1])
+    idx = [MODEL_FEATURES.index(c) for c in MODEL_STANDARDIZED]
+    if len(x):
+        center[idx] = np.nanmean(x[:, idx], axis=0)
+        std = np.nanstd(x[:, idx], axis=0)
+        scale[idx] = np.where(std > 0, std, 1.0)
+    return {"center": center.tolist(), "scale": scale.tolist()}
+
+
+def standardize(x: np.ndarray, scaler: dict) -> np.ndarray:
+    """``(x - center) / scale`` in place."""
+    x -= np.asarray(scaler["center"])
+    x /= np.asarray(scaler["scale"])
+    return x
+
+
+def model_target(df: pd.DataFrame) -> np.ndarray:
+    """``acad_impact`` as 0/1 labels (a median-imputed 0.5 counts as 1)."""
+    return (df[MODEL_TARGET].to_numpy(dtype="float64", na_value=np.nan) >= 0.5).astype("int8")
+
+
+# ---- feature store: one materialized version per cleaning spec and source ----
+@dataclass(frozen=True)
+class FeatureSet:
+    """One feature version on disk, opened read-only through memory maps.
+
+    - ``x``: float64 matrix in ``MODEL_FEATURES`` order, numerics standardized
+      with ``scaler`` (``x.npy``).
+    - ``y``: int8 ``MODEL_TARGET`` labels, -1 where missing (``y.npy``).
+    - ``table()``: the clean frame as an Arrow IPC file, for the EDA.
+
+    Nothing is copied on open; every process that opens the same version
+    shares the page cache.
+    """
+
+    path: Path
+    meta: dict
+
+    @classmethod
+    def open(cls, path: Path) -> "FeatureSet":
+        path = Path(path)
+        return cls(path, json.loads((path / "meta.json").read_text()))
+
+    @property
+    def version(self) -> str:
+        return self.meta["version"]
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def scaler(self) -> dict:
+        return self.meta["scaler"]
+
+    @cached_property
+    def x(self) -> np.ndarray:
+        return np.load(self.path / "x.npy", mmap_mode="r")
+
+    @cached_property
+    def y(self) -> np.ndarray:
+        return np.load(self.path / "y.npy", mmap_mode="r")
+
+    def table(self, columns: list[str] | None = None) -> pa.Table:
+        table = pa.ipc.open_file(pa.memory_map(str(self.path / "clean.arrow"))).read_all()
+        return table if columns is None else table.select(columns)
+
+    def frame(self, columns: list[str] | None = None) -> pd.DataFrame:
+        return self.table(columns).to_pandas()
+
+
+def _source_key(path: Path) -> list:
+    from inst414_project.dataset import clean_parts
+
+    return [[p.name, p.stat().st_size, p.stat().st_mtime_ns] for p in clean_parts(path)]
+
+
+def source_digest(source: Path) -> str:
+    """sha256 of the source path, its parts' sizes and mtimes, and ``FEATURE_LAYOUT``."""
+    key = [str(Path(source).resolve()), FEATURE_LAYOUT, _source_key(source)]
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def feature_path(spec, source: Path, root: Path = FEATURE_STORE_DIR) -> Path:
+    """Directory of one feature version: ``<name>-<spec digest>-<source digest>``.
+
+    Every clean file (and every state of it after an ingest) gets its own
+    version, so scoring another Parquet never replaces the training features.
+    """
+    return Path(root) / f"{spec.name}-{spec.digest[:12]}-{source_digest(source)[:12]}"
+
+
+def materialize(
+    spec=None,
+    source: Path | None = None,
+    root: Path = FEATURE_STORE_DIR,
+    replace: bool = False,
+):
+    """Build ``spec``'s feature version from its clean Parquet (``source`` overrides).
+
+    Files are written to a temporary directory that is published in one
+    rename, so readers never see a partial version. A version another
+    process published meanwhile is kept, unless ``replace``; older versions
+    stay on disk for the processes still reading them.
+    """
+    from inst414_project.dataset import PRIMARY, arrow_schema, read_clean
+
+    spec = spec or PRIMARY
+    source = Path(source or spec.clean)
+    dst = feature_path(spec, source, root)
+    with track("features.materialize") as t:
+        df = read_clean(path=source)
+        missing = [c for c in [*MODEL_NUMERIC, "platform_group", MODEL_TARGET] if c not in df]
+        if missing:
+            raise ValueError(f"{spec.name} has no model columns {missing}")
+        x = model_matrix(df)
+        scaler = fit_scaler(x)
+        standardize(x, scaler)
+        y = np.where(df[MODEL_TARGET].isna().to_numpy(), -1, model_target(df)).astype("int8")
+
+        tmp = dst.with_name(f"{dst.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "x.npy", x)
+        np.save(tmp / "y.npy", y)
+        table = pa.Table.from_pandas(df, arrow_schema(df), preserve_index=False)
+        with (
+            pa.OSFile(str(tmp / "clean.arrow"), "wb") as sink,
+            pa.ipc.new_file(sink, table.schema) as writer,
+        ):
+            writer.write_table(table)
+        meta = {
+            "version": dst.name,
+            "spec": spec.name,
+            "spec_digest": spec.digest,
+            "layout": FEATURE_LAYOUT,
+            "source": str(source),
+            "source_key": _source_key(source),
+            "source_digest": source_digest(source),
+            "rows": len(df),
+            "features": MODEL_FEATURES,
+            "scaler": scaler,
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=1))
+        try:
+            tmp.rename(dst)
+        except OSError:  # the version exists: published by another process, or forced
+            if replace:
+                old = dst.with_name(f"{dst.name}.old-{os.getpid()}")
+                dst.rename(old)
+                tmp.rename(dst)
+                shutil.rmtree(old, ignore_errors=True)  # open maps stay valid
+            else:
+                shutil.rmtree(tmp, ignore_errors=True)
+        t.rows_in = t.rows_out = len(df)
+    return FeatureSet.open(dst)
+
+
+def load_features(
+    spec=None, source: Path | None = None, root: Path = FEATURE_STORE_DIR, rebuild: bool = False
+) -> FeatureSet:
+    """``spec``'s feature version for ``source``, materialized first if missing.
+
+    The version directory is keyed on the spec, ``FEATURE_LAYOUT`` and the
+    clean Parquet's (and its ingested parts') size and mtime, so a version
+    that exists is current.
+    """
+    from inst414_project.dataset import PRIMARY
+
+    spec = spec or PRIMARY
+    source = Path(source or spec.clean)
+    dst = feature_path(spec, source, root)
+    if not rebuild and (dst / "meta.json").exists():
+        return FeatureSet.open(dst)
+    return materialize(spec, source, root, replace=rebuild)
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    output_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    # -----------------------------------------
+    dataset: str = typer.Option("primary", help="Cleaning spec whose features to build."),
+    input_path: Path | None = None,
+    output_dir: Path = FEATURE_STORE_DIR,
+    force: bool = typer.Option(False, "--force", help="Rebuild even if the version is current."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Generating features from dataset...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Features generation complete.")
-    # -----------------------------------------
+    from inst414_project.dataset import SPECS
+
+    if dataset not in SPECS:
+        raise typer.BadParameter(f"unknown dataset {dataset!r}; known: {list(SPECS)}")
+    logger.info(f"Materializing {dataset} features...")
+    fs = load_features(SPECS[dataset], input_path, output_dir, rebuild=force)
+    # <dataset>.json names the current version (and is what the pipeline stage tracks)
+    pointer = output_dir / f"{dataset}.json"
+    if not pointer.exists() or json.loads(pointer.read_text()) != fs.meta:
+        pointer.write_text(json.dumps(fs.meta, indent=1))
+    size = sum(p.stat().st_size for p in fs.path.iterdir())
+    logger.success(
+        f"Features {fs.version}: {fs.rows} rows x {fs.x.shape[1]} ({size / 1e6:.1f} MB)"
+    )
 
 
 if __name__ == "__main__":
+    setup()
     app()
@@ -1,30 +1,214 @@
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+import hashlib
 from pathlib import Path
+import pickle
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
 import typer
 
-from inst414_project.config import MODELS_DIR, PROCESSED_DATA_DIR
+from inst414_project.config import CLEAN_DATA_DIR, MODELS_DIR, PROCESSED_DATA_DIR, setup
+from inst414_project.dataset import ChunkWriter, clean_parts
+from inst414_project.features import (
+    FEATURE_STORE_DIR,
+    MODEL_FEATURES,
+    MODEL_INTERACTIONS,
+    MODEL_NUMERIC,
+    PLATFORM_GROUPS,
+    FeatureSet,
+    add_interactions,
+    load_features,
+    model_matrix,
+    platform_group_of,
+    standardize,
+)
+from inst414_project.perf import track
 
 app = typer.Typer()
 
+INPUT_COLUMNS = [*MODEL_NUMERIC, "platform_group"]
+PLATFORM_CACHE_SIZE = 4096  # raw platform strings remembered; clients can send any
+
+
+@lru_cache(maxsize=PLATFORM_CACHE_SIZE)
+def _platform_index(value: str) -> int:
+    return PLATFORM_GROUPS.index(platform_group_of(value))
+
+
+class Predictor:
+    """Long-lived scorer for ``acad_impact`` risk.
+
+    The model bundle written by ``modeling/train.py`` is loaded once.
+    ``predict_batch`` takes clean-schema records (dicts) or a DataFrame and
+    returns probabilities; small record batches skip pandas entirely and
+    fill the design matrix directly. ``platform_group`` may be a group
+    name or a raw platform (``platform_primary`` is also accepted); a
+    missing, null or non-finite numeric input raises ``ValueError``. Inputs are
+    standardized with the scaler saved in the bundle at training time.
+    ``version`` is a short hash of the model file that was loaded.
+    """
+
+    def __init__(self, model_path: Path = MODELS_DIR / "model.pkl", threshold: float = 0.5):
+        data = Path(model_path).read_bytes()  # one read: version and bundle always match
+        bundle = pickle.loads(data)
+        if bundle["features"] != MODEL_FEATURES:
+            raise ValueError(f"{model_path} was trained on different features; retrain it")
+        self.bundle = bundle
+        self.model = bundle["model"]
+        self.scaler = bundle["scaler"]
+        self.threshold = threshold
+        self.path = Path(model_path)
+        self.version = hashlib.sha256(data).hexdigest()[:12]
+        self._k = len(MODEL_NUMERIC) + len(MODEL_INTERACTIONS)  # first one-hot column
+        self._group_index = {g: i for i, g in enumerate(PLATFORM_GROUPS)}
+        self._proba = self.model.predict_proba
+        from sklearn import config_context
+
+        self._config = config_context  # imported once, not per call
+
+    def _group(self, value) -> int:
+        idx = self._group_index.get(value)
+        if idx is None:  # raw platform name, through a bounded cache
+            if isinstance(value, str):
+                return _platform_index(value)
+            idx = self._group_index[platform_group_of(value)]
+        return idx
+
+    def _groups(self, values: pd.Series) -> pd.Categorical:
+        codes, uniques = pd.factorize(values)
+        lut = np.array([self._group(u) for u in uniques] + [self._group(None)], dtype="int8")
+        return pd.Categorical.from_codes(lut[codes], categories=PLATFORM_GROUPS)
+
+    def matrix(self, records) -> np.ndarray:
+        if isinstance(records, pd.DataFrame):
+            df = records
+            if "platform_group" not in df:
+                df = df.assign(platform_group=df["platform_primary"])
+            groups = df["platform_group"]
+            if not (
+                isinstance(groups.dtype, pd.CategoricalDtype)
+                and list(groups.cat.categories) == PLATFORM_GROUPS
+            ):
+                df = df.assign(platform_group=self._groups(groups))
+            return model_matrix(df, self.scaler)
+        records = records if isinstance(records, list) else list(records)
+        k = self._k
+        x = np.zeros((len(records), len(MODEL_FEATURES)))
+        for j, col in enumerate(MODEL_NUMERIC):
+            x[:, j] = np.array([rec.get(col) for rec in records], dtype="float64")  # None -> NaN
+        groups = [
+            self._group(
+                rec["platform_group"] if "platform_group" in rec else rec.get("platform_primary")
+            )
+            for rec in records
+        ]
+        x[np.arange(len(records)), k + np.array(groups, dtype="intp")] = 1.0
+        return standardize(add_interactions(x), self.scaler)
+
+    def predict_batch(self, records: Iterable[Mapping] | pd.DataFrame) -> np.ndarray:
+        """Probability of a reported academic impact for each record."""
+        x = self.matrix(records)
+        if not len(x):
+            return np.empty(0)
+        bad = ~np.isfinite(x[:, : len(MODEL_NUMERIC)])
+        if bad.any():
+            i, j = np.argwhere(bad)[0]
+            label = records.index[i] if isinstance(records, pd.DataFrame) else i
+            raise ValueError(
+                f"record {label} has a missing or non-finite {MODEL_NUMERIC[j]!r} "
+                f"({int(bad.any(axis=1).sum())} of {len(x)} records unusable)"
+            )
+        # the inputs were just checked for NaN and inf, so sklearn's per-call scan is redundant
+        with self._config(assume_finite=True):
+            return self._proba(x)[:, 1]
+
+    def _scored(self, proba: np.ndarray, index=None) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "acad_impact_proba": proba,
+                "acad_impact_pred": (proba >= self.threshold).astype("int8"),
+            },
+            index=index,
+        )
+
+    def score_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._scored(self.predict_batch(df), df.index)
+
+    def score_features(self, fs: FeatureSet, output_path: Path, chunksize: int = 1_000_000) -> int:
+        """Score every row of a feature version straight from its memory-mapped matrix.
+
+        Rows standardized with another scaler than the model's (a version
+        the model was not trained on) are rescaled chunk by chunk.
+        """
+        same = fs.scaler == self.scaler
+        center, scale = np.asarray(fs.scaler["center"]), np.asarray(fs.scaler["scale"])
+        with track("predict.score_features") as t, ChunkWriter(output_path) as w:
+            for lo in range(0, fs.rows, chunksize):
+                x = fs.x[lo : lo + chunksize]
+                if not same:
+                    x = standardize(x * scale + center, self.scaler)
+                proba = self._proba(x)[:, 1] if len(x) else np.empty(0)
+                w.write(self._scored(proba, pd.RangeIndex(lo, lo + len(x))))
+            t.rows_in = t.rows_out = fs.rows
+        return fs.rows
+
+    def score_file(
+        self,
+        input_path: Path,
+        output_path: Path,
+        chunksize: int = 1_000_000,
+        keep: list[str] | None = None,
+    ) -> int:
+        """Stream a CSV/Parquet file through the model in ``chunksize`` rows.
+
+        Only the model inputs (plus ``keep`` pass-through columns) are read.
+        Writes probabilities and 0/1 predictions; returns the row count.
+        """
+        rows = 0
+        with track("predict.score_file") as t, ChunkWriter(output_path) as w:
+            for chunk in read_chunks(input_path, [*INPUT_COLUMNS, *(keep or [])], chunksize):
+                scored = self.score_frame(chunk)
+                if keep:
+                    scored = pd.concat([chunk[keep], scored], axis=1)
+                w.write(scored)
+                rows += len(chunk)
+            t.rows_in = t.rows_out = rows
+        return rows
+
+
+def read_chunks(path: Path, columns: list[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for part in clean_parts(path):  # ingested parts too, as read_clean does
+            pf = pq.ParquetFile(part, memory_map=True)
+            for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "test_features.csv",
+    features_path: Path = CLEAN_DATA_DIR / "primary_clean.parquet",
     model_path: Path = MODELS_DIR / "model.pkl",
     predictions_path: Path = PROCESSED_DATA_DIR / "test_predictions.csv",
-    # -----------------------------------------
+    chunksize: int = typer.Option(1_000_000, help="Rows scored per chunk."),
+    features_dir: Path = FEATURE_STORE_DIR,
+    store: bool = typer.Option(True, help="Score a clean Parquet through the feature store."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Performing inference for model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Inference complete.")
-    # -----------------------------------------
+    logger.info(f"Scoring {features_path} with {model_path}...")
+    predictor = Predictor(model_path)
+    if store and features_path.suffix == ".parquet":
+        fs = load_features(source=features_path, root=features_dir)
+        rows = predictor.score_features(fs, predictions_path, chunksize)
+    else:
+        rows = predictor.score_file(features_path, predictions_path, chunksize)
+    logger.success(f"Inference complete: {rows} rows -> {predictions_path}")
 
 
 if __name__ == "__main__":
+    setup()
     app()
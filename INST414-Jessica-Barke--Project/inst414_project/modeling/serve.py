@@ -0,0 +1,500 @@
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from http import HTTPStatus
+import json
+import math
+from pathlib import Path
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from inst414_project.config import MODELS_DIR, setup
+from inst414_project.features import MODEL_NUMERIC
+from inst414_project.modeling.predict import Predictor
+
+app = typer.Typer()
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+THROUGHPUT_WINDOW = 10.0  # seconds behind the rows/s and requests/s gauges
+MAX_BODY = 8 << 20
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str) -> list[str]:
+        out, total = [], 0
+        for le, n in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += n
+            out.append(f'{name}_bucket{{le="{le}"}} {total}')
+        return [*out, f"{name}_sum {self.sum:.6f}", f"{name}_count {self.count}"]
+
+
+class Metrics:
+    """Request, batch and throughput counters behind ``GET /metrics``."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests: dict[tuple[str, int], int] = defaultdict(int)
+        self.latency = Histogram(LATENCY_BUCKETS)  # POST /predict, queueing included
+        self.inference = Histogram(LATENCY_BUCKETS)  # one predict_batch call
+        self.batch_rows = Histogram(BATCH_BUCKETS)
+        self.rows = 0
+        self.recent: deque[tuple[float, int, int]] = deque()  # (time, rows, requests)
+
+    def observe_request(self, path: str, status: int, seconds: float):
+        self.requests[(path, status)] += 1
+        if path == "/predict" and status == HTTPStatus.OK:
+            self.latency.observe(seconds)
+
+    def observe_batch(self, rows: int, requests: int, seconds: float):
+        now = time.monotonic()
+        self.rows += rows
+        self.inference.observe(seconds)
+        self.batch_rows.observe(rows)
+        self.recent.append((now, rows, requests))
+        while self.recent and self.recent[0][0] < now - THROUGHPUT_WINDOW:
+            self.recent.popleft()
+
+    def rates(self) -> tuple[float, float]:
+        """Rows/s and requests/s scored over the last ``THROUGHPUT_WINDOW`` seconds."""
+        now = time.monotonic()
+        span = min(THROUGHPUT_WINDOW, now - self.started) or 1.0
+        recent = [r for r in self.recent if r[0] >= now - THROUGHPUT_WINDOW]
+        return sum(r[1] for r in recent) / span, sum(r[2] for r in recent) / span
+
+    def render(self, slot: "ModelSlot", queued: int) -> str:
+        rows_s, requests_s = self.rates()
+        p = slot.predictor
+        lines = [
+            "# TYPE inst414_requests_total counter",
+            *(
+                f'inst414_requests_total{{path="{path}",code="{code}"}} {n}'
+                for (path, code), n in sorted(self.requests.items())
+            ),
+            "# TYPE inst414_request_latency_seconds histogram",
+            *self.latency.lines("inst414_request_latency_seconds"),
+            "# TYPE inst414_inference_latency_seconds histogram",
+            *self.inference.lines("inst414_inference_latency_seconds"),
+            "# TYPE inst414_batch_rows histogram",
+            *self.batch_rows.lines("inst414_batch_rows"),
+            "# TYPE inst414_rows_scored_total counter",
+            f"inst414_rows_scored_total {self.rows}",
+            "# TYPE inst414_rows_per_second gauge",
+            f"inst414_rows_per_second {rows_s:.3f}",
+            "# TYPE inst414_requests_per_second gauge",
+            f"inst414_requests_per_second {requests_s:.3f}",
+            "# TYPE inst414_queue_depth gauge",
+            f"inst414_queue_depth {queued}",
+            "# TYPE inst414_model_reloads_total counter",
+            f"inst414_model_reloads_total {slot.reloads}",
+            "# TYPE inst414_model_reload_errors_total counter",
+            f"inst414_model_reload_errors_total {slot.errors}",
+            "# TYPE inst414_model_info gauge",
+            f'inst414_model_info{{version="{p.version}",name="{p.bundle["name"]}"}} 1',
+            "# TYPE inst414_uptime_seconds gauge",
+            f"inst414_uptime_seconds {time.monotonic() - self.started:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class ModelSlot:
+    """The ``Predictor`` currently serving, swapped whole when the model file changes.
+
+    ``save_model`` writes a temp file and renames it over ``model.pkl``, so
+    the file is always a complete bundle; a changed inode, size or mtime
+    triggers a load off the event loop, and only a bundle that loads and
+    matches ``MODEL_FEATURES`` replaces the serving one. Batches already
+    running keep the predictor they started with.
+    """
+
+    def __init__(self, path: Path = MODELS_DIR / "model.pkl", threshold: float = 0.5):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.key = self._key()
+        self.predictor = Predictor(self.path, threshold)
+        self.loaded = datetime.now(UTC)
+        self.reloads = self.errors = 0
+
+    def _key(self) -> tuple[int, int, int]:
+        st = self.path.stat()
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    async def check(self) -> bool:
+        """Load the model file if it changed since the last check; True if swapped."""
+        try:
+            key = self._key()
+        except FileNotFoundError:
+            return False
+        if key == self.key:
+            return False
+        self.key = key  # a broken file is tried once, not on every tick
+        loop = asyncio.get_running_loop()
+        try:
+            predictor = await loop.run_in_executor(None, Predictor, self.path, self.threshold)
+        except Exception as e:  # noqa: BLE001 - keep serving the old model
+            self.errors += 1
+            logger.warning(f"Kept model {self.predictor.version}; reload failed: {e!r}")
+            return False
+        old, self.predictor, self.loaded = self.predictor.version, predictor, datetime.now(UTC)
+        self.reloads += 1
+        logger.info(f"Reloaded {self.path.name}: {old} -> {predictor.version}")
+        return True
+
+    async def watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+
+@dataclass
+class _Pending:
+    records: list[dict]
+    future: asyncio.Future
+    queued: float = field(default_factory=time.perf_counter)
+
+    def fail(self, exc: Exception):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class Batcher:
+    """Coalesces concurrent ``/predict`` requests into one ``predict_batch`` call.
+
+    A batch starts with the oldest queued request and takes whatever else
+    arrives within ``max_wait`` seconds, up to ``max_rows`` records (a
+    larger request is scored alone). The model runs on a worker thread, so
+    requests keep queueing while a batch is scored and the next batch grows
+    with the load.
+    """
+
+    def __init__(self, slot: ModelSlot, metrics: Metrics, max_rows: int, max_wait: float):
+        self.slot, self.metrics = slot, metrics
+        self.max_rows, self.max_wait = max_rows, max_wait
+        self.queue: asyncio.Queue[_Pending] = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="score")
+
+    async def submit(self, records: list[dict]) -> tuple[np.ndarray, Predictor]:
+        """Probabilities for ``records`` and the predictor that produced them."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(_Pending(records, future))
+        return await future
+
+    async def _collect(self) -> list[_Pending]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        rows, deadline = len(batch[0].records), loop.time() + self.max_wait
+        while rows < self.max_rows:
+            if self.queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            batch.append(item)
+            rows += len(item.records)
+        return batch
+
+    async def _score(self, batch: list[_Pending], predictor: Predictor):
+        records = [rec for item in batch for rec in item.records]
+        t0 = time.perf_counter()
+        proba = await asyncio.get_running_loop().run_in_executor(
+            self.executor, predictor.predict_batch, records
+        )
+        self.metrics.observe_batch(len(records), len(batch), time.perf_counter() - t0)
+        bounds = np.cumsum([len(item.records) for item in batch])[:-1]
+        for item, part in zip(batch, np.split(proba, bounds)):
+            if not item.future.done():  # the client may have gone away
+                item.future.set_result((part, predictor))
+
+    async def run(self):
+        while True:
+            batch = await self._collect()
+            predictor = self.slot.predictor  # one model per batch, even mid-reload
+            try:
+                await self._score(batch, predictor)
+                continue
+            except Exception as e:  # noqa: BLE001 - fail requests, not the server
+                if len(batch) == 1:
+                    batch[0].fail(e)
+                    continue
+            # one bad request must not fail the others: score them one by one
+            for item in batch:
+                try:
+                    await self._score([item], predictor)
+                except Exception as e:  # noqa: BLE001
+                    item.fail(e)
+
+
+def check_records(records) -> str | None:
+    """Why ``records`` cannot be scored, or None if their model inputs have the right types."""
+    if not isinstance(records, list) or not records:
+        return "expected a record object, a list of them or {'records': [...]}"
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            return f"record {i} is not an object"
+        for col in MODEL_NUMERIC:
+            value = rec.get(col)
+            if isinstance(value, bool) or not isinstance(value, int | float):
+                return f"record {i}: {col} must be a number, got {value!r}"
+            try:
+                finite = math.isfinite(float(value))
+            except OverflowError:  # an int too large for float64
+                finite = False
+            if not finite:
+                return f"record {i}: {col} must be a finite number, got {value!r}"
+        for col in ("platform_group", "platform_primary"):
+            value = rec.get(col)
+            if value is not None and not isinstance(value, str):
+                return f"record {i}: {col} must be a string or null, got {value!r}"
+    return None
+
+
+def _response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _json(status: int, payload) -> tuple[int, bytes, str]:
+    return status, json.dumps(payload).encode(), "application/json"
+
+
+class ScoringServer:
+    """asyncio HTTP/1.1 server for ``acad_impact`` risk scores.
+
+    - ``POST /predict``: a clean-schema record (as for
+      ``Predictor.predict_batch``), a list of them or ``{"records": [...]}``;
+      answers probabilities, 0/1 predictions and the model version.
+    - ``GET /metrics``: Prometheus text with latency and batch-size
+      histograms, request counts and rows/s and requests/s throughput.
+    - ``GET /healthz``: the model being served.
+
+    Connections are kept alive; concurrent requests are scored together by
+    the ``Batcher`` and the model file is watched by the ``ModelSlot``.
+    """
+
+    def __init__(
+        self,
+        model_path: Path = MODELS_DIR / "model.pkl",
+        max_batch: int = 512,
+        max_wait_ms: float = 2.0,
+        reload_interval: float = 1.0,
+    ):
+        self.slot = ModelSlot(model_path)
+        self.metrics = Metrics()
+        self.batcher = Batcher(self.slot, self.metrics, max_batch, max_wait_ms / 1e3)
+        self.reload_interval = reload_interval
+        self.server: asyncio.Server | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8414) -> "ScoringServer":
+        self._tasks = [
+            asyncio.create_task(self.batcher.run()),
+            asyncio.create_task(self.slot.watch(self.reload_interval)),
+        ]
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self._writers):  # idle keep-alive connections
+                writer.close()
+            await self.server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.batcher.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                t0 = time.perf_counter()
+                try:
+                    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                    method, target, version = request_line.split(" ")
+                    headers = {
+                        k.strip().lower(): v.strip()
+                        for k, _, v in (line.partition(":") for line in header_lines if line)
+                    }
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    writer.write(_response(400, b"", "text/plain", False))
+                    break
+                if length > MAX_BODY:
+                    writer.write(_response(413, b"", "text/plain", False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                path = target.split("?", 1)[0]
+                status, payload, content_type = await self.route(method, path, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection") != "close"
+                writer.write(_response(status, payload, content_type, keep_alive))
+                await writer.drain()
+                self.metrics.observe_request(path, status, time.perf_counter() - t0)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple[int, bytes, str]:
+        routes = {"/predict": "POST", "/metrics": "GET", "/healthz": "GET"}
+        if path not in routes:
+            return _json(404, {"error": f"no route {path}"})
+        if method != routes[path]:
+            return _json(405, {"error": f"{path} takes {routes[path]}"})
+        if path == "/metrics":
+            text = self.metrics.render(self.slot, self.batcher.queue.qsize())
+            return 200, text.encode(), "text/plain; version=0.0.4"
+        if path == "/healthz":
+            p = self.slot.predictor
+            info = {"model": str(self.slot.path), "version": p.version, "name": p.bundle["name"]}
+            return _json(200, info | {"loaded": self.slot.loaded.isoformat(timespec="seconds")})
+        return await self.predict(body)
+
+    async def predict(self, body: bytes) -> tuple[int, bytes, str]:
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return _json(400, {"error": f"invalid JSON: {e}"})
+        single = isinstance(payload, dict) and "records" not in payload
+        records = [payload] if single else payload
+        if isinstance(payload, dict) and not single:
+            records = payload["records"]
+        error = check_records(records)
+        if error:
+            return _json(400, {"error": error})
+        try:
+            proba, predictor = await self.batcher.submit(records)
+        except ValueError as e:  # e.g. a NaN input (predict_batch rejects it)
+            return _json(400, {"error": str(e)})
+        except Exception as e:  # noqa: BLE001 - report, keep the connection
+            logger.error(f"Scoring failed: {e!r}")
+            return _json(500, {"error": f"scoring failed: {e}"})
+        pred = (proba >= predictor.threshold).astype(int)
+        if single:
+            out = {"acad_impact_proba": float(proba[0]), "acad_impact_pred": int(pred[0])}
+        else:
+            out = {"acad_impact_proba": proba.tolist(), "acad_impact_pred": pred.tolist()}
+        return _json(200, out | {"model_version": predictor.version})
+
+
+class ScoreClient:
+    """Keep-alive HTTP/1.1 client for a ``ScoringServer`` (tests and load tests)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8414):
+        self.host, self.port = host, port
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.writer.close()
+        with suppress(ConnectionError):
+            await self.writer.wait_closed()
+
+    async def request(self, method: str, path: str, payload=None) -> tuple[int, bytes]:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        status = int(head.split(" ", 2)[1])
+        length = next(
+            int(line.split(":", 1)[1])
+            for line in head.split("\r\n")
+            if line.lower().startswith("content-length:")
+        )
+        return status, await self.reader.readexactly(length)
+
+    async def score(self, records: list[dict]) -> dict:
+        status, body = await self.request("POST", "/predict", {"records": records})
+        if status != HTTPStatus.OK:
+            raise RuntimeError(f"/predict answered {status}: {body.decode()}")
+        return json.loads(body)
+
+
+async def serve(server: ScoringServer, host: str, port: int):
+    await server.start(host, port)
+    logger.success(
+        f"Serving {server.slot.path.name} ({server.slot.predictor.version}) "
+        f"on http://{host}:{server.port} (POST /predict, GET /metrics, GET /healthz)"
+    )
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+@app.command()
+def main(
+    model_path: Path = MODELS_DIR / "model.pkl",
+    host: str = "127.0.0.1",
+    port: int = 8414,
+    max_batch: int = typer.Option(512, help="Most records scored in one model call."),
+    max_wait_ms: float = typer.Option(2.0, help="How long a batch waits for more requests."),
+    reload_interval: float = typer.Option(1.0, help="Seconds between model file checks."),
+):
+    if not model_path.exists():
+        raise typer.BadParameter(f"{model_path} not found; run `inst414 train` first")
+    server = ScoringServer(model_path, max_batch, max_wait_ms, reload_interval)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(server, host, port))
+    logger.info("Server stopped.")
+
+
+if __name__ == "__main__":
+    setup()
+    app()
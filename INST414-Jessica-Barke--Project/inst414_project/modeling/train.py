@@ -1,30 +1,348 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+from dataclasses import dataclass
+from itertools import product
+from multiprocessing.shared_memory import SharedMemory
+import os
 from pathlib import Path
+import pickle
+import time
+from typing import Annotated
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
 import typer
 
-from inst414_project.config import MODELS_DIR, PROCESSED_DATA_DIR
+from inst414_project.config import CLEAN_DATA_DIR, MODELS_DIR, REPORTS_DIR, setup
+from inst414_project.features import (
+    FEATURE_STORE_DIR,
+    MODEL_FEATURES,
+    MODEL_TARGET,
+    FeatureSet,
+    fit_scaler,
+    load_features,
+    model_matrix,
+    model_target,
+    standardize,
+)
+from inst414_project.perf import track
 
 app = typer.Typer()
 
+# Hyperparameter candidates per model; every combination is cross-validated.
+PARAM_GRIDS = {
+    "logistic": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "gbm": {"learning_rate": [0.05, 0.1], "max_depth": [3, 6], "max_iter": [200]},
+}
+
+
+def make_model(name: str, params: dict):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if name == "logistic":
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, **params))
+    if name == "gbm":
+        # histogram boosting bins features once, so it scales to millions of rows
+        return HistGradientBoostingClassifier(random_state=0, **params)
+    raise ValueError(f"unknown model: {name}")
+
+
+def candidates(models: list[str] | None = None) -> list[tuple[str, dict]]:
+    out = []
+    for name in models or list(PARAM_GRIDS):
+        grid = PARAM_GRIDS[name]
+        out += [(name, dict(zip(grid, vals))) for vals in product(*grid.values())]
+    return out
+
+
+# ---- shared-memory arrays: built once in the parent, mapped by every worker ----
+@dataclass(frozen=True)
+class SharedArray:
+    """Picklable handle for a NumPy array held in a named shared-memory block."""
+
+    name: str
+    shape: tuple
+    dtype: str
+
+    @classmethod
+    def create(cls, arr: np.ndarray) -> tuple["SharedArray", SharedMemory]:
+        shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+        return cls(shm.name, arr.shape, arr.dtype.str), shm
+
+    def attach(self) -> tuple[np.ndarray, SharedMemory]:
+        shm = SharedMemory(name=self.name)
+        return np.ndarray(self.shape, self.dtype, buffer=shm.buf), shm
+
+
+@dataclass(frozen=True)
+class MappedArray:
+    """Picklable handle for an array already on disk as ``.npy`` (e.g. a feature version)."""
+
+    path: Path
+
+    def attach(self) -> tuple[np.ndarray, None]:
+        return np.load(self.path, mmap_mode="r"), None
+
+
+_ARRAYS: dict[str, np.ndarray] = {}
+_BLOCKS: list[SharedMemory] = []  # keep worker mappings alive
+
+
+def _init_worker(handles: dict[str, SharedArray]):
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)  # one process per core; no nested BLAS/OpenMP threads
+    for key, handle in handles.items():
+        arr, shm = handle.attach()
+        _ARRAYS[key] = arr
+        if shm is not None:
+            _BLOCKS.append(shm)
+
+
+def fit_fold(name: str, params: dict, fold: int) -> dict:
+    """Fit one candidate on all folds but ``fold`` and score it on ``fold``."""
+    from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+
+    x, y, folds = _ARRAYS["x"], _ARRAYS["y"], _ARRAYS["folds"]
+    held_out = folds == fold
+    t0 = time.perf_counter()
+    model = make_model(name, params).fit(x[~held_out], y[~held_out])
+    fit_s = time.perf_counter() - t0
+    y_val = y[held_out]
+    proba = model.predict_proba(x[held_out])[:, 1]
+    return {
+        "model": name,
+        "params": repr(params),
+        "fold": fold,
+        "n_train": int((~held_out).sum()),
+        "n_val": int(held_out.sum()),
+        "roc_auc": roc_auc_score(y_val, proba) if len(np.unique(y_val)) > 1 else np.nan,
+        "accuracy": accuracy_score(y_val, proba >= 0.5),
+        "log_loss": log_loss(y_val, proba, labels=[0, 1]),
+        "fit_s": fit_s,
+        "score_s": time.perf_counter() - t0 - fit_s,
+    }
+
+
+def assign_folds(y: np.ndarray, n_folds: int, seed: int = 0) -> np.ndarray:
+    """Stratified fold id per row (int8), so workers need no index arrays."""
+    from sklearn.model_selection import StratifiedKFold
+
+    folds = np.empty(len(y), dtype="int8")
+    skf = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for k, (_, idx) in enumerate(skf.split(np.zeros(len(y)), y)):
+        folds[idx] = k
+    return folds
+
+
+def _log_fold(r: dict):
+    logger.info(
+        f"{r['model']} {r['params']} fold {r['fold']}: auc={r['roc_auc']:.4f} "
+        f"fit={r['fit_s']:.2f}s score={r['score_s']:.2f}s"
+    )
+
+
+@track("train.search")
+def search(
+    x: np.ndarray,
+    y: np.ndarray,
+    cands: list[tuple[str, dict]],
+    n_folds: int = 5,
+    max_workers: int | None = None,
+    time_budget: float | None = None,
+    seed: int = 0,
+    mapped: dict[str, Path] | None = None,
+) -> pd.DataFrame:
+    """Cross-validate every candidate; one (candidate, fold) fit per task.
+
+    ``x``, ``y`` and the fold ids are copied into shared memory once and
+    mapped read-only by the workers; arrays named in ``mapped`` are
+    already whole ``.npy`` files, which the workers memory-map instead.
+    ``time_budget`` (seconds) is a soft limit: once it runs out no new fit
+    starts and queued ones are cancelled, but the fits already running
+    finish and are waited for, so the search can overrun it by up to one
+    fit. Returns one row per completed fit.
+    """
+    arrays = {"x": x, "y": y, "folds": assign_folds(y, n_folds, seed)}
+    tasks = [(name, params, k) for name, params in cands for k in range(n_folds)]
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    results = []
+    if max_workers == 1:
+        _ARRAYS.update(arrays)
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        try:
+            for task in tasks:
+                if deadline and time.perf_counter() > deadline:
+                    logger.warning("Time budget exhausted; skipping remaining fits")
+                    break
+                results.append(fit_fold(*task))
+                _log_fold(results[-1])
+        finally:
+            _ARRAYS.clear()
+        return pd.DataFrame(results)
+
+    handles, blocks = {}, []
+    try:
+        for key, arr in arrays.items():
+            if key in (mapped or {}):
+                handles[key] = MappedArray(mapped[key])
+                continue
+            handles[key], shm = SharedArray.create(arr)
+            blocks.append(shm)
+        pool = ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(handles,))
+        with pool:
+            futures = [pool.submit(fit_fold, *task) for task in tasks]
+            pending = set(futures)
+            try:
+                for fut in as_completed(futures, timeout=time_budget):
+                    pending.discard(fut)
+                    results.append(fut.result())
+                    _log_fold(results[-1])
+            except TimeoutError:
+                logger.warning("Time budget exhausted; cancelling queued fits")
+                pool.shutdown(wait=True, cancel_futures=True)
+                for fut in futures:
+                    if fut in pending and not fut.cancelled():
+                        results.append(fut.result())
+                        _log_fold(results[-1])
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return pd.DataFrame(results)
+
+
+def summarize(folds: pd.DataFrame, n_folds: int) -> pd.DataFrame:
+    """Mean/std of fold metrics per candidate; candidates missing folds are dropped."""
+    grp = folds.groupby(["model", "params"], sort=False)
+    out = grp.agg(
+        folds=("fold", "size"),
+        roc_auc=("roc_auc", "mean"),
+        roc_auc_std=("roc_auc", "std"),
+        accuracy=("accuracy", "mean"),
+        log_loss=("log_loss", "mean"),
+        fit_s=("fit_s", "sum"),
+    ).reset_index()
+    out = out[out["folds"] == n_folds]
+    return out.sort_values(["roc_auc", "log_loss"], ascending=[False, True], ignore_index=True)
+
+
+def design(data: FeatureSet | pd.DataFrame, sample: int = 0, seed: int = 0):
+    """(x, y, scaler, mapped) for ``train`` from a feature version or a clean frame.
+
+    A ``FeatureSet`` is used as is: its memory-mapped matrix is handed to
+    the workers by path unless rows had to be dropped or sampled.
+    """
+    if isinstance(data, FeatureSet):
+        x, y, scaler = data.x, data.y, data.scaler
+        mapped = {"x": data.path / "x.npy", "y": data.path / "y.npy"}
+        keep = (y >= 0) & ~np.isnan(x).any(axis=1)
+    else:
+        x = model_matrix(data)
+        scaler = fit_scaler(x)
+        standardize(x, scaler)
+        y, mapped = model_target(data), None
+        keep = ~np.isnan(x).any(axis=1) & data[MODEL_TARGET].notna().to_numpy()
+    rows = None
+    if not keep.all():
+        logger.warning(f"Dropping {int((~keep).sum())} rows with missing features/target")
+        rows = np.flatnonzero(keep)
+    if sample and int(keep.sum()) > sample:
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(np.flatnonzero(keep), sample, replace=False))
+    if rows is not None:
+        x, y, mapped = x[rows], y[rows], None
+    return x, y, scaler, mapped
+
+
+@track("train")
+def train(
+    data: FeatureSet | pd.DataFrame,
+    models: list[str] | None = None,
+    n_folds: int = 5,
+    max_workers: int | None = None,
+    time_budget: float | None = None,
+    seed: int = 0,
+    sample: int = 0,
+) -> tuple[dict, pd.DataFrame]:
+    """Grid search with CV, then refit the best candidate on all rows.
+
+    ``data`` is a feature version (see ``features.load_features``) or a
+    clean frame, standardized here; ``sample`` > 0 trains on that many
+    random rows. ``time_budget`` bounds only the search (see ``search``);
+    the final refit is not limited. Returns the model bundle (what
+    ``model.pkl`` holds) and the per-fold results.
+    """
+    x, y, scaler, mapped = design(data, sample, seed)
+    logger.info(f"Design matrix: {x.shape[0]} rows x {x.shape[1]} features")
+
+    t0 = time.perf_counter()
+    folds = search(x, y, candidates(models), n_folds, max_workers, time_budget, seed, mapped)
+    table = summarize(folds, n_folds) if len(folds) else folds
+    if not len(table):
+        raise RuntimeError("no candidate finished all folds within the time budget")
+    logger.info(f"Search finished in {time.perf_counter() - t0:.1f}s\n{table.to_string()}")
+
+    best = table.iloc[0]
+    params = next(
+        p for n, p in candidates(models) if n == best["model"] and repr(p) == best["params"]
+    )
+    t0 = time.perf_counter()
+    model = make_model(best["model"], params).fit(x, y)
+    logger.info(
+        f"Refit {best['model']} {params} on {len(y)} rows in {time.perf_counter() - t0:.1f}s"
+    )
+    bundle = {
+        "model": model,
+        "name": best["model"],
+        "params": params,
+        "features": MODEL_FEATURES,
+        "scaler": scaler,
+        "feature_version": data.version if isinstance(data, FeatureSet) else None,
+        "target": MODEL_TARGET,
+        "cv": table.to_dict("records"),
+        "n_rows": len(y),
+    }
+    return bundle, folds
+
+
+def save_model(bundle: dict, path: Path = MODELS_DIR / "model.pkl"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(bundle, f)
+    tmp.replace(path)
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    labels_path: Path = PROCESSED_DATA_DIR / "labels.csv",
+    input_path: Path = CLEAN_DATA_DIR / "primary_clean.parquet",
+    features_dir: Path = FEATURE_STORE_DIR,
     model_path: Path = MODELS_DIR / "model.pkl",
-    # -----------------------------------------
+    results_path: Path = REPORTS_DIR / "model_cv_results.csv",
+    model: Annotated[list[str] | None, typer.Option(help="Model families; default all.")] = None,
+    folds: int = typer.Option(5, help="Cross-validation folds."),
+    workers: int = typer.Option(0, help="Worker processes; 0 = one per core."),
+    time_budget: float = typer.Option(
+        0, help="Seconds after which the search starts no new fits; 0 = no limit."
+    ),
+    sample: int = typer.Option(0, help="Train on a random sample of this many rows; 0 = all."),
+    seed: int = 0,
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Training some model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Modeling training complete.")
-    # -----------------------------------------
+    logger.info("Training acad_impact models...")
+    fs = load_features(source=input_path, root=features_dir)
+    bundle, fold_results = train(
+        fs, model, folds, workers or None, time_budget or None, seed, sample
+    )
+    save_model(bundle, model_path)
+    fold_results.to_csv(results_path, index=False)
+    logger.success(f"Saved {model_path} ({bundle['name']}) and {results_path}")
 
 
 if __name__ == "__main__":
+    setup()
     app()
@@ -0,0 +1,243 @@
+import atexit
+from contextlib import ContextDecorator
+import cProfile
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import re
+import resource
+import sys
+import threading
+import time
+import uuid
+
+from loguru import logger
+
+from inst414_project.config import REPORTS_DIR
+
+# Every process of one pipeline run shares the run id (start_run exports it to
+# the stage subprocesses), so their stages land in the same summary.
+RUN_ID = os.environ.get("INST414_RUN_ID") or uuid.uuid4().hex[:12]
+# Summary path; set INST414_PERF_SUMMARY="" to disable writing it.
+_summary_env = os.environ.get("INST414_PERF_SUMMARY", str(REPORTS_DIR / "perf_summary.json"))
+PERF_SUMMARY = Path(_summary_env) if _summary_env else None
+PROFILE_DIR = Path(os.environ.get("INST414_PROFILE_DIR", REPORTS_DIR / "profiles"))
+# Comma-separated stage names (or "*") to run under cProfile.
+PROFILE_STAGES = {s for s in os.environ.get("INST414_PROFILE", "").split(",") if s}
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 1024**2 if hasattr(os, "sysconf") else 0
+_records: list[dict] = []
+_local = threading.local()  # per-thread stack of open stages
+_profiling = False
+_summary_on = False
+
+
+def _rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except OSError:
+        return None
+
+
+def _io() -> tuple[int, int] | None:
+    """Bytes read/written through syscalls (rchar/wchar), or None off Linux."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class _RssSampler:
+    """One background thread that raises every open stage's peak RSS."""
+
+    interval = 0.01
+
+    def __init__(self):
+        self.open: set = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, stage):
+        with self.lock:
+            self.open.add(stage)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True, name="rss-sampler")
+                self.thread.start()
+
+    def discard(self, stage):
+        with self.lock:
+            self.open.discard(stage)
+
+    def _run(self):
+        while True:
+            rss = _rss_mb()
+            with self.lock:
+                if not self.open or rss is None:
+                    self.thread = None
+                    return
+                for stage in self.open:
+                    stage.peak_rss_mb = max(stage.peak_rss_mb, rss)
+            time.sleep(self.interval)
+
+
+_sampler = _RssSampler()
+
+
+class track(ContextDecorator):
+    """Measure a pipeline stage or sub-step.
+
+    Use as ``with track("clean.scan", rows_in=n) as t: ...; t.rows_out = m``
+    or as a decorator. On exit one JSON event (wall/CPU time including
+    reaped worker processes, peak RSS, rows in/out, bytes read/written) is
+    logged through loguru and kept for ``reports/perf_summary.json``.
+    Stages named in ``INST414_PROFILE`` (or all, with ``*``) also dump a
+    cProfile ``.prof`` file to ``reports/profiles``.
+    """
+
+    def __init__(self, name: str, rows_in: int | None = None, profile: bool | None = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.profile = profile
+
+    def _recreate_cm(self):  # fresh state for every decorated call
+        return type(self)(self.name, self.rows_in, self.profile)
+
+    def __enter__(self):
+        global _profiling
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.started = datetime.now(UTC)
+        self.peak_rss_mb = self.rss_start_mb = _rss_mb() or 0.0
+        self._io = _io()
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._cpu = time.process_time()
+        self._prof = None
+        wanted = "*" in PROFILE_STAGES or self.name in PROFILE_STAGES
+        if (wanted if self.profile is None else self.profile) and not _profiling:
+            _profiling = True
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+        _sampler.add(self)
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _profiling
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        _sampler.discard(self)
+        _local.stack.pop()
+        kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rss = _rss_mb()
+        record = {
+            "run_id": RUN_ID,
+            "pid": os.getpid(),
+            "stage": self.name,
+            "parent": self.parent,
+            "started": self.started.isoformat(timespec="milliseconds"),
+            "status": "ok" if exc_type is None else f"error: {exc_type.__name__}",
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "children_cpu_s": round(
+                kids.ru_utime + kids.ru_stime - self._children.ru_utime - self._children.ru_stime,
+                4,
+            ),
+            "peak_rss_mb": round(max(self.peak_rss_mb, rss or 0.0), 1),
+            "rss_delta_mb": round((rss or 0.0) - self.rss_start_mb, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+        end_io = _io()
+        if self._io and end_io:
+            record["bytes_read"] = end_io[0] - self._io[0]
+            record["bytes_written"] = end_io[1] - self._io[1]
+        if self._prof is not None:
+            self._prof.disable()
+            _profiling = False
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r"[^\w.-]+", "_", self.name)
+            path = PROFILE_DIR / f"{slug}-{RUN_ID}-{os.getpid()}.prof"
+            self._prof.dump_stats(path)
+            record["profile"] = str(path)
+        _records.append(record)
+        if "INST414_RUN_ID" in os.environ:  # a stage of a pipeline run
+            enable_summary()
+        logger.bind(perf=True).info(json.dumps(record))
+        return False
+
+
+def records() -> list[dict]:
+    return list(_records)
+
+
+def write_summary(path: Path | None = PERF_SUMMARY) -> Path | None:
+    """Merge this process's stage records into the run's summary file.
+
+    Processes of the same run (same ``INST414_RUN_ID``) add to the file; a
+    new run replaces it. Stages are also rolled up by name, slowest first.
+    """
+    if not _records or path is None:
+        return None
+    import fcntl
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.parent / f".{path.name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        summary = {}
+        if path.exists():
+            try:
+                summary = json.loads(path.read_text())
+            except ValueError:
+                summary = {}
+        if summary.get("run_id") != RUN_ID:
+            summary = {"run_id": RUN_ID, "processes": {}, "stages": []}
+        summary["updated"] = datetime.now(UTC).isoformat(timespec="seconds")
+        summary["processes"][str(os.getpid())] = sys.argv
+        summary["stages"] = [r for r in summary["stages"] if r["pid"] != os.getpid()] + _records
+        totals = {}
+        for r in summary["stages"]:
+            t = totals.setdefault(
+                r["stage"], dict.fromkeys(["calls", "wall_s", "cpu_s", "peak_rss_mb"], 0)
+            )
+            t["calls"] += 1
+            t["wall_s"] = round(t["wall_s"] + r["wall_s"], 4)
+            t["cpu_s"] = round(t["cpu_s"] + r["cpu_s"] + r["children_cpu_s"], 4)
+            t["peak_rss_mb"] = max(t["peak_rss_mb"], r["peak_rss_mb"])
+        summary["by_stage"] = dict(sorted(totals.items(), key=lambda kv: -kv[1]["wall_s"]))
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(summary, indent=2) + "\n")
+        tmp.replace(path)
+    return path
+
+
+def _write_at_exit():
+    try:
+        write_summary()
+    except OSError as e:
+        logger.warning(f"Could not write {PERF_SUMMARY}: {e}")
+
+
+def enable_summary():
+    """Write this process's records to ``PERF_SUMMARY`` when it exits.
+
+    Off until an entry point asks for it (``config.setup`` does), so
+    importing the package in tests, benchmarks or a REPL never touches the
+    summary.
+    """
+    global _summary_on
+    if not _summary_on:
+        _summary_on = True
+        atexit.register(_write_at_exit)
+
+
+def start_run():
+    """Make this process the parent of a run: subprocesses join its summary."""
+    os.environ["INST414_RUN_ID"] = RUN_ID
+    enable_summary()
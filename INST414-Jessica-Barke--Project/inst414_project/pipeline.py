@@ -0,0 +1,285 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+import time
+from typing import Annotated
+
+from loguru import logger
+import typer
+
+from inst414_project.cache import (
+    SPRINT2_STAGES,
+    Stage,
+    StageCache,
+    _rel,
+    commit,
+    reuse,
+    run_stage,
+)
+from inst414_project.config import REPORTS_DIR, setup
+from inst414_project.perf import RUN_ID, start_run, track
+
+app = typer.Typer()
+
+RUN_REPORT = REPORTS_DIR / "pipeline_run.json"
+
+
+class Graph:
+    """Stages keyed by name with their dependency edges; unknown deps and cycles raise."""
+
+    def __init__(self, stages: list[Stage]):
+        self.stages = {s.name: s for s in stages}
+        self.children: dict[str, list[str]] = {name: [] for name in self.stages}
+        for s in stages:
+            for dep in s.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"{s.name} depends on unknown stage {dep!r}")
+                self.children[dep].append(s.name)
+        self.order = self._toposort()
+
+    def _toposort(self) -> list[str]:
+        waiting = {name: len(s.deps) for name, s in self.stages.items()}
+        ready = [name for name, n in waiting.items() if n == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in self.children[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.stages):
+            raise ValueError(f"dependency cycle among {sorted(set(self.stages) - set(order))}")
+        return order
+
+    def _closure(self, names, edges) -> set[str]:
+        seen, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in seen:
+                seen.add(name)
+                stack.extend(edges(name))
+        return seen
+
+    def ancestors(self, names) -> set[str]:
+        """``names`` and everything they depend on."""
+        return self._closure(names, lambda n: self.stages[n].deps)
+
+    def descendants(self, names) -> set[str]:
+        """``names`` and everything that depends on them."""
+        return self._closure(names, lambda n: self.children[n])
+
+    def rank(self, cost: dict[str, float]) -> dict[str, float]:
+        """Longest cost from each stage to the end of the graph, the stage included."""
+        out = {}
+        for name in reversed(self.order):
+            out[name] = cost.get(name, 0.0) + max((out[c] for c in self.children[name]), default=0)
+        return out
+
+    def critical_path(self, cost: dict[str, float]) -> tuple[list[str], float]:
+        """The dependency chain with the largest total cost, and that cost."""
+        finish, prev = {}, {}
+        for name in self.order:
+            prev[name] = max(self.stages[name].deps, key=finish.get, default=None)
+            finish[name] = cost.get(name, 0.0) + (finish[prev[name]] if prev[name] else 0.0)
+        if not finish:
+            return [], 0.0
+        name = max(self.order, key=finish.get)
+        total, path = finish[name], []
+        while name:
+            path.append(name)
+            name = prev[name]
+        return path[::-1], total
+
+
+@dataclass
+class NodeRun:
+    """What one stage did in a run; ``start``/``end`` are seconds from the run start."""
+
+    name: str
+    status: str = "pending"  # running | ran | fresh | restored | missing | failed | blocked
+    start: float = 0.0
+    end: float = 0.0
+    error: str = ""
+
+    @property
+    def wall_s(self) -> float:
+        return self.end - self.start
+
+
+@track("pipeline")
+def run_dag(
+    stages: list[Stage],
+    cache: StageCache,
+    force: set[str] | bool = False,
+    max_workers: int | None = None,
+) -> dict[str, NodeRun]:
+    """Run ``stages`` as a DAG: each starts as soon as its ``deps`` have finished.
+
+    Stages run as subprocesses on a thread pool (``max_workers``, default
+    one thread per stage, so every ready branch runs at once). Fresh stages
+    are skipped and cached outputs restored, so a rerun resumes at the
+    first failed or stale stage. ``force`` (a set of names, or True for all)
+    re-runs stages regardless. Among ready stages the one with the longest
+    remaining path, by each stage's last recorded time, starts first. A
+    failed stage blocks everything downstream of it; other branches go on.
+    """
+    graph = Graph(stages)
+    force = set(graph.stages) if force is True else set(force or ())
+    rank = graph.rank({name: cache.last_wall(name) for name in graph.stages})
+    runs = {name: NodeRun(name) for name in graph.order}
+    waiting = {name: set(s.deps) for name, s in graph.stages.items()}
+    ready = [name for name in graph.order if not waiting[name]]
+    running, fps = {}, {}
+    t0 = time.perf_counter()
+
+    def finish(name: str, status: str, error: str = ""):
+        run = runs[name]
+        run.status, run.error, run.end = status, error, time.perf_counter() - t0
+        if status == "failed":
+            for child in graph.descendants([name]) - {name}:
+                runs[child].status = "blocked"
+            return
+        for child in graph.children[name]:
+            waiting[child].discard(name)
+            if not waiting[child] and runs[child].status == "pending":
+                ready.append(child)
+
+    with ThreadPoolExecutor(max_workers or len(graph.stages) or 1) as pool:
+        while ready or running:
+            while ready:
+                ready.sort(key=rank.get, reverse=True)
+                name = ready.pop(0)
+                stage = graph.stages[name]
+                runs[name].start = time.perf_counter() - t0
+                state, fps[name] = reuse(stage, cache, name in force)
+                if state:
+                    finish(name, state)
+                    continue
+                logger.info(f"[{name}] running {_rel(stage.script)}")
+                runs[name].status = "running"
+                running[pool.submit(run_stage, stage)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                stage = graph.stages[name]
+                try:
+                    fut.result()
+                    commit(stage, cache, fps[name], time.perf_counter() - t0 - runs[name].start)
+                except Exception as e:  # noqa: BLE001 - a failed stage only stops its own branch
+                    level = "WARNING" if stage.optional else "ERROR"
+                    logger.log(level, f"[{name}] failed: {e}")
+                    finish(name, "failed", str(e))
+                else:
+                    finish(name, "ran")
+    cache.save()
+    return runs
+
+
+def report(graph: Graph, runs: dict[str, NodeRun], path: Path | None = RUN_REPORT) -> dict:
+    """Per-stage timing and the critical path of a run; logged and written to ``path``."""
+    crit, crit_s = graph.critical_path({name: r.wall_s for name, r in runs.items()})
+    out = {
+        "run_id": RUN_ID,
+        "finished": datetime.now(UTC).isoformat(timespec="seconds"),
+        "makespan_s": round(max((r.end for r in runs.values()), default=0.0), 3),
+        "serial_s": round(sum(r.wall_s for r in runs.values()), 3),
+        "critical_path": crit,
+        "critical_s": round(crit_s, 3),
+        "stages": [
+            asdict(r) | {"wall_s": round(r.wall_s, 3), "on_critical_path": r.name in crit}
+            for r in sorted(runs.values(), key=lambda r: (r.status == "blocked", r.start))
+        ],
+    }
+    lines = [f"{'stage':<24}{'status':<10}{'start_s':>9}{'wall_s':>9}"]
+    for r in out["stages"]:
+        mark = " *" if r["on_critical_path"] else ""
+        lines.append(
+            f"{r['name']:<24}{r['status']:<10}{r['start']:>9.2f}{r['wall_s']:>9.2f}{mark}"
+        )
+    logger.info("Stage timing (* = critical path):\n" + "\n".join(lines))
+    logger.info(
+        f"Critical path: {' -> '.join(crit)} ({out['critical_s']:.1f}s of "
+        f"{out['makespan_s']:.1f}s wall, {out['serial_s']:.1f}s if run serially)"
+    )
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(out, indent=1))
+        tmp.replace(path)
+    return out
+
+
+def _check(graph: Graph, names: list[str] | None) -> list[str]:
+    unknown = [n for n in names or [] if n not in graph.stages]
+    if unknown:
+        raise typer.BadParameter(
+            f"unknown stage(s): {', '.join(unknown)}; known: {list(graph.stages)}"
+        )
+    return names or []
+
+
+def select(graph: Graph, names: list[str] | None) -> list[Stage]:
+    """The named stages plus everything upstream of them (all stages when none named)."""
+    keep = graph.ancestors(_check(graph, names)) if names else set(graph.stages)
+    return [graph.stages[name] for name in graph.order if name in keep]
+
+
+@app.command()
+def run(
+    stages: Annotated[
+        list[str] | None, typer.Argument(help="Target stages (with their upstream); default all.")
+    ] = None,
+    force: bool = typer.Option(False, "--force", help="Re-run every selected stage."),
+    from_: Annotated[
+        list[str] | None,
+        typer.Option("--from", help="Re-run these stages and everything downstream."),
+    ] = None,
+    workers: int = typer.Option(0, help="Stages run at once; 0 = every ready stage."),
+    report_path: Path = RUN_REPORT,
+):
+    start_run()
+    graph = Graph(SPRINT2_STAGES)
+    selected = select(graph, stages)
+    forced = True if force else graph.descendants(_check(graph, from_))
+    runs = run_dag(selected, StageCache(), forced, workers or None)
+    report(Graph(selected), runs, report_path)
+    failed = [r.name for r in runs.values() if r.status == "failed"]
+    fatal = [name for name in failed if not graph.stages[name].optional]
+    blocked = [r.name for r in runs.values() if r.status == "blocked"]
+    if failed:
+        msg = f"Failed: {', '.join(failed)}" + (
+            f"; blocked: {', '.join(blocked)}" if blocked else ""
+        )
+        logger.log(
+            "ERROR" if fatal else "WARNING", f"{msg}. Re-run to resume at the failed stages."
+        )
+        if fatal:
+            raise typer.Exit(1)
+    logger.success("Pipeline up to date.")
+
+
+@app.command()
+def status():
+    """Each stage's dependencies, freshness and last recorded time."""
+    graph, cache = Graph(SPRINT2_STAGES), StageCache()
+    for name in graph.order:
+        stage = graph.stages[name]
+        if not stage.script.exists():
+            state = "missing script"
+        else:
+            state = "fresh" if cache.is_fresh(stage, cache.fingerprint(stage)) else "stale"
+        deps = ", ".join(stage.deps) or "-"
+        logger.info(f"{name:<24}{state:<16}{cache.last_wall(name, 0):>8.1f}s  <- {deps}")
+    crit, total = graph.critical_path({name: cache.last_wall(name, 0) for name in graph.stages})
+    logger.info(f"Critical path by last times: {' -> '.join(crit)} ({total:.1f}s)")
+    cache.save()
+
+
+if __name__ == "__main__":
+    setup()
+    app()
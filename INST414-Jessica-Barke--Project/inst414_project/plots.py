@@ -1,29 +1,521 @@
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+import os
 from pathlib import Path
+import pickle
+from typing import Annotated
 
 from loguru import logger
-from tqdm import tqdm
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
 import typer
 
-from inst414_project.config import FIGURES_DIR, PROCESSED_DATA_DIR
+from inst414_project.config import CLEAN_DATA_DIR, FIGURES_DIR, INTERIM_DATA_DIR, setup
+from inst414_project.dataset import CountSketch, clean_parts
+from inst414_project.features import PLATFORM_GROUPS, FeatureSet
+from inst414_project.perf import track
+from inst414_project.stats import GROUP_KEYS, STAT_COLS, Moments
 
 app = typer.Typer()
 
+FIGURE_AGGREGATES = INTERIM_DATA_DIR / "figure_aggregates.pkl"
+MAX_POINTS = 5_000  # rows kept for the scatter plot (and the optional missingness matrix)
+
+
+# ---- aggregate layer: one pass over the rows, then every figure renders from it ----
+class FigureAggregates:
+    """Everything the EDA figures need, independent of the number of rows.
+
+    - ``moments``: ``stats.Moments`` over ``STAT_COLS`` by heavy_user x
+      sleep_ok; its exact value-count sketches are the histogram bins,
+      and it also gives correlations, group means and the regression line.
+    - ``boxes``: value counts of ``acad_impact`` per ``platform_group``.
+    - ``nulls``: missing count per column.
+    - ``points``: a uniform sample of at most ``max_points`` rows.
+
+    Update with chunks and ``merge`` partial results, as with ``Moments``.
+    """
+
+    def __init__(self, max_points: int = MAX_POINTS, seed: int | None = 0):
+        self.rows = 0
+        self.moments = None
+        self.boxes: dict[str, CountSketch] = {}
+        self.nulls = pd.Series(dtype="int64")
+        self.max_points = max_points
+        self.points = None
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "FigureAggregates":
+        return cls(**kwargs).update(df)
+
+    def update(self, df: pd.DataFrame) -> "FigureAggregates":
+        self.rows += len(df)
+        cols = [c for c in STAT_COLS if c in df.columns]
+        if self.moments is None:
+            by = GROUP_KEYS if all(k in df.columns for k in GROUP_KEYS) else None
+            self.moments = Moments(cols, by)
+        self.moments.update(df)
+        if {"platform_group", "acad_impact"} <= set(df.columns):
+            for g, sub in df.groupby("platform_group", observed=True, sort=False):
+                self.boxes.setdefault(g, CountSketch()).update(sub["acad_impact"])
+        nulls = df.isna().sum()
+        self.nulls = nulls if self.nulls.empty else self.nulls.add(nulls, fill_value=0)
+        keys = self._rng.random(len(df))  # bottom-k priorities: a uniform sample
+        if self.points is not None and len(self.points) >= self.max_points:
+            cut = self.points["_key"].max()
+            df, keys = df[keys < cut], keys[keys < cut]
+        self._keep_points(df.assign(_key=keys))
+        return self
+
+    def _keep_points(self, rows: pd.DataFrame):
+        pool = rows if self.points is None else pd.concat([self.points, rows])
+        self.points = pool.nsmallest(self.max_points, "_key")
+
+    def merge(self, other: "FigureAggregates") -> "FigureAggregates":
+        self.rows += other.rows
+        if self.moments is None:
+            self.moments = other.moments
+        elif other.moments is not None:
+            self.moments.merge(other.moments)
+        for g, sk in other.boxes.items():
+            self.boxes.setdefault(g, CountSketch()).merge(sk)
+        self.nulls = self.nulls.add(other.nulls, fill_value=0) if len(self.nulls) else other.nulls
+        if other.points is not None:
+            self._keep_points(other.points)
+        return self
+
+    # ---- small tables the figures draw ----
+    def value_counts(self, col: str) -> tuple[np.ndarray, np.ndarray]:
+        return self.moments.sketches[self.moments.columns.index(col)].value_counts()
+
+    def missing(self) -> pd.Series:
+        """Fraction missing per column, as ``df.isna().mean()``."""
+        return self.nulls / max(self.rows, 1)
+
+    def fit_line(self, x: str, y: str, grid: int = 100) -> pd.DataFrame:
+        """OLS of ``y`` on ``x`` over all rows, with a 95% band for the mean."""
+        m = self.moments
+        i, j = m.columns.index(x), m.columns.index(y)
+        n = m.n[i, j]
+        sx, sy, sxx, syy, sxy = m.s[i, j], m.s[j, i], m.q[i, j], m.q[j, i], m.c[i, j]
+        xx, yy, xy = sxx - sx * sx / n, syy - sy * sy / n, sxy - sx * sy / n
+        slope = xy / xx
+        intercept = (sy - slope * sx) / n
+        resid = max(yy - slope * xy, 0) / (n - 2) if n > 2 else np.nan
+        xs = np.linspace(m.min[i], m.max[i], grid)
+        fit = intercept + slope * xs
+        half = 1.96 * np.sqrt(resid * (1 / n + (xs - sx / n) ** 2 / xx))
+        return pd.DataFrame({x: xs, "fit": fit, "ci_lo": fit - half, "ci_hi": fit + half})
+
+    def box_stats(self) -> list[dict]:
+        """``matplotlib.cbook.boxplot_stats`` (whis=1.5) per platform group."""
+        stats = []
+        for g in sorted(self.boxes, key=_group_order):
+            sk = self.boxes[g]
+            values, counts = sk.value_counts()
+            q1, med, q3 = (sk.quantile(p) for p in (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+            stats.append(
+                {
+                    "label": g,
+                    "mean": float((values * counts).sum() / counts.sum()),
+                    "med": med,
+                    "q1": q1,
+                    "q3": q3,
+                    "iqr": iqr,
+                    "whislo": values[inside].min() if inside.any() else q1,
+                    "whishi": values[inside].max() if inside.any() else q3,
+                    "fliers": values[~inside],  # distinct values; repeats would overplot
+                }
+            )
+        return stats
+
+
+def _group_order(g: str) -> int:
+    return PLATFORM_GROUPS.index(g) if g in PLATFORM_GROUPS else len(PLATFORM_GROUPS)
+
+
+def aggregate_batches(batches) -> FigureAggregates:
+    agg = FigureAggregates()
+    with track("figures.aggregate") as t:
+        for batch in batches:
+            agg.update(batch.to_pandas())
+        t.rows_in = agg.rows
+    return agg
+
+
+def aggregate_parquet(path: Path, batch_size: int = 1_000_000) -> FigureAggregates:
+    """One streaming pass over the clean Parquet (and ingested parts)."""
+    return aggregate_batches(
+        batch
+        for part in clean_parts(path)
+        for batch in pq.ParquetFile(part, memory_map=True).iter_batches(batch_size)
+    )
+
+
+def aggregate_features(fs: FeatureSet, batch_size: int = 1_000_000) -> FigureAggregates:
+    """Aggregates of a feature version's clean table, cached inside the version.
+
+    A rebuilt version replaces its whole directory, cache included.
+    """
+    cache_path = fs.path / "figure_aggregates.pkl"
+    if cache_path.exists():
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    agg = aggregate_batches(fs.table().to_batches(batch_size))
+    tmp = cache_path.with_suffix(f".tmp-{os.getpid()}")
+    with open(tmp, "wb") as f:
+        pickle.dump(agg, f)
+    tmp.replace(cache_path)
+    return agg
+
+
+def load_aggregates(path: Path, cache_path: Path | None = FIGURE_AGGREGATES) -> FigureAggregates:
+    """``aggregate_parquet`` cached on disk, keyed by the size and mtime of every part."""
+    path = Path(path).resolve()
+    key = [(str(p), p.stat().st_size, p.stat().st_mtime_ns) for p in clean_parts(path)]
+    if cache_path is not None and Path(cache_path).exists():
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("key") == key:
+            return cached["agg"]
+    agg = aggregate_parquet(path)
+    if cache_path is not None:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"key": key, "agg": agg}, f)
+        tmp.replace(cache_path)
+    return agg
+
+
+# ---- table -> Figure helpers (object-oriented API only) ----
+def hist_figure(values, counts, bins, title: str, xlabel: str, ylabel: str, figsize=None):
+    """``ax.hist`` of the rows behind (values, counts), drawn from the counts alone."""
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.hist(values, bins=bins, weights=counts, edgecolor="black")
+    ax.set(title=title, xlabel=xlabel, ylabel=ylabel)
+    return fig
+
+
+def corr_figure(corr: pd.DataFrame) -> Figure:
+    import seaborn as sns  # slow to import; only the figures that use it pay for it
+
+    corr = corr.round(3)
+    fig = Figure(figsize=(6, 5))
+    ax = fig.subplots()
+    sns.heatmap(corr, annot=True, cmap="coolwarm", center=0, ax=ax)
+    ax.set_title("Correlation Matrix")
+    return fig
+
+
+def group_means_figure(grp: pd.DataFrame) -> Figure:
+    """Group means with the ``ci_lo`` bound of a symmetric 95% interval."""
+    fig = Figure()
+    ax = fig.subplots()
+    ax.errorbar(range(len(grp)), grp["mean"], yerr=grp["mean"] - grp["ci_lo"], fmt="o")
+    ax.set_xticks(
+        range(len(grp)),
+        [f"heavy={int(h)}|sleep={int(s)}" for h, s in zip(grp["heavy_user"], grp["sleep_ok"])],
+        rotation=30,
+    )
+    ax.set(
+        title="Mean Academic Impact (95% CI) by Heavy Use × Sleep OK",
+        xlabel="Group",
+        ylabel="Mean impact",
+    )
+    return fig
+
+
+# ---- figure tasks: FigureAggregates in, Figure out ----
+def hours_hist(agg: FigureAggregates) -> Figure:
+    return hist_figure(
+        *agg.value_counts("hours_social_media"),
+        30,
+        "Distribution of Daily Social Media Hours",
+        "Hours per day",
+        "Count",
+    )
+
+
+def acad_impact_hist(agg: FigureAggregates) -> Figure:
+    return hist_figure(
+        *agg.value_counts("acad_impact"),
+        20,
+        "Distribution of Academic Impact (Yes=1, No=0)",
+        "Academic impact",
+        "Count",
+    )
+
+
+def scatter_impact_vs_hours(agg: FigureAggregates) -> Figure:
+    x, y = "hours_social_media", "acad_impact"
+    line = agg.fit_line(x, y)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.scatter(agg.points[x], agg.points[y], alpha=0.4, s=20, linewidths=0)
+    ax.plot(line[x], line["fit"], color="darkred", lw=2)
+    ax.fill_between(line[x], line["ci_lo"], line["ci_hi"], color="darkred", alpha=0.15, lw=0)
+    ax.set(title="Academic Impact vs Social Media Hours", xlabel=x, ylabel=y)
+    return fig
+
+
+def impact_by_platform(agg: FigureAggregates) -> Figure:
+    stats = agg.box_stats()
+    fig = Figure()
+    ax = fig.subplots()
+    boxes = ax.bxp(stats, patch_artist=True, showfliers=True)
+    for i, patch in enumerate(boxes["boxes"]):
+        patch.set(facecolor=f"C{i}", edgecolor="0.25")
+    for part in ("medians", "whiskers", "caps"):
+        for line in boxes[part]:
+            line.set_color("0.25")
+    ax.set(
+        title="Academic Impact by Platform Group",
+        xlabel="Platform group",
+        ylabel="Academic impact",
+    )
+    return fig
+
+
+def corr_heatmap(agg: FigureAggregates) -> Figure:
+    return corr_figure(agg.moments.corr())
+
+
+def group_means_ci(agg: FigureAggregates) -> Figure:
+    grp = agg.moments.group_agg("acad_impact")
+    se = grp["std"] / np.sqrt(grp["count"].clip(lower=1))
+    return group_means_figure(grp.assign(ci_lo=grp["mean"] - 1.96 * se))
+
+
+def missingness(agg: FigureAggregates) -> Figure:
+    miss = agg.missing().sort_values(ascending=False)
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    miss.plot(kind="bar", ax=ax)
+    ax.set(ylabel="Fraction Missing", title="Missingness Overview by Variable")
+    return fig
+
+
+def missing_matrix(agg: FigureAggregates) -> Figure:
+    import missingno as msno  # optional
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    msno.matrix(agg.points.drop(columns="_key"), ax=ax)
+    ax.set_title("Missingness Matrix (Optional)")
+    return fig
+
+
+CLEANING_STEPS = [
+    "Load raw CSVs (data/raw)",
+    "Rename columns (lower_snake_case)",
+    "Type conversion (numeric/categorical)",
+    "Impute missing (median/mode)",
+    "Winsorize top 1% outliers",
+    "Map Yes/No → acad_impact (0/1)",
+    "Drop exact duplicates",
+    "Export cleaned (data/clean)",
+]
+
+
+def cleaning_flow(agg: FigureAggregates | None = None) -> Figure:
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    y = 1.0
+    for i, txt in enumerate(CLEANING_STEPS):
+        ax.add_patch(Rectangle((0.1, y - 0.08), 0.8, 0.12, fill=False, linewidth=1.5))
+        ax.text(0.5, y - 0.02, txt, ha="center", va="center")
+        if i < len(CLEANING_STEPS) - 1:
+            ax.arrow(
+                0.5,
+                y - 0.18,
+                0,
+                -0.06,
+                width=0.002,
+                head_width=0.03,
+                head_length=0.02,
+                length_includes_head=True,
+                fc="k",
+                ec="k",
+            )
+        y -= 0.18
+    ax.axis("off")
+    ax.set_title("Data Cleaning Pipeline (Sprint 2)")
+    return fig
+
+
+def addiction_hist(agg: FigureAggregates) -> Figure:
+    return hist_figure(
+        *agg.value_counts("addiction_score"),
+        20,
+        "Distribution of Addiction Scores",
+        "Addiction Score",
+        "Frequency",
+        figsize=(8, 5),
+    )
+
+
+# ---- approximate mode: figures from sketches and a small weighted resample ----
+def approx_figures(acc, points: int = 20_000) -> dict[str, Figure]:
+    """The EDA figures from an ``ApproxStats``, titled and named as approximate.
+
+    Histograms come from the quantile sketches, correlations and group
+    means from the approximate tables, and the scatter and box plots from
+    ``points`` rows resampled in proportion to their weights.
+    """
+    sk = acc.sketches
+    sample = FigureAggregates.from_frame(acc.resample(points, acc.seed), max_points=points)
+    figs = {
+        "fig1_hours_hist.png": hist_figure(
+            *sk["hours_social_media"].value_counts(),
+            30,
+            "Distribution of Daily Social Media Hours",
+            "Hours per day",
+            "Count",
+        ),
+        "fig2_acad_impact_hist.png": hist_figure(
+            *sk["acad_impact"].value_counts(),
+            20,
+            "Distribution of Academic Impact (Yes=1, No=0)",
+            "Academic impact",
+            "Count",
+        ),
+        "fig3_scatter_impact_vs_hours.png": scatter_impact_vs_hours(sample),
+        "fig4_impact_by_platform.png": impact_by_platform(sample),
+        "fig5_corr.png": corr_figure(acc.corr()),
+        "fig6_group_means_ci.png": group_means_figure(acc.group_agg()),
+        "fig3_addiction_hist.png": hist_figure(
+            *sk["addiction_score"].value_counts(),
+            20,
+            "Distribution of Addiction Scores",
+            "Addiction Score",
+            "Frequency",
+            figsize=(8, 5),
+        ),
+    }
+    for fig in figs.values():
+        for ax in fig.axes:
+            if ax.get_title():
+                ax.set_title(f"{ax.get_title()} (approximate)")
+    return {name.replace(".png", "_approx.png"): fig for name, fig in figs.items()}
+
+
+@track("figures.approx")
+def render_approx_figures(acc, out_dir: Path = FIGURES_DIR, points: int = 20_000) -> list[Path]:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dpi = {t.filename.replace(".png", "_approx.png"): t.dpi for t in EDA_FIGURES}
+    paths = []
+    for name, fig in approx_figures(acc, points).items():
+        fig.tight_layout()
+        fig.savefig(out_dir / name, dpi=dpi.get(name) or "figure")
+        paths.append(out_dir / name)
+    return paths
+
+
+@dataclass
+class FigureTask:
+    """A figure function plus where and how to save it."""
+
+    filename: str
+    func: Callable[[FigureAggregates], Figure]
+    dpi: float | None = None
+    optional: bool = False  # failures (e.g. missing extras) are not reported as errors
+
+
+EDA_FIGURES = [
+    FigureTask("fig1_hours_hist.png", hours_hist),
+    FigureTask("fig2_acad_impact_hist.png", acad_impact_hist),
+    FigureTask("fig3_scatter_impact_vs_hours.png", scatter_impact_vs_hours),
+    FigureTask("fig4_impact_by_platform.png", impact_by_platform),
+    FigureTask("fig5_corr.png", corr_heatmap),
+    FigureTask("fig6_group_means_ci.png", group_means_ci),
+    FigureTask("fig_missingness.png", missingness, dpi=200),
+    FigureTask("fig_missing_matrix.png", missing_matrix, dpi=200, optional=True),
+    FigureTask("fig_cleaning_pipeline.png", cleaning_flow, dpi=200),
+    FigureTask("fig3_addiction_hist.png", addiction_hist, dpi=200),
+]
+
+
+def aggregates_for(source) -> FigureAggregates:
+    """``source`` as aggregates: already built, a DataFrame, a feature version or a path."""
+    if isinstance(source, FigureAggregates):
+        return source
+    if isinstance(source, pd.DataFrame):
+        return FigureAggregates.from_frame(source)
+    if isinstance(source, FeatureSet):
+        return aggregate_features(source)
+    return load_aggregates(source)
+
+
+def render_task(task: FigureTask, agg: FigureAggregates, out_dir: Path) -> Path:
+    """Build one figure from the aggregates and save it."""
+    fig = task.func(agg)
+    fig.tight_layout()
+    out = Path(out_dir) / task.filename
+    fig.savefig(out, dpi=task.dpi if task.dpi is not None else "figure")
+    return out
+
+
+@track("figures")
+def render_figures(
+    tasks: list[FigureTask],
+    source,
+    out_dir: Path = FIGURES_DIR,
+    max_workers: int | None = None,
+) -> dict[str, BaseException]:
+    """Render ``tasks`` concurrently in a process pool.
+
+    ``source`` (clean Parquet path, ``FeatureSet``, DataFrame or
+    ``FigureAggregates``) is reduced to aggregates once; a path reuses the cached aggregates while
+    the file is unchanged, so re-rendering never touches row data. A
+    failing figure is logged and returned in the error dict; the others
+    still render.
+    """
+    agg = aggregates_for(source)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    errors = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(render_task, t, agg, out_dir): t for t in tasks}
+        for fut in as_completed(futures):
+            task = futures[fut]
+            try:
+                logger.info(f"Saved {fut.result()}")
+            except Exception as e:  # noqa: BLE001 - one bad figure must not stop the rest
+                if task.optional:
+                    logger.debug(f"Skipped optional {task.filename}: {e!r}")
+                    continue
+                logger.error(f"{task.filename} failed: {e!r}")
+                errors[task.filename] = e
+    return errors
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    output_path: Path = FIGURES_DIR / "plot.png",
-    # -----------------------------------------
+    input_path: Path = CLEAN_DATA_DIR / "primary_clean.parquet",
+    output_dir: Path = FIGURES_DIR,
+    only: Annotated[list[str] | None, typer.Option(help="Render only these files.")] = None,
+    workers: int = typer.Option(0, help="Worker processes; 0 = one per core."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Generating plot from data...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
+    logger.info("Rendering EDA figures...")
+    tasks = [t for t in EDA_FIGURES if not only or t.filename in only]
+    errors = render_figures(tasks, input_path, output_dir, max_workers=workers or None)
+    if errors:
+        raise typer.Exit(1)
     logger.success("Plot generation complete.")
-    # -----------------------------------------
 
 
 if __name__ == "__main__":
+    setup()
     app()
@@ -0,0 +1,351 @@
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+import re
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.config import PROJ_ROOT
+from inst414_project.features import PLATFORM_GROUPS
+
+PROFILE_CACHE = PROJ_ROOT / ".cache" / "profiles.json"
+
+# QSSR variable inventory: (variable, type, description, role, dataset)
+VARIABLES = [
+    (
+        "hours_social_media",
+        "Continuous",
+        "Daily social media hours",
+        "Independent (main)",
+        "Primary",
+    ),
+    (
+        "acad_impact",
+        "Binary",
+        "Self-reported academic impact (Yes=1/No=0)",
+        "Dependent Variable",
+        "Primary",
+    ),
+    ("sleep_hours", "Continuous", "Average nightly sleep (hours)", "Control", "Primary"),
+    (
+        "addiction_score",
+        "Continuous",
+        "Addiction/self-control index",
+        "Control/Mechanism",
+        "Primary",
+    ),
+    (
+        "platform_group",
+        "Categorical",
+        "Platform type (Short-video/Image-centric/Forum/Other)",
+        "Independent",
+        "Primary",
+    ),
+    ("heavy_user", "Binary", "1 if hours ≥ 75th pct", "Derived/Moderator", "Primary"),
+    ("sleep_ok", "Binary", "1 if sleep ≥ 7h", "Derived/Control", "Primary"),
+    (
+        "prod_perceived",
+        "Continuous",
+        "Perceived productivity score",
+        "Dependent Variable",
+        "Secondary",
+    ),
+    ("prod_actual", "Continuous", "Actual productivity score", "Dependent Variable", "Secondary"),
+    ("platform_pref", "Categorical", "Most-used platform (secondary)", "Control", "Secondary"),
+    ("notifications", "Continuous", "Daily notifications", "Control", "Secondary"),
+    ("work_hours", "Continuous", "Work hours per day", "Control", "Secondary"),
+]
+INVENTORY_COLUMNS = ["Variable", "Type", "Description", "Role", "Present In"]
+
+# Canonical variable -> raw column names it goes by in the source files
+ALIASES = {
+    "hours_social_media": [
+        "Avg_Daily_Usage_Hours",
+        "daily_social_media_time",
+        "Time spent on social media (hours)",
+    ],
+    "sleep_hours": ["Sleep_Hours_Per_Night", "Sleep (hours)"],
+    "platform_primary": ["Most_Used_Platform", "Most used platform"],
+    "addiction_score": ["Addicted_Score"],
+    "acad_impact": ["Affects_Academic_Performance"],
+    "gpa": ["Grade", "cgpa"],
+    "productivity_index": ["productivity_score", "Productivity score"],
+    "study_hours": ["Study time (hours)"],
+    "work_hours": ["work_hours_per_day", "employment_hours"],
+    "prod_perceived": ["perceived_productivity_score"],
+    "prod_actual": ["actual_productivity_score"],
+    "platform_pref": ["social_platform_preference"],
+    "notifications": ["number_of_notifications"],
+}
+
+# In-memory dtype per inventory type. "int8" falls back to nullable Int8 when
+# values are missing and to float32 when they are not whole numbers.
+TYPE_DTYPES = {"Continuous": "float32", "Binary": "int8", "Categorical": "category"}
+COMPACT_DTYPES = {name: TYPE_DTYPES[kind] for name, kind, *_ in VARIABLES} | {
+    "addiction_score": "int8",  # integer 1-10 scale
+    "platform_primary": "category",
+    "platform_group": pd.CategoricalDtype(PLATFORM_GROUPS),
+    # secondary-only columns outside the inventory
+    "stress_level": "int8",  # integer 1-10 scale
+    "job_satisfaction": "float32",
+    "screen_before_sleep": "float32",
+    "uses_focus_apps": "int8",
+    "job_type": "category",
+}
+# What the cleaned frame used before the compact layer (memory report baseline)
+WIDE_DTYPES = {
+    "hours_social_media": "float64",
+    "sleep_hours": "float64",
+    "platform_primary": object,
+    "addiction_score": "float64",
+    "acad_impact": "float64",
+    "heavy_user": "Int64",
+    "sleep_ok": "Int64",
+    "platform_group": object,
+}
+
+
+def fits_int8(series: pd.Series) -> bool:
+    """True when every non-missing value is a whole number in the int8 range."""
+    values = series.dropna().to_numpy(dtype="float64")
+    return bool(((values == np.round(values)) & (np.abs(values) <= 127)).all())
+
+
+def downcast(series: pd.Series, dtype) -> pd.Series:
+    """Cast one column to its compact dtype, checking the values first."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series if series.dtype == dtype else series.astype(dtype)
+    if dtype == "category":  # open set: sorted categories, however the column was built
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            return series.astype("category")
+        cats = series.cat.categories
+        return (
+            series
+            if cats.is_monotonic_increasing
+            else series.cat.reorder_categories(cats.sort_values())
+        )
+    if dtype == "int8":
+        if not fits_int8(series):
+            return series.astype("float32")
+        return series.astype("Int8" if series.isna().any() else "int8")
+    return series.astype(dtype)
+
+
+def compact(df: pd.DataFrame, dtypes: dict = COMPACT_DTYPES) -> pd.DataFrame:
+    """Downcast the schema's columns of ``df``; other columns are left alone."""
+    return df.assign(**{c: downcast(df[c], d) for c, d in dtypes.items() if c in df.columns})
+
+
+def memory_report(df: pd.DataFrame, baseline: dict = WIDE_DTYPES) -> pd.DataFrame:
+    """Bytes per column (and per row) of ``df`` against the wide ``baseline`` dtypes.
+
+    Columns missing from ``baseline`` are compared as float64 or object.
+    """
+    n = max(len(df), 1)
+    rows = []
+    for c in df.columns:
+        if c in baseline:
+            wide = df[c].astype(baseline[c])
+        elif isinstance(df[c].dtype, pd.CategoricalDtype):
+            wide = df[c].astype(object)
+        elif pd.api.types.is_numeric_dtype(df[c]):
+            wide = df[c].astype("float64")
+        else:
+            wide = df[c]
+        rows.append(
+            {
+                "column": c,
+                "dtype": str(df[c].dtype),
+                "bytes": int(df[c].memory_usage(index=False, deep=True)),
+                "wide_dtype": str(wide.dtype),
+                "wide_bytes": int(wide.memory_usage(index=False, deep=True)),
+            }
+        )
+    report = pd.DataFrame(rows)
+    total = {"column": "TOTAL", "dtype": "", "wide_dtype": ""}
+    total |= report[["bytes", "wide_bytes"]].sum().to_dict()
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report["bytes_per_row"] = (report["bytes"] / n).round(2)
+    report["wide_bytes_per_row"] = (report["wide_bytes"] / n).round(2)
+    report["reduction"] = (report["wide_bytes"] / report["bytes"]).round(2)
+    return report
+
+
+# ---- alias registry and cached file profiles ----
+def _norm(name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", str(name).lower()).strip("_")
+
+
+def _alias_index(aliases: dict) -> dict:
+    index = {}
+    for canonical, names in aliases.items():
+        for name in [canonical, *names]:
+            key = _norm(name)
+            if index.setdefault(key, canonical) != canonical:
+                raise ValueError(f"alias {name!r} maps to both {index[key]} and {canonical}")
+    return index
+
+
+ALIAS_INDEX = _alias_index(ALIASES)  # normalized raw name -> canonical
+
+
+@lru_cache(maxsize=256)
+def resolve(columns: tuple[str, ...]) -> dict:
+    """Raw column -> canonical name for the columns the registry knows."""
+    return {c: ALIAS_INDEX[_norm(c)] for c in columns if _norm(c) in ALIAS_INDEX}
+
+
+# pandas' default missing-value strings, so profiles agree with read_csv
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+
+@dataclass
+class FileProfile:
+    """Header, row count and per-column missing counts of one data file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    columns: list[str]
+    rows: int = 0
+    missing: dict = field(default_factory=dict)
+
+    @property
+    def canonical(self) -> dict:
+        """Canonical variable -> raw column, for the columns the registry knows."""
+        return {v: k for k, v in resolve(tuple(self.columns)).items()}
+
+    def missing_pct(self, name: str) -> float:
+        """Percent missing for a raw or canonical column name (NaN if absent)."""
+        col = self.canonical.get(name, name)
+        if col not in self.missing:
+            return np.nan
+        return round(100 * self.missing[col] / self.rows, 1) if self.rows else np.nan
+
+
+def read_header(path: Path) -> list[str]:
+    """Column names from the CSV header or Parquet schema, without reading rows."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def _scan_missing(path: Path, columns: list[str]) -> tuple[int, dict]:
+    """Row count and null count per column in one streaming pass."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.suffix == ".parquet":
+        meta = pq.ParquetFile(path).metadata
+        missing, unknown = dict.fromkeys(columns, 0), set()
+        for rg in range(meta.num_row_groups):  # null counts come from the footer
+            group = meta.row_group(rg)
+            for i in range(group.num_columns):
+                col = group.column(i)
+                stats = col.statistics
+                if stats is not None and stats.has_null_count:
+                    missing[col.path_in_schema] += stats.null_count
+                else:
+                    unknown.add(col.path_in_schema)
+        if unknown:  # no statistics written: count from the data
+            table = pq.read_table(path, columns=sorted(unknown))
+            missing |= {c: table.column(c).null_count for c in unknown}
+        return meta.num_rows, missing
+
+    from pyarrow import csv
+
+    rows, missing = 0, np.zeros(len(columns), dtype="int64")
+    reader = csv.open_csv(
+        path,
+        read_options=csv.ReadOptions(block_size=1 << 24),
+        convert_options=csv.ConvertOptions(
+            column_types=dict.fromkeys(columns, pa.string()),
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        rows += batch.num_rows
+        missing += [col.null_count for col in batch.columns]
+    return rows, dict(zip(columns, missing.tolist()))
+
+
+def _sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def profile(path: Path, cache_path: Path | None = PROFILE_CACHE) -> FileProfile:
+    """Header and missingness profile of a CSV/Parquet file, cached on disk.
+
+    Entries are keyed by path and checked against (size, mtime); if those
+    changed but the sha256 did not, the stored profile is reused. Only new
+    content is scanned, so repeat calls on multi-GB files cost a ``stat``.
+    A clean Parquet's ingested parts are profiled the same way and their
+    rows and nulls added in.
+    """
+    path = Path(path)
+    if path.suffix != ".parquet":
+        return _profile_file(path, cache_path)
+    from inst414_project.dataset import clean_parts
+
+    main, *parts = [_profile_file(p, cache_path) for p in clean_parts(path)]
+    missing = dict(main.missing)
+    for part in parts:
+        for col, n in part.missing.items():
+            missing[col] = missing.get(col, 0) + n
+    return replace(main, rows=main.rows + sum(p.rows for p in parts), missing=missing)
+
+
+def _profile_file(path: Path, cache_path: Path | None) -> FileProfile:
+    path = Path(path).resolve()
+    st = path.stat()
+    cache = {}
+    if cache_path is not None and Path(cache_path).exists():
+        cache = json.loads(Path(cache_path).read_text())
+    entry = cache.get(str(path))
+    if entry and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        return FileProfile(**entry)
+
+    digest = _sha256(path)
+    if entry and entry["sha256"] == digest:
+        prof = FileProfile(**(entry | {"mtime_ns": st.st_mtime_ns}))
+    else:
+        columns = read_header(path)
+        rows, missing = _scan_missing(path, columns)
+        prof = FileProfile(str(path), st.st_size, st.st_mtime_ns, digest, columns, rows, missing)
+    if cache_path is not None:
+        cache[str(path)] = asdict(prof)
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=1, sort_keys=True))
+        tmp.replace(cache_path)
+    return prof
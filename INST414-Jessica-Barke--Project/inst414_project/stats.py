@@ -0,0 +1,865 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import os
+from pathlib import Path
+from statistics import NormalDist
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import typer
+
+from inst414_project.config import CLEAN_DATA_DIR, REPORTS_DIR, setup
+from inst414_project.dataset import CountSketch, clean_parts, read_clean
+from inst414_project.perf import track
+
+app = typer.Typer()
+
+STAT_COLS = ["hours_social_media", "acad_impact", "sleep_hours", "addiction_score"]
+GROUP_KEYS = ["heavy_user", "sleep_ok"]
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class Moments:
+    """Mergeable one-pass moments for EDA tables.
+
+    Overall: pairwise-complete count, sum, sum of squares and
+    cross-product matrices (enough for ``DataFrame.corr``), per-column
+    min/max and an exact ``CountSketch`` for the describe() quartiles.
+    Per group of ``by``: count, sum, sum of squares, min and max of each
+    column. Update with chunks/partitions, then ``merge`` the pieces.
+    """
+
+    def __init__(self, columns: list[str] = STAT_COLS, by: list[str] | None = GROUP_KEYS):
+        self.columns = list(columns)
+        self.by = list(by or [])
+        k = len(self.columns)
+        self.rows = 0
+        self.n = np.zeros((k, k))  # rows where both i and j are present
+        self.s = np.zeros((k, k))  # sum of i over rows where j is present
+        self.q = np.zeros((k, k))  # sum of i**2 over rows where j is present
+        self.c = np.zeros((k, k))  # sum of i*j over rows where both are present
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.sketches = [CountSketch() for _ in self.columns]
+        self.groups = None  # DataFrame indexed by group keys
+
+    def update(self, df: pd.DataFrame) -> "Moments":
+        self.rows += len(df)
+        x = df[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(x)
+        m = present.astype("float64")
+        x0 = np.where(present, x, 0.0)
+        self.n += m.T @ m
+        self.s += x0.T @ m
+        self.q += (x0 * x0).T @ m
+        self.c += x0.T @ x0
+        if len(x):
+            self.min = np.fmin(self.min, np.nanmin(np.where(present, x, np.inf), axis=0))
+            self.max = np.fmax(self.max, np.nanmax(np.where(present, x, -np.inf), axis=0))
+        for col, sketch in zip(self.columns, self.sketches):
+            sketch.update(df[col])
+        if self.by:
+            self._update_groups(df, x0, present)
+        return self
+
+    def _update_groups(self, df, x0, present):
+        parts = {}
+        for j, col in enumerate(self.columns):
+            parts[(col, "count")] = present[:, j]
+            parts[(col, "sum")] = x0[:, j]
+            parts[(col, "sumsq")] = x0[:, j] ** 2
+        wide = pd.DataFrame(parts, index=df.index)
+        keys = [df[b] for b in self.by]
+        agg = wide.groupby(keys, observed=True).sum()
+        vals = df[self.columns].astype("float64").groupby(keys, observed=True)
+        lo, hi = vals.min(), vals.max()
+        for col in self.columns:
+            agg[(col, "min")] = lo[col]
+            agg[(col, "max")] = hi[col]
+        self._merge_groups(agg)
+
+    def _merge_groups(self, agg: pd.DataFrame):
+        if self.groups is None:
+            self.groups = agg
+            return
+        idx = self.groups.index.union(agg.index)
+        a, b = self.groups.reindex(idx), agg.reindex(idx)
+        out = a.fillna(0).add(b.fillna(0))
+        for col in self.columns:
+            out[(col, "min")] = np.fmin(a[(col, "min")], b[(col, "min")])
+            out[(col, "max")] = np.fmax(a[(col, "max")], b[(col, "max")])
+        self.groups = out
+
+    def merge(self, other: "Moments") -> "Moments":
+        self.rows += other.rows
+        for name in ("n", "s", "q", "c"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        if other.groups is not None:
+            self._merge_groups(other.groups)
+        return self
+
+    # ---- derived tables ----
+    def summary(self) -> pd.DataFrame:
+        """Equivalent of ``df[columns].describe().T``."""
+        n, s, q = np.diag(self.n), np.diag(self.s), np.diag(self.q)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s / n
+            std = np.sqrt(np.maximum(q - s * mean, 0) / (n - 1))
+        out = pd.DataFrame(
+            {
+                "count": n,
+                "mean": mean,
+                "std": np.where(n > 1, std, np.nan),
+                "min": np.where(n > 0, self.min, np.nan),
+            },
+            index=self.columns,
+        )
+        for p in DESCRIBE_QUANTILES:
+            out[f"{p:.0%}"] = [sk.quantile(p) for sk in self.sketches]
+        out["max"] = np.where(n > 0, self.max, np.nan)
+        return out
+
+    def corr(self) -> pd.DataFrame:
+        """Pearson correlation with pairwise deletion, as ``DataFrame.corr``."""
+        n, s, q, c = self.n, self.s, self.q, self.c
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * c - s * s.T
+            var_i = n * q - s * s
+            r = cov / np.sqrt(var_i * var_i.T)
+        r = np.clip(r, -1, 1)
+        r[n < 2] = np.nan
+        np.fill_diagonal(r, np.where(np.diag(n) > 1, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def group_agg(self, col: str = "acad_impact") -> pd.DataFrame:
+        """``df.groupby(by)[col].agg(["mean", "count", "std"]).reset_index()``."""
+        if self.groups is None:
+            return pd.DataFrame(columns=[*self.by, "mean", "count", "std"])
+        g = self.groups.sort_index()
+        n, s, q = g[(col, "count")], g[(col, "sum")], g[(col, "sumsq")]
+        mean = s / n
+        var = (q - s * mean).clip(lower=0) / (n - 1)
+        out = pd.DataFrame(
+            {"mean": mean, "count": n.astype("int64"), "std": np.sqrt(var.where(n > 1))}
+        )
+        out.index.names = self.by
+        return out.reset_index()
+
+
+def _iter_batches(path: Path, columns: list[str], batch_size: int):
+    for part in clean_parts(path):
+        pf = pq.ParquetFile(part, memory_map=True)
+        yield from pf.iter_batches(batch_size=batch_size, columns=columns)
+
+
+def moments_from_parquet(
+    path: Path,
+    columns: list[str] = STAT_COLS,
+    by: list[str] | None = GROUP_KEYS,
+    batch_size: int = 1_000_000,
+) -> Moments:
+    """Accumulate ``Moments`` over a clean Parquet and its ingested parts, batch by batch."""
+    acc = Moments(columns, by)
+    with track("eda.moments") as t:
+        for batch in _iter_batches(path, [*columns, *(by or [])], batch_size):
+            acc.update(batch.to_pandas())
+        t.rows_in = acc.rows
+    return acc
+
+
+def moments_from_table(
+    table: pa.Table,
+    columns: list[str] = STAT_COLS,
+    by: list[str] | None = GROUP_KEYS,
+    batch_size: int = 1_000_000,
+) -> Moments:
+    """``moments_from_parquet`` over an Arrow table, e.g. a feature version's ``table()``."""
+    acc = Moments(columns, by)
+    with track("eda.moments") as t:
+        for batch in table.select([*columns, *(by or [])]).to_batches(batch_size):
+            acc.update(batch.to_pandas())
+        t.rows_in = acc.rows
+    return acc
+
+
+def write_eda_tables(acc: Moments, reports_dir: Path = REPORTS_DIR, col: str = "acad_impact"):
+    """summary_stats.csv, correlations.csv and the group means table."""
+    acc.summary().round(3).to_csv(reports_dir / "summary_stats.csv")
+    acc.corr().round(3).to_csv(reports_dir / "correlations.csv")
+    grp = acc.group_agg(col)
+    se = grp["std"] / np.sqrt(grp["count"].clip(lower=1))
+    grp["ci_lo"] = grp["mean"] - 1.96 * se
+    grp["ci_hi"] = grp["mean"] + 1.96 * se
+    grp.to_csv(reports_dir / "group_means_impact_by_heavy_sleep.csv", index=False)
+    return grp
+
+
+# ---- approximate mode: stratified sample + log-bucket sketches ----
+APPROX_STRATA = ["platform_group", "heavy_user"]
+APPROX_PER_STRATUM = 20_000
+Z95 = 1.96
+
+
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch (DDSketch).
+
+    Each non-zero value is counted in the bucket ``ceil(log_gamma |x|)``,
+    so any quantile comes back within relative error ``alpha`` of a value
+    of that rank, and memory grows with ``log(max/min) / alpha`` rather
+    than with rows or distinct values. Min and max are exact.
+    """
+
+    def __init__(self, alpha: float = 0.005):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = np.log(self.gamma)
+        self.pos = pd.Series(dtype="int64")  # bucket -> count, x > 0
+        self.neg = pd.Series(dtype="int64")  # bucket of |x| -> count, x < 0
+        self.zero = 0
+        self.n_null = 0
+        self.min, self.max = np.inf, -np.inf
+
+    @property
+    def n(self) -> int:
+        return int(self.pos.sum() + self.neg.sum()) + self.zero
+
+    def _add(self, mine: pd.Series, buckets: np.ndarray) -> pd.Series:
+        lo = buckets.min()
+        counts = np.bincount(buckets - lo)  # buckets span a few hundred ids; no sort needed
+        nz = np.flatnonzero(counts)
+        new = pd.Series(counts[nz], index=nz + lo)
+        return new if mine.empty else mine.add(new, fill_value=0).astype("int64")
+
+    def update(self, series: pd.Series) -> "QuantileSketch":
+        x = series.to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(x)
+        self.n_null += int((~present).sum())
+        x = x[present]
+        if not len(x):
+            return self
+        self.min, self.max = min(self.min, x.min()), max(self.max, x.max())
+        tiny = np.abs(x) < 1e-12
+        self.zero += int(tiny.sum())
+        for side, values in (("pos", x[x >= 1e-12]), ("neg", -x[x <= -1e-12])):
+            if len(values):
+                buckets = np.ceil(np.log(values) / self._log_gamma).astype("int64")
+                setattr(self, side, self._add(getattr(self, side), buckets))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for side in ("pos", "neg"):
+            theirs = getattr(other, side)
+            if not theirs.empty:
+                mine = getattr(self, side)
+                setattr(self, side, theirs if mine.empty else mine.add(theirs, fill_value=0))
+        self.zero += other.zero
+        self.n_null += other.n_null
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def value_counts(self) -> tuple[np.ndarray, np.ndarray]:
+        """Bucket representative values (ascending) and their counts."""
+        rep = 2 / (self.gamma + 1)  # midpoint of (gamma**(k-1), gamma**k] in relative terms
+        neg = self.neg.sort_index(ascending=False)
+        pos = self.pos.sort_index()
+        values = np.concatenate(
+            [
+                -rep * self.gamma ** neg.index.to_numpy(dtype="float64"),
+                [0.0] if self.zero else [],
+                rep * self.gamma ** pos.index.to_numpy(dtype="float64"),
+            ]
+        )
+        counts = np.concatenate(
+            [neg.to_numpy(), [self.zero] if self.zero else [], pos.to_numpy()]
+        ).astype("int64")
+        return np.clip(values, self.min, self.max), counts
+
+    def quantile(self, q: float) -> float:
+        n = self.n
+        if n == 0:
+            return np.nan
+        values, counts = self.value_counts()
+        return float(values[np.searchsorted(counts.cumsum(), q * (n - 1), side="right")])
+
+    def histogram(self, bins: int | np.ndarray = 30) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate ``np.histogram`` counts (values land within ``alpha`` of their bin)."""
+        values, counts = self.value_counts()
+        if isinstance(bins, int):
+            bins = np.linspace(self.min, self.max, bins + 1) if self.n else np.linspace(0, 1, 2)
+        return np.histogram(values, bins=bins, weights=counts)[0].astype("int64"), bins
+
+
+class StratifiedSample:
+    """Mergeable stratified reservoir: a uniform sample of up to ``k`` rows per stratum.
+
+    Every row draws a random priority and each stratum keeps its ``k``
+    smallest (bottom-k sampling), so merging two samples and truncating
+    again samples their union. Stratum sizes are counted exactly. Each
+    batch is first cut to the rows whose priority can still make their
+    stratum's bottom k; survivors are queued and only sorted once they
+    outnumber the sample, so a batch costs about one grouping pass.
+    """
+
+    def __init__(self, by: list[str], columns: list[str], k: int, seed: int | None = 0):
+        self.by, self.columns, self.k = list(by), list(dict.fromkeys([*by, *columns])), k
+        self.rng = np.random.default_rng(seed)
+        self.sizes = None  # rows seen per stratum
+        self._sample = None  # kept rows plus their "_key" priority
+        self._pending = []  # candidate rows not yet merged into the sample
+        self._n_pending = 0
+        self._cut = pd.Series(dtype="float64")  # k-th kept key of each full stratum
+
+    def _groupby(self, df: pd.DataFrame):
+        return df.groupby(self.by, observed=True, dropna=False, sort=True)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pool = pd.concat([p for p in [self._sample, *self._pending] if p is not None])
+        pool = pool.sort_values("_key", kind="stable")
+        self._sample = pool[self._groupby(pool).cumcount().to_numpy() < self.k]
+        self._pending, self._n_pending = [], 0
+        held = self._groupby(self._sample)["_key"]
+        self._cut = held.max()[held.size() >= self.k]
+
+    @property
+    def sample(self) -> pd.DataFrame | None:
+        self._flush()
+        return self._sample
+
+    def update(self, df: pd.DataFrame) -> "StratifiedSample":
+        batch = df[self.columns]
+        g = self._groupby(batch)
+        gid = g.ngroup().to_numpy()
+        sizes = g.size()
+        self.sizes = sizes if self.sizes is None else self.sizes.add(sizes, fill_value=0)
+        keys = self.rng.random(len(batch))
+
+        # a stratum's bottom k lies below the k-th key it already holds, and
+        # below k/b (plus a wide margin) among this batch's b uniform keys
+        b = sizes.to_numpy(dtype="float64")
+        held = np.fmin(1.0, self._cut.reindex(sizes.index).to_numpy(dtype="float64"))
+        margin = np.minimum(held, (self.k + 6 * np.sqrt(self.k) + 16) / b)
+        keep = keys < margin[gid]
+        short = np.bincount(gid[keep], minlength=len(b)) < np.minimum(self.k, b)
+        if short.any():  # margin too tight for a stratum: fall back to its held cut
+            keep |= short[gid] & (keys < held[gid])
+        self._pending.append(batch[keep].assign(_key=keys[keep]))
+        self._n_pending += int(keep.sum())
+        if self._n_pending > max(len(self._sample) if self._sample is not None else 0, self.k):
+            self._flush()
+        return self
+
+    def merge(self, other: "StratifiedSample") -> "StratifiedSample":
+        if other.sizes is None:
+            return self
+        self.sizes = (
+            other.sizes if self.sizes is None else self.sizes.add(other.sizes, fill_value=0)
+        )
+        self._pending.append(other.sample)
+        self._flush()
+        return self
+
+    def weights(self) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+        """Sample rows, their stratum ids, and per-stratum population and sample sizes."""
+        sample = self.sample.sort_values(self.by, kind="stable", na_position="last")
+        g = self._groupby(sample)
+        h = g.ngroup().to_numpy()
+        n_h = g.size()
+        big_n = self.sizes.reindex(n_h.index).to_numpy(dtype="float64")
+        return sample, h, big_n, n_h.to_numpy(dtype="float64")
+
+
+class ApproxStats:
+    """Approximate EDA tables from one streaming pass in bounded memory.
+
+    Means, standard deviations, correlations and group means are weighted
+    estimates from a ``StratifiedSample`` over ``strata`` (stratum weight
+    N_h / n_h); quartiles and histogram bins come from ``QuantileSketch``;
+    counts, min and max are exact. Standard errors use the stratified
+    estimator with a finite-population correction (``approx_se``, zero
+    when every row is kept), and ``ci_lo``/``ci_hi`` add it to the usual
+    normal interval, so they match exact mode when the sample is the file.
+    """
+
+    def __init__(
+        self,
+        columns: list[str] = STAT_COLS,
+        by: list[str] = GROUP_KEYS,
+        strata: list[str] = APPROX_STRATA,
+        per_stratum: int = APPROX_PER_STRATUM,
+        alpha: float = 0.005,
+        seed: int | None = 0,
+    ):
+        self.columns, self.by, self.strata = list(columns), list(by), list(strata)
+        self.per_stratum, self.alpha, self.seed = per_stratum, alpha, seed
+        self.rows = 0
+        self.sketches = {c: QuantileSketch(alpha) for c in self.columns}
+        self.sample = StratifiedSample(self.strata, [*self.columns, *self.by], per_stratum, seed)
+
+    @property
+    def method(self) -> str:
+        return (
+            f"approximate: <= {self.per_stratum} rows per {' x '.join(self.strata)} stratum "
+            f"(seed {self.seed}), quantiles within {self.alpha:.1%}"
+        )
+
+    def update(self, df: pd.DataFrame) -> "ApproxStats":
+        self.rows += len(df)
+        for c, sk in self.sketches.items():
+            sk.update(df[c])
+        self.sample.update(df)
+        return self
+
+    def merge(self, other: "ApproxStats") -> "ApproxStats":
+        self.rows += other.rows
+        for c, sk in self.sketches.items():
+            sk.merge(other.sketches[c])
+        self.sample.merge(other.sample)
+        return self
+
+    def resample(self, n: int, seed: int | None = 0) -> pd.DataFrame:
+        """Up to ``n`` sample rows drawn with probability proportional to their
+        weight: an approximately uniform sample of the file, for plotting."""
+        self._prepare()
+        n = min(n, len(self._s))
+        p = self._w / self._w.sum()
+        idx = np.random.default_rng(seed).choice(len(self._s), n, replace=False, p=p)
+        return self._s.iloc[np.sort(idx)].drop(columns="_key")
+
+    # ---- weighted estimators over the sample ----
+    def _prepare(self):
+        sample, h, big_n, n_h = self.sample.weights()
+        self._s, self._h, self._big_n, self._n_h = sample, h, big_n, n_h
+        self._w = (big_n / n_h)[h]
+
+    def _domain(self, y: np.ndarray, d: np.ndarray) -> dict:
+        """Weighted mean, std, size and stratified SE of ``y`` over domain ``d``."""
+        ok = d & ~np.isnan(y)
+        w, h, big_n, n_h = self._w, self._h, self._big_n, self._n_h
+        total, n = w[ok].sum(), int(ok.sum())
+        if n == 0:
+            return {"mean": np.nan, "std": np.nan, "count": 0, "sample_n": 0, "approx_se": np.nan}
+        mean = (w[ok] * y[ok]).sum() / total
+        var = (w[ok] * (y[ok] - mean) ** 2).sum() / total * n / (n - 1) if n > 1 else np.nan
+        z = np.where(ok, y - mean, 0.0)
+        zbar = np.bincount(h, z, len(n_h)) / n_h
+        s2 = np.bincount(h, (z - zbar[h]) ** 2, len(n_h)) / np.maximum(n_h - 1, 1)
+        fpc = np.clip(1 - n_h / big_n, 0, 1)
+        se = np.sqrt((big_n**2 * fpc * s2 / n_h).sum()) / total
+        return {
+            "mean": mean,
+            "std": np.sqrt(var),
+            "count": round(float(total)),
+            "sample_n": n,
+            "approx_se": se,
+        }
+
+    def _interval(self, est: dict) -> tuple[float, float]:
+        se = np.sqrt(np.nan_to_num(est["std"] ** 2 / max(est["count"], 1)) + est["approx_se"] ** 2)
+        return est["mean"] - Z95 * se, est["mean"] + Z95 * se
+
+    def summary(self) -> pd.DataFrame:
+        """``Moments.summary`` columns plus ``approx_se`` and a 95% CI of the mean."""
+        self._prepare()
+        everyone = np.ones(len(self._s), dtype=bool)
+        rows = []
+        for c in self.columns:
+            sk = self.sketches[c]
+            est = self._domain(self._s[c].to_numpy(dtype="float64", na_value=np.nan), everyone)
+            lo, hi = self._interval(est)
+            row = {"count": float(sk.n), "mean": est["mean"], "std": est["std"]}
+            row["min"] = sk.min if sk.n else np.nan
+            for p in DESCRIBE_QUANTILES:
+                row[f"{p:.0%}"] = sk.quantile(p)
+            row |= {"max": sk.max if sk.n else np.nan, "approx_se": est["approx_se"]}
+            rows.append(row | {"mean_ci_lo": lo, "mean_ci_hi": hi})
+        return pd.DataFrame(rows, index=self.columns)
+
+    def corr(self) -> pd.DataFrame:
+        """Weighted Pearson correlations of the sample, pairwise complete."""
+        return (
+            self.corr_ci()
+            .pivot(index="var1", columns="var2", values="r")
+            .loc[self.columns, self.columns]
+        )
+
+    def corr_ci(self) -> pd.DataFrame:
+        """One row per column pair: r, sample size and a Fisher-z 95% CI."""
+        self._prepare()
+        x = self._s[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        rows = []
+        for i, a in enumerate(self.columns):
+            for j, b in enumerate(self.columns):
+                ok = ~np.isnan(x[:, i]) & ~np.isnan(x[:, j])
+                w, xa, xb = self._w[ok], x[ok, i], x[ok, j]
+                r, lo, hi = np.nan, np.nan, np.nan
+                if ok.sum() > 1:
+                    da, db = xa - np.average(xa, weights=w), xb - np.average(xb, weights=w)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        r = (w * da * db).sum() / np.sqrt((w * da**2).sum() * (w * db**2).sum())
+                    r = 1.0 if i == j and not np.isnan(r) else float(np.clip(r, -1, 1))
+                    n_eff = w.sum() ** 2 / (w**2).sum()  # Kish effective sample size
+                    if n_eff > 3 and i != j:
+                        zr, half = (
+                            np.arctanh(np.clip(r, -0.999999, 0.999999)),
+                            Z95 / np.sqrt(n_eff - 3),
+                        )
+                        lo, hi = np.tanh(zr - half), np.tanh(zr + half)
+                row = {"var1": a, "var2": b, "r": r, "sample_n": int(ok.sum())}
+                rows.append(row | {"ci_lo": lo, "ci_hi": hi})
+        return pd.DataFrame(rows)
+
+    def group_agg(self, col: str = "acad_impact") -> pd.DataFrame:
+        """``Moments.group_agg`` with CI columns, ``sample_n`` and ``approx_se``."""
+        self._prepare()
+        y = self._s[col].to_numpy(dtype="float64", na_value=np.nan)
+        rows = []
+        for key, idx in self._s.groupby(self.by, observed=True, sort=True).indices.items():
+            d = np.zeros(len(y), dtype=bool)
+            d[idx] = True
+            est = self._domain(y, d)
+            lo, hi = self._interval(est)
+            key = key if isinstance(key, tuple) else (key,)
+            rows.append(dict(zip(self.by, key)) | est | {"ci_lo": lo, "ci_hi": hi})
+        cols = [*self.by, "mean", "count", "std", "ci_lo", "ci_hi", "sample_n", "approx_se"]
+        return pd.DataFrame(rows, columns=cols)
+
+
+def approx_from_parquet(
+    path: Path,
+    columns: list[str] = STAT_COLS,
+    by: list[str] = GROUP_KEYS,
+    per_stratum: int = APPROX_PER_STRATUM,
+    seed: int | None = 0,
+    batch_size: int = 1_000_000,
+) -> ApproxStats:
+    """Accumulate ``ApproxStats`` over a clean Parquet and its ingested parts, batch by batch."""
+    acc = ApproxStats(columns, by, per_stratum=per_stratum, seed=seed)
+    read = list(dict.fromkeys([*columns, *by, *acc.strata]))
+    with track("eda.approx") as t:
+        for batch in _iter_batches(path, read, batch_size):
+            acc.update(batch.to_pandas())
+        t.rows_in = acc.rows
+    return acc
+
+
+def write_approx_tables(
+    acc: ApproxStats, reports_dir: Path = REPORTS_DIR, col: str = "acad_impact"
+) -> pd.DataFrame:
+    """The ``write_eda_tables`` outputs with an ``_approx`` suffix and a ``method`` column."""
+    label = {"method": acc.method}
+    acc.summary().round(3).assign(**label).to_csv(reports_dir / "summary_stats_approx.csv")
+    acc.corr_ci().round(3).assign(**label).to_csv(
+        reports_dir / "correlations_approx.csv", index=False
+    )
+    grp = acc.group_agg(col).assign(**label)
+    grp.to_csv(reports_dir / "group_means_impact_by_heavy_sleep_approx.csv", index=False)
+    return grp
+
+
+# ---- resampling inference: bootstrap CIs and permutation p-values ----
+RESAMPLE_REPLICATES = 10_000
+RESAMPLE_BLOCK = 500  # replicates per task; each block has its own seed
+RESAMPLE_MAX_LEVELS = 64  # distinct outcome values above which rows are resampled
+RESAMPLE_MIN_CELL = 10  # cells with fewer rows get no interval
+_ROW_BUDGET = 1 << 24  # index-matrix elements drawn at once on the row path
+
+
+class Resampler:
+    """Vectorized bootstrap and permutation replicates of per-cell means.
+
+    Rows become integer cell codes (one per observed combination of ``by``)
+    and outcome level codes. With at most ``max_levels`` distinct outcomes
+    (a 0/1 flag, a 1-10 score) they collapse to a cells x levels count
+    table: a bootstrap replicate of a cell is a multinomial draw over its
+    counts, and a permutation replicate deals the pooled outcomes back into
+    cells of the observed sizes by sequential hypergeometric draws. These
+    are exactly the distributions of resampling the rows, at a cost that
+    does not grow with them. Otherwise replicates are index matrices over
+    the rows, summed per cell with ``bincount`` on the codes.
+
+    Replicates run in blocks of ``RESAMPLE_BLOCK``, each seeded from its own
+    ``SeedSequence(seed).spawn`` child, so the results depend on ``seed``
+    and not on how many workers ran the blocks.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        col: str = "acad_impact",
+        by: list[str] = GROUP_KEYS,
+        max_levels: int = RESAMPLE_MAX_LEVELS,
+    ):
+        self.col, self.by = col, list(by)
+        df = df[[*self.by, col]].dropna()
+        grouped = df.groupby(self.by, observed=True, sort=True)
+        self.keys = grouped.size().index.to_frame(index=False)
+        codes = grouped.ngroup().to_numpy()
+        order = np.argsort(codes, kind="stable")  # rows of a cell are contiguous
+        self.codes = codes[order]
+        self.y = df[col].to_numpy(dtype="float64")[order]
+        self.n = np.bincount(self.codes, minlength=len(self.keys))
+        self.start = np.concatenate([[0], np.cumsum(self.n)[:-1]])
+        self.levels, level_codes = np.unique(self.y, return_inverse=True)
+        self.table = None
+        if len(self.levels) <= max_levels:
+            cells = len(self.keys) * len(self.levels)
+            flat = np.bincount(self.codes * len(self.levels) + level_codes, minlength=cells)
+            self.table = flat.reshape(len(self.keys), len(self.levels))
+
+    @property
+    def means(self) -> np.ndarray:
+        return np.bincount(self.codes, weights=self.y, minlength=len(self.n)) / self.n
+
+    def bootstrap(self, rng: np.random.Generator, reps: int) -> np.ndarray:
+        """``reps`` x cells bootstrap means, each cell resampled within itself."""
+        if self.table is not None:
+            counts = np.stack(
+                [rng.multinomial(n, row / n, size=reps) for n, row in zip(self.n, self.table)],
+                axis=1,
+            )
+            return counts @ self.levels / self.n
+        sums = []
+        for b in _row_batches(reps, len(self.y)):
+            # row index matrix: each row is drawn from its own cell's range
+            idx = self.start[self.codes] + (rng.random((b, len(self.y))) * self.n[self.codes])
+            sums.append(
+                self._cell_sums(np.broadcast_to(self.codes, idx.shape), idx.astype("int64"))
+            )
+        return np.concatenate(sums) / self.n
+
+    def permute(self, rng: np.random.Generator, reps: int) -> np.ndarray:
+        """``reps`` x cells means with the outcomes shuffled across cells."""
+        if self.table is not None:
+            return self._deal(rng, reps) @ self.levels / self.n
+        sums = []
+        for b in _row_batches(reps, len(self.y)):
+            codes = rng.permuted(np.broadcast_to(self.codes, (b, len(self.y))), axis=1)
+            sums.append(
+                self._cell_sums(codes, np.broadcast_to(np.arange(len(self.y)), codes.shape))
+            )
+        return np.concatenate(sums) / self.n
+
+    def _cell_sums(self, codes: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        g = len(self.n)
+        flat = (np.arange(len(codes))[:, None] * g + codes).ravel()
+        return np.bincount(flat, weights=self.y[idx].ravel(), minlength=len(codes) * g).reshape(
+            len(codes), g
+        )
+
+    def _deal(self, rng: np.random.Generator, reps: int) -> np.ndarray:
+        """reps x cells x levels counts: the pooled outcomes dealt into cells at random."""
+        pool = np.tile(self.table.sum(axis=0), (reps, 1))
+        out = np.zeros((reps, *self.table.shape), dtype="int64")
+        for g, n in enumerate(self.n[:-1]):
+            left, total = np.full(reps, n), pool.sum(axis=1)
+            for v in range(pool.shape[1] - 1):
+                total = total - pool[:, v]
+                out[:, g, v] = rng.hypergeometric(pool[:, v], total, left)
+                left = left - out[:, g, v]
+            out[:, g, -1] = left
+            pool -= out[:, g]
+        out[:, -1] = pool
+        return out
+
+
+def _row_batches(reps: int, rows: int):
+    step = max(1, _ROW_BUDGET // max(rows, 1))
+    for lo in range(0, reps, step):
+        yield min(step, reps - lo)
+
+
+_RESAMPLER: Resampler | None = None  # a worker's copy, sent once by _init_resampler
+
+
+def _init_resampler(resampler: Resampler):
+    global _RESAMPLER
+    _RESAMPLER = resampler
+
+
+def _resample_block(seed: np.random.SeedSequence, reps: int):
+    boot_rng, perm_rng = (np.random.default_rng(s) for s in seed.spawn(2))
+    return _RESAMPLER.bootstrap(boot_rng, reps), _RESAMPLER.permute(perm_rng, reps)
+
+
+def contrasts(keys: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Cell weights for each 0/1 key's main effect and, for two keys, their interaction.
+
+    Effects are differences of unweighted cell means; a contrast needing a
+    cell that was not observed is left out.
+    """
+    out = {}
+    cells = {tuple(k): i for i, k in enumerate(keys.itertuples(index=False))}
+    by = list(keys.columns)
+    full = list(product([0, 1], repeat=len(by)))
+    if not all(c in cells for c in full):
+        return out
+    for j, name in enumerate(by):
+        w = np.zeros(len(keys))
+        for c in full:
+            w[cells[c]] += (1 if c[j] else -1) / 2 ** (len(by) - 1)
+        out[name] = w
+    if len(by) == 2:
+        w = np.zeros(len(keys))
+        for c in full:
+            w[cells[c]] = 1 if c[0] == c[1] else -1
+        out[f"{by[0]}_x_{by[1]}"] = w
+    return out
+
+
+def _wilson(p: np.ndarray, n: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval for proportions ``p`` of ``n`` trials."""
+    z2 = NormalDist().inv_cdf(1 - alpha / 2) ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = np.sqrt(z2 * p * (1 - p) / n + z2**2 / (4 * n**2)) / (1 + z2 / n)
+    return np.where(p == 0, 0.0, center - half), np.where(p == 1, 1.0, center + half)
+
+
+def resample_group_means(
+    df: pd.DataFrame,
+    col: str = "acad_impact",
+    by: list[str] = GROUP_KEYS,
+    replicates: int = RESAMPLE_REPLICATES,
+    seed: int = 0,
+    max_workers: int | None = None,
+    alpha: float = 0.05,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Percentile bootstrap CIs for each cell mean, plus permutation tests.
+
+    Returns (cells, tests). ``cells`` has one row per ``by`` combination
+    with ``mean``, ``count``, ``boot_se``, ``ci_lo``, ``ci_hi`` and
+    ``ci_method``. ``tests`` has the omnibus ``between_cells`` statistic
+    (sum of n * squared deviation of the cell means) and the effects from
+    ``contrasts``, each with its bootstrap CI and its permutation p-value
+    under the null that ``col`` does not depend on the cell ((1 + #as
+    extreme) / (1 + replicates), two-sided for the effects). Blocks of
+    replicates run on up to ``max_workers`` processes (1 = in this process).
+
+    A bootstrap cannot vary a cell whose rows all have one value, so such a
+    cell gets a Wilson interval when that value is 0 or 1 and none
+    otherwise; cells under ``RESAMPLE_MIN_CELL`` rows get none either. Tests
+    count the cells they use that are that small in ``small_cells``, and an
+    effect with any has no bootstrap SE or CI.
+    """
+    with track("eda.resample") as t:
+        res = Resampler(df, col, by)
+        sizes = [
+            min(RESAMPLE_BLOCK, replicates - lo) for lo in range(0, replicates, RESAMPLE_BLOCK)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        max_workers = max_workers or min(len(sizes), os.cpu_count() or 1)
+        if max_workers == 1 or len(sizes) < 2:
+            _init_resampler(res)
+            try:
+                blocks = [_resample_block(s, r) for s, r in zip(seeds, sizes)]
+            finally:
+                _init_resampler(None)
+        else:
+            # the rows are pickled once per worker, not once per block
+            pool = ProcessPoolExecutor(max_workers, initializer=_init_resampler, initargs=(res,))
+            with pool:
+                blocks = list(pool.map(_resample_block, seeds, sizes))
+        boot = np.concatenate([b for b, _ in blocks])
+        perm = np.concatenate([p for _, p in blocks])
+        t.rows_in = len(res.y)
+
+    q = [alpha / 2, 1 - alpha / 2]
+    means = res.means
+    cells = res.keys.assign(mean=means, count=res.n, boot_se=boot.std(axis=0, ddof=1))
+    cells[["ci_lo", "ci_hi"]] = np.quantile(boot, q, axis=0).T
+    small = res.n < RESAMPLE_MIN_CELL
+    constant = np.minimum.reduceat(res.y, res.start) == np.maximum.reduceat(res.y, res.start)
+    wilson = constant & ~small & np.isin(means, [0.0, 1.0])
+    method = np.select([small | (constant & ~wilson), wilson], ["none", "wilson"], "percentile")
+    cells["ci_method"] = method
+    cells.loc[method != "percentile", ["boot_se", "ci_lo", "ci_hi"]] = np.nan
+    lo, hi = _wilson(means[wilson], res.n[wilson], alpha)
+    cells.loc[wilson, "ci_lo"], cells.loc[wilson, "ci_hi"] = lo, hi
+    cells["replicates"] = replicates
+
+    def between(m):
+        grand = (m * res.n).sum(axis=-1, keepdims=True) / res.n.sum()
+        return ((m - grand) ** 2 * res.n).sum(axis=-1)
+
+    def p_value(null, observed):
+        return (1 + int((null >= observed - 1e-12).sum())) / (1 + replicates)
+
+    est = between(means)
+    rows = [
+        {
+            "test": "between_cells",
+            "estimate": est,
+            "p_value": p_value(between(perm), est),
+            "small_cells": int(small.sum()),
+        }
+    ]
+    for name, w in contrasts(res.keys).items():
+        est, boot_w = means @ w, boot @ w
+        row = {"test": name, "estimate": est, "small_cells": int(small[w != 0].sum())}
+        if not row["small_cells"]:
+            lo, hi = np.quantile(boot_w, q)
+            row |= {"boot_se": boot_w.std(ddof=1), "ci_lo": lo, "ci_hi": hi}
+        rows.append(row | {"p_value": p_value(abs(perm @ w), abs(est))})
+    cols = ["test", "estimate", "boot_se", "ci_lo", "ci_hi", "p_value", "small_cells"]
+    tests = pd.DataFrame(rows, columns=cols).assign(replicates=replicates)
+    return cells, tests
+
+
+def write_resample_tables(
+    df: pd.DataFrame,
+    reports_dir: Path = REPORTS_DIR,
+    col: str = "acad_impact",
+    **kwargs,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Bootstrap and permutation tables next to ``group_means_impact_by_heavy_sleep.csv``."""
+    cells, tests = resample_group_means(df, col, **kwargs)
+    cells.to_csv(reports_dir / "group_means_impact_by_heavy_sleep_bootstrap.csv", index=False)
+    tests.to_csv(reports_dir / "group_tests_impact_by_heavy_sleep_permutation.csv", index=False)
+    return cells, tests
+
+
+@app.command()
+def main(
+    input_path: Path = CLEAN_DATA_DIR / "primary_clean.parquet",
+    reports_dir: Path = REPORTS_DIR,
+    batch_size: int = typer.Option(1_000_000, help="Rows per record batch."),
+    approx: bool = typer.Option(False, help="Sampled/sketched tables (*_approx.csv)."),
+    per_stratum: int = typer.Option(APPROX_PER_STRATUM, help="Approx: rows kept per stratum."),
+    seed: int = typer.Option(0, help="Approx: sampling seed; bootstrap/permutation seed."),
+    replicates: int = typer.Option(
+        RESAMPLE_REPLICATES,
+        help="Bootstrap/permutation replicates for the group means (0 = skip).",
+    ),
+    workers: int = typer.Option(0, help="Processes for the replicates; 0 = all CPUs."),
+):
+    if approx:
+        logger.info("Computing approximate EDA statistics...")
+        acc = approx_from_parquet(
+            input_path, per_stratum=per_stratum, seed=seed, batch_size=batch_size
+        )
+        write_approx_tables(acc, reports_dir)
+        logger.success(f"Wrote approximate EDA tables to {reports_dir} ({acc.method})")
+        return
+    logger.info("Computing EDA statistics in one pass...")
+    acc = moments_from_parquet(input_path, batch_size=batch_size)
+    write_eda_tables(acc, reports_dir)
+    if replicates:
+        logger.info(f"Resampling the group means ({replicates} replicates)...")
+        df = read_clean(["acad_impact", *GROUP_KEYS], input_path)
+        write_resample_tables(
+            df, reports_dir, replicates=replicates, seed=seed, max_workers=workers or None
+        )
+    logger.success(f"Wrote EDA tables to {reports_dir}")
+
+
+if __name__ == "__main__":
+    setup()
+    app()
@@ -0,0 +1,162 @@
+from pathlib import Path
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+import typer
+
+from inst414_project.config import EXTERNAL_DATA_DIR, setup
+
+app = typer.Typer()
+
+# Schema and category frequencies of social_media_addiction_vs_relationships.csv
+RAW_COLUMNS = [
+    "Student_ID",
+    "Age",
+    "Gender",
+    "Academic_Level",
+    "Country",
+    "Avg_Daily_Usage_Hours",
+    "Most_Used_Platform",
+    "Affects_Academic_Performance",
+    "Sleep_Hours_Per_Night",
+    "Mental_Health_Score",
+    "Relationship_Status",
+    "Conflicts_Over_Social_Media",
+    "Addicted_Score",
+]
+PLATFORMS = {
+    "Instagram": 249,
+    "TikTok": 154,
+    "Facebook": 123,
+    "WhatsApp": 54,
+    "Twitter": 30,
+    "LinkedIn": 21,
+    "WeChat": 15,
+    "Snapchat": 13,
+    "LINE": 12,
+    "KakaoTalk": 12,
+    "VKontakte": 12,
+    "YouTube": 10,
+}
+LEVELS = {"Undergraduate": 353, "Graduate": 325, "High School": 27}
+RELATIONSHIPS = {"Single": 384, "In Relationship": 289, "Complicated": 32}
+COUNTRIES = [
+    "India",
+    "USA",
+    "Canada",
+    "France",
+    "Spain",
+    "Mexico",
+    "Denmark",
+    "Bangladesh",
+    "UK",
+    "Germany",
+    "Japan",
+    "Brazil",
+]
+
+# Share of rows given each kind of dirty value
+DIRTY = {
+    "hours_text": 0.02,  # "5.2 hrs"
+    "hours_out_of_range": 0.01,  # 30 or -2
+    "hours_blank": 0.02,
+    "sleep_text": 0.01,  # "6.5h"
+    "sleep_blank": 0.01,
+    "platform_variant": 0.02,  # " instagram", "TIKTOK", "Insta"
+    "platform_blank": 0.01,
+    "impact_variant": 0.02,  # " yes", "NO", ""
+}
+
+
+def _choice(rng, weights: dict, n: int) -> np.ndarray:
+    p = np.array(list(weights.values()), dtype="float64")
+    return np.array(list(weights), dtype=object)[rng.choice(len(p), n, p=p / p.sum())]
+
+
+def _dirty(rng, n: int, share: float) -> np.ndarray:
+    return rng.random(n) < share
+
+
+def make_raw(n: int, seed: int = 0, start_id: int = 1) -> pd.DataFrame:
+    """``n`` synthetic rows in the raw primary schema, dirty values included.
+
+    Hours, sleep, addiction and the Yes/No outcome are correlated roughly
+    like the real survey; ``DIRTY`` sets how many cells are text, out of
+    range or blank.
+    """
+    rng = np.random.default_rng(seed)
+    hours = np.clip(rng.normal(4.9, 1.25, n), 1.5, 8.5).round(1)
+    sleep = np.clip(9.6 - 0.55 * hours + rng.normal(0, 0.8, n), 3.8, 9.6).round(1)
+    addicted = np.clip(np.rint(1.2 * hours + rng.normal(0.5, 0.8, n)), 2, 9).astype("int64")
+    impact = rng.random(n) < 1 / (1 + np.exp(-(1.6 * (hours - 4.2))))
+
+    hours_col = hours.astype(object)
+    mask = _dirty(rng, n, DIRTY["hours_text"])
+    hours_col[mask] = [f"{h} hrs" for h in hours[mask]]
+    mask = _dirty(rng, n, DIRTY["hours_out_of_range"])
+    hours_col[mask] = rng.choice([30.0, -2.0], mask.sum())
+    hours_col[_dirty(rng, n, DIRTY["hours_blank"])] = None
+
+    sleep_col = sleep.astype(object)
+    mask = _dirty(rng, n, DIRTY["sleep_text"])
+    sleep_col[mask] = [f"{s}h" for s in sleep[mask]]
+    sleep_col[_dirty(rng, n, DIRTY["sleep_blank"])] = None
+
+    platform = _choice(rng, PLATFORMS, n)
+    mask = _dirty(rng, n, DIRTY["platform_variant"])
+    platform[mask] = rng.choice([" instagram", "TIKTOK", "Insta", "youtube shorts"], mask.sum())
+    platform[_dirty(rng, n, DIRTY["platform_blank"])] = None
+
+    answer = np.where(impact, "Yes", "No").astype(object)
+    mask = _dirty(rng, n, DIRTY["impact_variant"])
+    answer[mask] = rng.choice([" yes", "NO", ""], mask.sum())
+
+    return pd.DataFrame(
+        {
+            "Student_ID": np.arange(start_id, start_id + n),
+            "Age": rng.integers(18, 25, n),
+            "Gender": rng.choice(["Female", "Male"], n),
+            "Academic_Level": _choice(rng, LEVELS, n),
+            "Country": rng.choice(COUNTRIES, n),
+            "Avg_Daily_Usage_Hours": hours_col,
+            "Most_Used_Platform": platform,
+            "Affects_Academic_Performance": answer,
+            "Sleep_Hours_Per_Night": sleep_col,
+            "Mental_Health_Score": np.clip(
+                np.rint(9 - 0.4 * addicted + rng.normal(0, 0.7, n)), 4, 9
+            ).astype("int64"),
+            "Relationship_Status": _choice(rng, RELATIONSHIPS, n),
+            "Conflicts_Over_Social_Media": rng.integers(0, 6, n),
+            "Addicted_Score": addicted,
+        },
+        columns=RAW_COLUMNS,
+    )
+
+
+def write_raw(path: Path, n: int, seed: int = 0, chunksize: int = 1_000_000) -> Path:
+    """Write ``n`` rows to ``path`` chunk by chunk (10M rows never sit in memory)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        for i, start in enumerate(tqdm(range(0, n, chunksize), desc="synth", unit="chunk")):
+            chunk = make_raw(min(chunksize, n - start), seed + i, start_id=start + 1)
+            chunk.to_csv(f, header=i == 0, index=False)
+    return path
+
+
+@app.command()
+def main(
+    rows: int = typer.Option(10_000, help="Rows to generate."),
+    output_path: Path = EXTERNAL_DATA_DIR / "synthetic_primary.csv",
+    seed: int = 0,
+):
+    logger.info(f"Generating {rows} synthetic raw rows...")
+    write_raw(output_path, rows, seed)
+    logger.success(f"Saved {output_path}")
+
+
+if __name__ == "__main__":
+    setup()
+    app()
@@ -16,7 +16,9 @@ cards = pd.concat([
 cards[['role','title','id','subtitle','isPrivate','description']].to_csv(REPORTS / "cards_summary.csv", index=False)
 
 # Quick load check (prints)
+# (the secondary file is optional downstream, so a missing one is only reported)
 pri = pd.read_csv(RAW / "social_media_addiction_vs_relationships.csv")
-sec = pd.read_csv(RAW / "social_media_vs_productivity.csv")
-print("Primary shape:", pri.shape, "| Secondary shape:", sec.shape)
+sec_path = RAW / "social_media_vs_productivity.csv"
+sec_shape = pd.read_csv(sec_path).shape if sec_path.exists() else "missing (run scripts/get_data.sh)"
+print("Primary shape:", pri.shape, "| Secondary shape:", sec_shape)
 print("Wrote reports/cards_summary.csv")
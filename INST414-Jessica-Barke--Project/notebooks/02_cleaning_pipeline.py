@@ -1,5 +1,9 @@
 from pathlib import Path
-import pandas as pd, numpy as np
+import argparse
+import pandas as pd
+
+from inst414_project.dataset import IMPUTE_COLS, clean_frame, parallel_clean, read_clean, stream_clean, write_clean
+from inst414_project.schema import memory_report
 
 ROOT   = Path.cwd()
 RAW    = ROOT/"data"/"raw"
@@ -8,70 +12,59 @@ REPORT = ROOT/"reports"
 CLEAN.mkdir(parents=True, exist_ok=True)
 REPORT.mkdir(parents=True, exist_ok=True)
 
+# --chunksize N streams the raw CSV in N-row chunks (two passes, bounded memory)
+# --workers K splits it into K byte ranges cleaned in parallel (0 = one per core)
+ap = argparse.ArgumentParser()
+ap.add_argument("--chunksize", type=int, default=0)
+ap.add_argument("--workers", type=int, default=1)
+args = ap.parse_args()
+
 log = []
 def add(msg): print(msg); log.append(msg)
 
-# Load primary
 src = RAW / "social_media_addiction_vs_relationships.csv"
-df0 = pd.read_csv(src)
-add(f"Loaded raw: {src} | shape={df0.shape}")
-add("Raw columns: " + ", ".join(df0.columns))
-
-# Column map (from your dataset)
-HOURS_COL = "Avg_Daily_Usage_Hours"
-SLEEP_COL = "Sleep_Hours_Per_Night"
-PLAT_COL  = "Most_Used_Platform"
-DV_COL    = "Affects_Academic_Performance"   # "Yes"/"No"
-ADD_COL   = "Addicted_Score"
-
-def to_num(series):
-    if pd.api.types.is_numeric_dtype(series): 
-        return pd.to_numeric(series, errors="coerce")
-    extr = series.astype(str).str.extract(r"(-?\d+\.?\d*)", expand=False)
-    return pd.to_numeric(extr, errors="coerce")
-
-out = pd.DataFrame(index=df0.index)
-out["hours_social_media"] = to_num(df0[HOURS_COL])
-out["sleep_hours"]        = to_num(df0[SLEEP_COL])
-out["platform_primary"]   = df0[PLAT_COL]
-out["addiction_score"]    = to_num(df0[ADD_COL])
-
-# === Map Yes/No -> 1/0 for the DV
-s = df0[DV_COL].astype(str).str.strip().str.lower()
-out["acad_impact"] = s.map({"yes": 1.0, "no": 0.0})
+dst = CLEAN / "primary_clean.csv"
+dst_pq = CLEAN / "primary_clean.parquet"   # typed store read by EDA/inventory
 
-# Basic sanity bounds (keep rows; null invalids)
-out.loc[(out["hours_social_media"]<0) | (out["hours_social_media"]>24), "hours_social_media"] = np.nan
-out.loc[(out["sleep_hours"]<0) | (out["sleep_hours"]>24), "sleep_hours"] = np.nan
+if args.chunksize > 0 or args.workers != 1:
+    # Streaming: pass 1 sketches medians + q75, pass 2 cleans and appends to dst
+    chunksize = args.chunksize or 1_000_000
+    if args.workers != 1:
+        stats, totals = parallel_clean(src, [dst_pq, dst], chunksize, args.workers or None)
+    else:
+        stats, totals = stream_clean(src, [dst_pq, dst], chunksize)
+    add(f"Streamed raw: {src} | rows={stats.rows} | chunksize={chunksize} | workers={args.workers}")
+    add(f"Medians: {stats.medians} | heavy_user q75={stats.q75}")
+    for c in IMPUTE_COLS:
+        nz, total = totals[c]
+        add(f"{c} non-null: {nz} | mean={total/nz if nz else float('nan'):.3f}")
+    add(f"Saved {dst_pq} + {dst} | shape={(stats.rows, 8)}")
+else:
+    # Load primary
+    df0 = pd.read_csv(src)
+    add(f"Loaded raw: {src} | shape={df0.shape}")
+    add("Raw columns: " + ", ".join(df0.columns))
 
-# Impute medians when possible
-for c in ["hours_social_media","sleep_hours","acad_impact","addiction_score"]:
-    if out[c].notna().any():
-        out[c] = out[c].fillna(out[c].median())
+    # to_num, sanity bounds, median imputation, heavy_user/sleep_ok, platform_group
+    out = clean_frame(df0)
 
-# Engineered features
-q75 = out["hours_social_media"].quantile(0.75) if out["hours_social_media"].notna().any() else np.nan
-out["heavy_user"] = (out["hours_social_media"] >= q75).astype("Int64") if pd.notna(q75) else pd.Series(pd.NA, index=out.index, dtype="Int64")
-out["sleep_ok"]   = (out["sleep_hours"] >= 7).astype("Int64") if out["sleep_hours"].notna().any() else pd.Series(pd.NA, index=out.index, dtype="Int64")
+    # Diagnostics
+    for c in IMPUTE_COLS:
+        nz = int(out[c].notna().sum())
+        m  = float(out[c].dropna().mean()) if nz>0 else float("nan")
+        add(f"{c} non-null: {nz} | mean={m:.3f}")
 
-def map_platform(x):
-    if pd.isna(x): return "Other"
-    s = str(x).lower()
-    if any(k in s for k in ["tiktok","short","reels","youtube"]): return "Short-video"
-    if any(k in s for k in ["instagram","insta","snap","pinterest"]): return "Image-centric"
-    if any(k in s for k in ["linkedin","reddit","quora","discord"]): return "Professional/Forum"
-    return "Other"
-out["platform_group"] = out["platform_primary"].map(map_platform)
+    # Save
+    write_clean(out, dst_pq)
+    out.to_csv(dst, index=False)
+    add(f"Saved {dst_pq} + {dst} | shape={out.shape}")
 
-# Diagnostics
-for c in ["hours_social_media","sleep_hours","acad_impact","addiction_score"]:
-    nz = int(out[c].notna().sum())
-    m  = float(out[c].dropna().mean()) if nz>0 else float("nan")
-    add(f"{c} non-null: {nz} | mean={m:.3f}")
+# Per-column memory of the loaded frame (compact dtypes) vs the old wide dtypes
+mem = memory_report(read_clean(path=dst_pq))
+mem.to_csv(REPORT/"memory_report_clean.csv", index=False)
+total = mem.iloc[-1]
+add(f"In-memory: {total['bytes_per_row']} B/row vs {total['wide_bytes_per_row']} B/row wide "
+    f"({total['reduction']}x smaller) | see reports/memory_report_clean.csv")
 
-# Save + log
-dst = CLEAN / "primary_clean.csv"
-out.to_csv(dst, index=False)
-add(f"Saved {dst} | shape={out.shape}")
 with open(REPORT/"cleaning_log.md","w") as f: f.write("\n".join(log))
 print("✅ Cleaning done. See reports/cleaning_log.md")
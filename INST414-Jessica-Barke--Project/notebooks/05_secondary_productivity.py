@@ -0,0 +1,65 @@
+from pathlib import Path
+import argparse
+import numpy as np
+import pandas as pd
+
+from inst414_project.dataset import SECONDARY, clean_dataset, clean_outputs, read_clean
+from inst414_project.stats import moments_from_parquet
+
+ROOT   = Path.cwd()
+REPORT = ROOT/"reports"
+REPORT.mkdir(parents=True, exist_ok=True)
+
+# Same engine as the primary clean, driven by the SECONDARY spec in dataset.py
+# (rename, coercion, bounds, median imputation, heavy_user/sleep_ok flags).
+ap = argparse.ArgumentParser()
+ap.add_argument("--chunksize", type=int, default=0)
+ap.add_argument("--workers", type=int, default=1)
+args = ap.parse_args()
+
+src = SECONDARY.raw
+if not src.exists():
+    raise SystemExit(f"⚠️ {src} not found; run 01_data_acquisition.py first")
+
+log = []
+def add(msg): print(msg); log.append(msg)
+
+outputs = clean_outputs(SECONDARY.clean)
+rows = clean_dataset(SECONDARY, src, outputs, args.chunksize, args.workers)
+add(f"Cleaned secondary: {src} -> {', '.join(p.name for p in outputs)} | rows={rows}")
+
+# One pass for the describe/corr tables and the productivity group means
+NUMERIC = [c for c in SECONDARY.columns if c in SECONDARY.numeric or c in SECONDARY.yes_no]
+acc = moments_from_parquet(SECONDARY.clean, columns=NUMERIC)
+summary = acc.summary()
+summary.round(3).to_csv(REPORT/"secondary_summary_stats.csv")
+acc.corr().round(3).to_csv(REPORT/"secondary_correlations.csv")
+for col in ("prod_actual", "prod_perceived"):
+    add(f"{col} non-null: {int(summary.loc[col, 'count'])} | mean={summary.loc[col, 'mean']:.3f}")
+grp = acc.group_agg("prod_actual")
+se = grp["std"] / np.sqrt(grp["count"].clip(lower=1))
+grp["ci_lo"] = grp["mean"] - 1.96 * se
+grp["ci_hi"] = grp["mean"] + 1.96 * se
+grp.to_csv(REPORT/"group_means_productivity_by_heavy_sleep.csv", index=False)
+
+# OLS: actual productivity on usage, workload, sleep and the derived flags
+X_COLS = ["hours_social_media", "notifications", "work_hours", "sleep_hours",
+          "screen_before_sleep", "stress_level", "job_satisfaction", "uses_focus_apps",
+          "heavy_user", "sleep_ok"]
+df = read_clean([*X_COLS, "prod_actual"], path=SECONDARY.clean).astype("float64").dropna()
+X = np.column_stack([np.ones(len(df)), df[X_COLS].to_numpy()])
+y = df["prod_actual"].to_numpy()
+beta, *_ = np.linalg.lstsq(X, y, rcond=None)
+resid = y - X @ beta
+dof = max(len(y) - X.shape[1], 1)
+cov = resid @ resid / dof * np.linalg.pinv(X.T @ X)
+se = np.sqrt(np.diag(cov))
+r2 = 1 - resid @ resid / ((y - y.mean()) @ (y - y.mean())) if len(y) > 1 else np.nan
+ols = pd.DataFrame({"term": ["const", *X_COLS], "coef": beta, "se": se,
+                    "ci_lo": beta - 1.96 * se, "ci_hi": beta + 1.96 * se})
+ols["n"], ols["r2"] = len(y), r2
+ols.round(4).to_csv(REPORT/"secondary_ols_prod_actual.csv", index=False)
+add(f"OLS prod_actual ~ {' + '.join(X_COLS)} | n={len(y)} | R²={r2:.3f}")
+
+with open(REPORT/"secondary_cleaning_log.md","w") as f: f.write("\n".join(log))
+print("✅ Secondary analysis done. See reports/secondary_*.csv")
@@ -1,21 +1,16 @@
 from pathlib import Path
 import pandas as pd
 
+from inst414_project.schema import profile
+
 ROOT = Path.cwd(); RAW = ROOT / "data" / "raw"; REPORTS = ROOT / "reports"
 REPORTS.mkdir(parents=True, exist_ok=True)
 
-pri = pd.read_csv(RAW / "social_media_addiction_vs_relationships.csv")
-sec = pd.read_csv(RAW / "social_media_vs_productivity.csv")
+# Cached file profiles (header read without the data); aliases resolve through the
+# package registry
+pri = profile(RAW / "social_media_addiction_vs_relationships.csv")
+sec = profile(RAW / "social_media_vs_productivity.csv")
 
-ALIASES = {
-    "hours_social_media":  ["Time spent on social media (hours)", "hours_social_media"],
-    "gpa":                 ["Grade","gpa","cgpa"],
-    "productivity_index":  ["productivity_score","Productivity score","productivity_index"],
-    "sleep_hours":         ["Sleep (hours)","sleep_hours"],
-    "study_hours":         ["study_hours","Study time (hours)"],
-    "work_hours":          ["work_hours","employment_hours"],
-    "platform_primary":    ["Most used platform","platform_primary"],
-}
 SCHEMA = [
     ("hours_social_media","Continuous","Self reported hours per day on social media","Key"),
     ("gpa","Continuous","GPA or academic score proxy","Key"),
@@ -26,8 +21,7 @@ SCHEMA = [
     ("work_hours","Continuous","Weekly paid work hours","Control"),
 ]
 def present_in(name):
-    pin = any(c in pri.columns for c in ALIASES.get(name, []))
-    sin = any(c in sec.columns for c in ALIASES.get(name, []))
+    pin, sin = name in pri.canonical, name in sec.canonical
     return "Both" if (pin and sin) else ("Primary" if pin else ("Secondary" if sin else "—"))
 rows = [{"Variable":v,"Type":t,"Description":d,"Relevance":r,"Present In":present_in(v)} for v,t,d,r in SCHEMA]
 df = pd.DataFrame(rows)[["Variable","Type","Description","Relevance","Present In"]]
@@ -5,20 +5,12 @@ set -euo pipefail
 cd "$(dirname "$0")/.."
 echo "📍 Working directory: $(pwd)"
 
-# 1) Clean data
-python3 notebooks/02_cleaning_pipeline.py
-
-# 2) EDA (also generates optional figures you added)
-python3 notebooks/03_eda.py
-
-# 3) QSSR models (students)
-if [ -f notebooks/04_models_qssr.py ]; then
-  python3 notebooks/04_models_qssr.py || true
-fi
-
-# 4) Productivity models (secondary)
-if [ -f notebooks/05_secondary_productivity.py ]; then
-  python3 notebooks/05_secondary_productivity.py || true
-fi
+# cards -> acquisition -> clean -> {features -> {eda, train -> predict}, inventory} (+ secondary),
+# independent branches in parallel. Stages whose inputs (raw data, script,
+# package modules) are unchanged are skipped, so a rerun resumes at the first
+# failed or stale stage; pass --force to re-run everything, --from STAGE to
+# re-run a stage and its downstream, or stage names to run them (and their
+# upstream) only. Timing and the critical path land in reports/pipeline_run.json.
+python3 -m inst414_project.pipeline run "$@"
 
 echo "✅ Sprint 2 pipeline finished. See reports/ and reports/figures/."
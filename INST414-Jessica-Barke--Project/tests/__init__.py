@@ -0,0 +1,4 @@
+import os
+
+# Tests never write reports/perf_summary.json.
+os.environ["INST414_PERF_SUMMARY"] = ""
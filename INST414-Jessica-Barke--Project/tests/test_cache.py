@@ -0,0 +1,71 @@
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+
+from inst414_project.cache import Stage, StageCache, run_stages
+
+
+class TestStageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.src = self.tmp / "in.txt"
+        self.out = self.tmp / "out.txt"
+        self.runs = self.tmp / "runs.txt"
+        self.script = self.tmp / "stage.py"
+        self.script.write_text(
+            f"from pathlib import Path\n"
+            f"Path({str(self.out)!r}).write_text(Path({str(self.src)!r}).read_text().upper())\n"
+            f"with open({str(self.runs)!r}, 'a') as f: f.write('x')\n"
+        )
+        self.stage = Stage("upper", self.script, inputs=[self.src], outputs=[self.out])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_count(self):
+        return len(self.runs.read_text()) if self.runs.exists() else 0
+
+    def test_skip_restore_and_force(self):
+        cache = StageCache(self.tmp / "cache")
+        self.src.write_text("a")
+        run_stages([self.stage], cache)
+        run_stages([self.stage], cache)
+        self.assertEqual(self.run_count(), 1)
+
+        self.src.write_text("b")
+        run_stages([self.stage], cache)
+        self.assertEqual((self.out.read_text(), self.run_count()), ("B", 2))
+
+        self.src.write_text("a")  # back to a known fingerprint: restored, not re-run
+        run_stages([self.stage], cache)
+        self.assertEqual((self.out.read_text(), self.run_count()), ("A", 2))
+
+        run_stages([self.stage], cache, force=True)
+        self.assertEqual(self.run_count(), 3)
+
+    def test_lru_cap(self):
+        cache = StageCache(self.tmp / "cache", max_bytes=2)  # room for two 1-byte outputs
+        for text in ("a", "b", "c", "b", "a"):
+            self.src.write_text(text)
+            run_stages([self.stage], cache)
+        # "a" was evicted when "c" landed; "b" was still cached
+        self.assertEqual(self.run_count(), 4)
+        self.assertEqual(len(cache.manifest["artifacts"]), 2)
+
+    def test_directory_input(self):
+        cache = StageCache(self.tmp / "cache")
+        parts = self.tmp / "parts"
+        stage = Stage("upper", self.script, inputs=[self.src, parts], outputs=[self.out])
+        self.src.write_text("a")
+        before = cache.fingerprint(stage)  # a missing directory is just absent
+        parts.mkdir()
+        (parts / "part-00000.parquet").write_text("x")
+        self.assertNotEqual(cache.fingerprint(stage), before)
+        after = cache.fingerprint(stage)
+        (parts / "part-00001.parquet").write_text("y")  # another ingested batch
+        self.assertNotEqual(cache.fingerprint(stage), after)
+
+
+if __name__ == "__main__":
+    unittest.main()
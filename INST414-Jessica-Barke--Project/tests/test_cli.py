@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import unittest
+
+from typer.testing import CliRunner
+
+from inst414_project.cli import COMMANDS, app
+
+HEAVY = ["pandas", "numpy", "pyarrow", "matplotlib", "seaborn", "sklearn"]
+
+
+class TestCli(unittest.TestCase):
+    def test_help_lists_commands_without_heavy_imports(self):
+        code = (
+            "import sys\n"
+            "from typer.testing import CliRunner\n"
+            "from inst414_project.cli import app\n"
+            "assert 'predict' in CliRunner().invoke(app, ['--help']).output\n"
+            f"print(sorted(m for m in {HEAVY!r} if m in sys.modules))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(out.strip(), "[]")
+
+    def test_subcommand_is_loaded_on_demand(self):
+        result = CliRunner().invoke(app, ["cache", "--help"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("status", result.output)
+        result = CliRunner().invoke(app, ["--help"])
+        for name in COMMANDS:
+            self.assertIn(name, result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+from dataclasses import replace
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.dataset import (
+    PRIMARY,
+    SECONDARY,
+    CountSketch,
+    clean_datasets,
+    clean_frame,
+    ingest,
+    parallel_clean,
+    read_clean,
+    scan_stats,
+    split_ranges,
+    stream_clean,
+)
+from inst414_project.modeling.predict import read_chunks
+from inst414_project.schema import compact, profile
+from inst414_project.stats import approx_from_parquet, moments_from_parquet
+
+
+def dirty_raw(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.normal(5, 2, n).round(1).astype(object)
+    hours[rng.random(n) < 0.05] = "5.2 hrs"
+    hours[rng.random(n) < 0.03] = 30.0
+    hours[rng.random(n) < 0.03] = None
+    sleep = rng.normal(7, 1, n).round(1)
+    sleep[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "Student_ID": np.arange(n),
+            "Avg_Daily_Usage_Hours": hours,
+            "Most_Used_Platform": rng.choice(["Instagram", "TikTok", "LinkedIn", None], n),
+            "Affects_Academic_Performance": rng.choice(["Yes", "No", " yes", ""], n),
+            "Sleep_Hours_Per_Night": sleep,
+            "Addicted_Score": rng.integers(1, 10, n),
+        }
+    )
+
+
+def dirty_secondary(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.gamma(2, 1.5, n).round(2)
+    hours[rng.random(n) < 0.03] = 40.0
+    hours[rng.random(n) < 0.05] = np.nan
+    prod = rng.normal(5, 2, n).round(2)
+    prod[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 65, n),
+            "job_type": rng.choice(["IT", "Education", "Health"], n),
+            "daily_social_media_time": hours,
+            "social_platform_preference": rng.choice(["TikTok", "Instagram", "Telegram"], n),
+            "number_of_notifications": rng.integers(-5, 100, n),
+            "work_hours_per_day": rng.normal(8, 2, n).round(1),
+            "perceived_productivity_score": prod,
+            "actual_productivity_score": prod - 0.5,
+            "stress_level": rng.choice([1, 5, 9, np.nan], n),
+            "sleep_hours": rng.normal(6.5, 1, n).round(1),
+            "screen_time_before_sleep": rng.uniform(0, 3, n).round(1),
+            "job_satisfaction_score": rng.normal(6, 2, n).round(1),
+            "uses_focus_apps": rng.choice([True, False], n),
+        }
+    )
+
+
+class TestStreamingClean(unittest.TestCase):
+    def test_sketch_matches_pandas(self):
+        s = pd.Series(np.random.default_rng(1).integers(0, 50, 1001) / 10)
+        sk = CountSketch().update(s[:400]).merge(CountSketch().update(s[400:]))
+        self.assertEqual(sk.median(), s.median())
+        for q in (0.1, 0.25, 0.75, 0.9):
+            self.assertEqual(sk.quantile(q), s.quantile(q))
+
+    def test_stream_matches_in_memory(self):
+        raw = dirty_raw()
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = Path(tmp) / "raw.csv", Path(tmp) / "clean.csv"
+            raw.to_csv(src, index=False)
+            expected = clean_frame(pd.read_csv(src)).to_csv(index=False)
+            for chunksize in (97, 500, 5_000):
+                stream_clean(src, dst, chunksize)
+                self.assertEqual(dst.read_text(), expected)
+
+
+class TestCleanSpec(unittest.TestCase):
+    def test_secondary_spec(self):
+        raw = dirty_secondary()
+        out = clean_frame(raw, SECONDARY)
+        self.assertEqual(list(out.columns), SECONDARY.columns)
+        self.assertTrue(out["hours_social_media"].between(0, 24).all())
+        self.assertEqual(
+            int(out["notifications"].isna().sum()), int((raw["number_of_notifications"] < 0).sum())
+        )
+        for c in SECONDARY.impute:
+            self.assertFalse(out[c].isna().any(), c)
+        self.assertEqual(out["stress_level"].dtype, "int8")
+        self.assertEqual(out["uses_focus_apps"].dtype, "int8")
+        self.assertEqual(out["uses_focus_apps"].sum(), raw["uses_focus_apps"].sum())
+        q75 = out["hours_social_media"].astype("float64").quantile(0.75)
+        self.assertEqual(out["heavy_user"].sum(), (out["hours_social_media"] >= q75).sum())
+        self.assertEqual(set(out["platform_group"]), {"Short-video", "Image-centric", "Other"})
+
+    def test_secondary_stream_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = Path(tmp) / "raw.csv", Path(tmp) / "clean.csv"
+            dirty_secondary().to_csv(src, index=False)
+            expected = clean_frame(pd.read_csv(src), SECONDARY).to_csv(index=False)
+            for chunksize in (97, 5_000):
+                stream_clean(src, dst, chunksize, SECONDARY)
+                self.assertEqual(dst.read_text(), expected)
+
+    def test_datasets_cleaned_concurrently(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            specs = [
+                replace(PRIMARY, raw=tmp / "p_raw.csv", clean=tmp / "p.parquet"),
+                replace(SECONDARY, raw=tmp / "s_raw.csv", clean=tmp / "s.parquet"),
+                replace(SECONDARY, name="absent", raw=tmp / "x.csv", clean=tmp / "x.parquet"),
+            ]
+            dirty_raw().to_csv(specs[0].raw, index=False)
+            dirty_secondary().to_csv(specs[1].raw, index=False)
+            rows = clean_datasets(specs, chunksize=500)
+            self.assertEqual(rows, {"primary": 2_000, "secondary": 2_000})
+            for spec in specs[:2]:
+                expected = clean_frame(pd.read_csv(spec.raw), spec).to_csv(index=False)
+                self.assertEqual(spec.clean.with_suffix(".csv").read_text(), expected)
+                self.assertEqual(len(read_clean(path=spec.clean)), 2_000)
+
+
+class TestParallelClean(unittest.TestCase):
+    def test_ranges_cover_whole_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "raw.csv"
+            dirty_raw(500).to_csv(src, index=False)
+            columns, ranges = split_ranges(src, 7)
+            data = src.read_bytes()
+            self.assertEqual(columns, list(dirty_raw(1).columns))
+            self.assertEqual(ranges[0][0], data.index(b"\n") + 1)
+            self.assertEqual(ranges[-1][1], len(data))
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertEqual(data[end - 1 : end], b"\n")
+
+    def test_byte_identical_to_serial(self):
+        raw = dirty_raw(3_000)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            src = tmp / "raw.csv"
+            raw.to_csv(src, index=False)
+            serial = [tmp / "serial.parquet", tmp / "serial.csv"]
+            stream_clean(src, serial, 400)
+            for workers in (1, 3):
+                par = [tmp / "par.parquet", tmp / "par.csv"]
+                stats, _ = parallel_clean(src, par, 400, workers)
+                self.assertEqual(stats.rows, 3_000)
+                for a, b in zip(serial, par):
+                    self.assertEqual(a.read_bytes(), b.read_bytes(), b.name)
+
+    def test_header_only_input(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            src = tmp / "raw.csv"
+            dirty_raw(0).to_csv(src, index=False)
+            serial = [tmp / "serial.parquet", tmp / "serial.csv"]
+            stream_clean(src, serial)
+            par = [tmp / "par.parquet", tmp / "par.csv"]
+            stats, _ = parallel_clean(src, par, max_workers=3)
+            self.assertEqual(stats.rows, 0)
+            for a, b in zip(serial, par):
+                self.assertEqual(a.read_bytes(), b.read_bytes(), b.name)
+
+
+class TestIngest(unittest.TestCase):
+    def test_batches_update_running_state(self):
+        raw = dirty_raw(3_000)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            src, clean, state = tmp / "raw.csv", tmp / "clean.parquet", tmp / "state.pkl"
+            raw[:2_000].to_csv(src, index=False)
+            first, _ = stream_clean(src, [clean, clean.with_suffix(".csv")])
+            for i, lo in enumerate((2_000, 2_500)):
+                batch = tmp / f"batch{i}.csv"
+                raw[lo : lo + 500].to_csv(batch, index=False)
+                report = ingest(batch, src, clean, state)
+
+            full = scan_stats(src, 1_000_000)
+            self.assertEqual(full.rows, 3_000)
+            self.assertEqual(report["q75"], full.q75)
+            self.assertEqual(report["medians"], {c: float(m) for c, m in full.medians.items()})
+            self.assertEqual(report["needs_rederive"], full.q75 != first.q75)
+            self.assertEqual(len(read_clean(path=clean)), 3_000)
+            self.assertEqual(len(pd.read_csv(clean.with_suffix(".csv"))), 3_000)
+            # every clean-Parquet reader sees the ingested parts
+            self.assertEqual(moments_from_parquet(clean).rows, 3_000)
+            self.assertEqual(approx_from_parquet(clean).rows, 3_000)
+            self.assertEqual(sum(map(len, read_chunks(clean, ["sleep_ok"], 700))), 3_000)
+            self.assertEqual(profile(clean, cache_path=None).rows, 3_000)
+
+            # the new rows were cleaned with the running medians and cutoff
+            tail = compact(clean_frame(pd.read_csv(src))).iloc[2_500:].reset_index(drop=True)
+            got = read_clean(path=clean).iloc[2_500:].reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, tail, check_dtype=False)
+
+    def test_failed_ingest_rolls_back(self):
+        raw = dirty_raw(1_500)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            src, clean, state = tmp / "raw.csv", tmp / "clean.parquet", tmp / "state.pkl"
+            raw[:1_000].to_csv(src, index=False)
+            stream_clean(src, [clean, clean.with_suffix(".csv")])
+            raw[1_000:1_200].to_csv(tmp / "batch0.csv", index=False)
+            ingest(tmp / "batch0.csv", src, clean, state)
+            before = {p: p.read_bytes() for p in (src, clean.with_suffix(".csv"), state)}
+
+            raw[1_200:].to_csv(tmp / "batch1.csv", index=False)
+            with (
+                mock.patch("inst414_project.dataset.save_state", side_effect=OSError("disk full")),
+                self.assertRaises(OSError),
+            ):
+                ingest(tmp / "batch1.csv", src, clean, state)
+            self.assertEqual({p: p.read_bytes() for p in before}, before)
+            self.assertEqual(len(read_clean(path=clean)), 1_200)
+
+            report = ingest(tmp / "batch1.csv", src, clean, state)  # retry lands cleanly
+            self.assertEqual(report["total_rows"], 1_500)
+            self.assertEqual(len(read_clean(path=clean)), 1_500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.dataset import PRIMARY, read_clean
+from inst414_project.features import (
+    FeatureSet,
+    fit_scaler,
+    load_features,
+    map_platform,
+    model_matrix,
+    source_digest,
+    standardize,
+    to_num,
+)
+from inst414_project.modeling.predict import Predictor
+from inst414_project.modeling.train import save_model, train
+from tests.test_train import clean_sample
+
+
+class TestTransforms(unittest.TestCase):
+    def test_to_num(self):
+        s = pd.Series(["5.2", "5.2 hrs", None, "about 3", "n/a", "-1"], dtype="str")
+        expected = pd.Series([5.2, 5.2, np.nan, 3.0, np.nan, -1.0])
+        pd.testing.assert_series_equal(to_num(s), expected)
+
+    def test_to_num_keeps_integers(self):
+        self.assertEqual(to_num(pd.Series(["8", "3"], dtype=object)).dtype, "int64")
+
+    def test_to_num_matches_regex(self):
+        values = ["1e3", "inf", "-inf", "-.5", ".5", "+5", " 4.5 ", "5.2.3", "NaN", "7", "-2"]
+        s = pd.Series(values, dtype=object)
+        extr = s.astype(str).str.extract(r"(-?\d+\.?\d*)", expand=False)  # original parser
+        pd.testing.assert_series_equal(to_num(s), pd.to_numeric(extr, errors="coerce"))
+
+    def test_map_platform(self):
+        s = pd.Series(["TikTok", "Instagram", None, "LinkedIn", "Twitter", "TikTok"])
+        out = map_platform(s)
+        self.assertIsInstance(out.dtype, pd.CategoricalDtype)
+        self.assertEqual(
+            out.tolist(),
+            ["Short-video", "Image-centric", "Other", "Professional/Forum", "Other", "Short-video"],
+        )
+
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / "clean.parquet"
+        df = clean_sample(300)
+        df.loc[:4, "acad_impact"] = np.nan
+        df.to_parquet(self.src)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_materialize_and_reuse(self):
+        fs = load_features(source=self.src, root=self.root / "features")
+        digests = PRIMARY.digest[:12], source_digest(self.src)[:12]
+        self.assertEqual(fs.version, "primary-{}-{}".format(*digests))
+        self.assertIsInstance(fs.x, np.memmap)
+        df = read_clean(path=self.src)
+        x = model_matrix(df)
+        np.testing.assert_allclose(fs.x, standardize(x, fit_scaler(x)))
+        self.assertEqual(fs.y[:5].tolist(), [-1] * 5)
+        self.assertEqual(fs.table().num_rows, 300)
+
+        again = load_features(source=self.src, root=self.root / "features")
+        self.assertEqual(again.meta["created"], fs.meta["created"])
+        clean_sample(200, seed=1).to_parquet(self.src)  # new clean file -> new version
+        new = load_features(source=self.src, root=self.root / "features")
+        self.assertEqual(new.rows, 200)
+        self.assertNotEqual(new.version, fs.version)
+        self.assertEqual(FeatureSet.open(fs.path).rows, 300)  # the old one is left alone
+
+        other = self.root / "other.parquet"  # scoring another file keeps both versions
+        clean_sample(50, seed=2).to_parquet(other)
+        self.assertEqual(load_features(source=other, root=self.root / "features").rows, 50)
+        again = load_features(source=self.src, root=self.root / "features")
+        self.assertEqual(again.path, new.path)
+
+    def test_train_and_score_from_store(self):
+        clean_sample(300).to_parquet(self.src)  # complete rows: workers map x.npy directly
+        fs = load_features(source=self.src, root=self.root / "features")
+        bundle, _ = train(fs, ["logistic"], n_folds=2, max_workers=2)
+        self.assertEqual(bundle["feature_version"], fs.version)
+        self.assertEqual(bundle["scaler"], fs.scaler)
+        save_model(bundle, self.root / "model.pkl")
+        predictor = Predictor(self.root / "model.pkl")
+        out = self.root / "scored.csv"
+        self.assertEqual(predictor.score_features(fs, out, chunksize=128), 300)
+        frame = read_clean(path=self.src).drop(columns="acad_impact")
+        np.testing.assert_allclose(
+            pd.read_csv(out)["acad_impact_proba"], predictor.predict_batch(frame)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from inst414_project import perf
+from inst414_project.perf import track, write_summary
+
+
+class TestTrack(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.before = len(perf._records)
+
+    def tearDown(self):
+        del perf._records[self.before :]
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def new_records(self):
+        return perf._records[self.before :]
+
+    def test_nested_stages_record_rows_and_parent(self):
+        with track("outer", rows_in=10) as t:
+            with track("inner"):
+                sum(range(10_000))
+            t.rows_out = 7
+        inner, outer = self.new_records()
+        self.assertEqual(inner["parent"], "outer")
+        self.assertIsNone(outer["parent"])
+        self.assertEqual((outer["rows_in"], outer["rows_out"]), (10, 7))
+        self.assertGreaterEqual(outer["wall_s"], inner["wall_s"])
+        self.assertEqual(outer["status"], "ok")
+        self.assertGreater(outer["peak_rss_mb"], 0)
+
+    def test_decorator_and_error_status(self):
+        @track("step")
+        def step(fail):
+            if fail:
+                raise KeyError("x")
+
+        step(False)
+        with self.assertRaises(KeyError):
+            step(True)
+        self.assertEqual([r["status"] for r in self.new_records()], ["ok", "error: KeyError"])
+
+    def test_profile_dump(self):
+        old, perf.PROFILE_DIR = perf.PROFILE_DIR, self.tmp
+        try:
+            with track("hot loop", profile=True):
+                sorted(range(1000), key=str)
+        finally:
+            perf.PROFILE_DIR = old
+        path = Path(self.new_records()[0]["profile"])
+        self.assertEqual(path.parent, self.tmp)
+        self.assertTrue(path.name.startswith("hot_loop-"))
+
+    def test_summary_merges_processes_of_one_run(self):
+        path = self.tmp / "perf_summary.json"
+        other = {"run_id": perf.RUN_ID, "pid": -1, "stage": "test.merge", "wall_s": 2.0}
+        other |= {"cpu_s": 1.0, "children_cpu_s": 0.5, "peak_rss_mb": 50.0}
+        path.write_text(json.dumps({"run_id": perf.RUN_ID, "processes": {}, "stages": [other]}))
+        with track("test.merge"):
+            pass
+        write_summary(path)
+        write_summary(path)  # rewriting replaces this process's records
+        summary = json.loads(path.read_text())
+        self.assertEqual(len(summary["stages"]), len(perf._records) + 1)
+        self.assertEqual(summary["by_stage"]["test.merge"]["calls"], 2)
+        self.assertGreaterEqual(summary["by_stage"]["test.merge"]["cpu_s"], 1.5)
+
+    def test_summary_written_only_when_enabled(self):
+        path = self.tmp / "perf_summary.json"
+        code = "from inst414_project.perf import track\nwith track('test.child'):\n    pass\n"
+        env = {k: v for k, v in os.environ.items() if k != "INST414_RUN_ID"}
+        env["INST414_PERF_SUMMARY"] = str(path)
+        root = Path(__file__).resolve().parents[1]
+        subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True)
+        self.assertFalse(path.exists())  # a bare import never writes
+
+        env["INST414_RUN_ID"] = "parent-run"  # a stage started by start_run
+        subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True)
+        summary = json.loads(path.read_text())
+        self.assertEqual(summary["run_id"], "parent-run")
+        self.assertEqual(list(summary["by_stage"]), ["test.child"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+
+from inst414_project.cache import SPRINT2_STAGES, Stage, StageCache
+from inst414_project.pipeline import Graph, report, run_dag
+
+
+class TestPipeline(unittest.TestCase):
+    """a -> {b, c -> d}: b and c are independent branches."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.log = self.tmp / "log.txt"
+        self.stages = [
+            self.stage("a", []),
+            self.stage("b", ["a"], sleep=0.5),
+            self.stage("c", ["a"], sleep=0.5),
+            self.stage("d", ["c"]),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def stage(self, name: str, deps: list[str], sleep: float = 0.0) -> Stage:
+        """Logs start/end, concatenates its deps' outputs; fails while ``<name>.fail`` exists."""
+        out, fail = self.tmp / f"{name}.out", self.tmp / f"{name}.fail"
+        script = self.tmp / f"{name}.py"
+        script.write_text(
+            "from pathlib import Path\nimport time\n"
+            f"log = open({str(self.log)!r}, 'a')\n"
+            f"log.write('{name}+\\n'); log.flush()\n"
+            f"if Path({str(fail)!r}).exists(): raise SystemExit(1)\n"
+            f"time.sleep({sleep})\n"
+            f"deps = [Path({str(self.tmp)!r}, d + '.out').read_text() for d in {deps!r}]\n"
+            f"Path({str(out)!r}).write_text('{name}' + ''.join(deps))\n"
+            f"log.write('{name}-\\n')\n"
+        )
+        inputs = [self.tmp / f"{d}.out" for d in deps]
+        return Stage(name, script, inputs=inputs, outputs=[out], deps=deps)
+
+    def events(self) -> list[str]:
+        events = self.log.read_text().split() if self.log.exists() else []
+        self.log.unlink(missing_ok=True)
+        return events
+
+    def test_branches_overlap(self):
+        runs = run_dag(self.stages, StageCache(self.tmp / "cache"))
+        self.assertEqual({r.status for r in runs.values()}, {"ran"})
+        self.assertEqual((self.tmp / "d.out").read_text(), "dca")
+        events = self.events()
+        # b and c both start before either finishes
+        self.assertLess(max(events.index("b+"), events.index("c+")), events.index("b-"))
+        self.assertLess(max(events.index("b+"), events.index("c+")), events.index("c-"))
+
+        out = report(Graph(self.stages), runs, self.tmp / "run.json")
+        self.assertIn(out["critical_path"], (["a", "b"], ["a", "c", "d"]))
+        self.assertLess(out["makespan_s"], out["serial_s"])
+        self.assertTrue((self.tmp / "run.json").exists())
+
+    def test_failure_blocks_downstream_and_resumes(self):
+        cache = StageCache(self.tmp / "cache")
+        (self.tmp / "c.fail").touch()
+        runs = run_dag(self.stages, cache)
+        status = {name: r.status for name, r in runs.items()}
+        self.assertEqual(status, {"a": "ran", "b": "ran", "c": "failed", "d": "blocked"})
+        self.events()
+
+        (self.tmp / "c.fail").unlink()
+        runs = run_dag(self.stages, cache)
+        status = {name: r.status for name, r in runs.items()}
+        self.assertEqual(status, {"a": "fresh", "b": "fresh", "c": "ran", "d": "ran"})
+        self.assertEqual(sorted(e[0] for e in self.events() if e.endswith("+")), ["c", "d"])
+
+        runs = run_dag(self.stages, cache, force=Graph(self.stages).descendants(["c"]))
+        self.assertEqual([n for n, r in runs.items() if r.status == "ran"], ["c", "d"])
+
+    def test_graph(self):
+        graph = Graph(SPRINT2_STAGES)
+        self.assertEqual(graph.order[:3], ["cards", "acquisition", "clean"])
+        self.assertEqual(
+            graph.descendants(["clean"]),
+            {"clean", "features", "eda", "inventory", "train", "predict"},
+        )
+        self.assertEqual(
+            graph.ancestors(["predict"]),
+            {"cards", "acquisition", "clean", "features", "train", "predict"},
+        )
+        cost = dict.fromkeys(graph.stages, 1.0) | {"eda": 10.0}
+        crit = (["cards", "acquisition", "clean", "features", "eda"], 14.0)
+        self.assertEqual(graph.critical_path(cost), crit)
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            Graph([Stage("x", Path("x.py"), deps=["y"]), Stage("y", Path("y.py"), deps=["x"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
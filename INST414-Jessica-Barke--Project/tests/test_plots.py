@@ -0,0 +1,110 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.plots import (
+    FigureAggregates,
+    FigureTask,
+    approx_figures,
+    hours_hist,
+    load_aggregates,
+    render_figures,
+)
+from inst414_project.stats import ApproxStats
+
+
+def broken(df):
+    raise ValueError("boom")
+
+
+class TestRenderFigures(unittest.TestCase):
+    def test_failure_is_isolated(self):
+        df = pd.DataFrame({"hours_social_media": [1.0, 2.5, 4.0, 4.2]})
+        tasks = [
+            FigureTask("bad.png", broken),
+            FigureTask("hours.png", hours_hist),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            errors = render_figures(tasks, df, tmp, max_workers=2)
+            self.assertEqual(list(errors), ["bad.png"])
+            self.assertTrue((Path(tmp) / "hours.png").exists())
+
+
+def eda_frame(n: int = 2_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "hours_social_media": rng.normal(5, 1, n).round(1),
+            "acad_impact": rng.integers(0, 2, n).astype(float),
+            "sleep_hours": rng.normal(7, 1, n).round(1),
+            "addiction_score": rng.integers(1, 10, n),
+            "heavy_user": rng.integers(0, 2, n).astype("int8"),
+            "sleep_ok": rng.integers(0, 2, n).astype("int8"),
+            "platform_group": pd.Categorical(rng.choice(["Short-video", "Other"], n)),
+        }
+    )
+
+
+class TestFigureAggregates(unittest.TestCase):
+    def setUp(self):
+        self.df = eda_frame()
+        self.df.loc[::7, "sleep_hours"] = np.nan
+        # two chunks merged, as when aggregating a file plus ingested increments
+        self.agg = FigureAggregates.from_frame(self.df[:1200]).merge(
+            FigureAggregates.from_frame(self.df[1200:], seed=1)
+        )
+
+    def test_histograms_match_rows(self):
+        for col, bins in [("hours_social_media", 30), ("addiction_score", 20)]:
+            values, counts = self.agg.value_counts(col)
+            expected, edges = np.histogram(self.df[col], bins=bins)
+            got, _ = np.histogram(values, bins=edges, weights=counts)
+            np.testing.assert_array_equal(got, expected)
+
+    def test_tables_match_rows(self):
+        from matplotlib import cbook
+        from scipy import stats
+
+        pd.testing.assert_series_equal(
+            self.agg.missing().sort_index(), self.df.isna().mean().sort_index()
+        )
+        x, y = self.df["hours_social_media"], self.df["acad_impact"]
+        fit = stats.linregress(x, y)
+        line = self.agg.fit_line("hours_social_media", "acad_impact")
+        np.testing.assert_allclose(
+            line["fit"], fit.intercept + fit.slope * line["hours_social_media"]
+        )
+        for box in self.agg.box_stats():
+            rows = self.df.loc[self.df["platform_group"] == box["label"], "acad_impact"]
+            (ref,) = cbook.boxplot_stats(rows.to_numpy())
+            for key in ("mean", "med", "q1", "q3", "whislo", "whishi"):
+                self.assertAlmostEqual(box[key], ref[key], msg=key)
+        self.assertEqual(len(self.agg.points), min(len(self.df), self.agg.max_points))
+
+    def test_cache_follows_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path, cache = Path(tmp) / "clean.parquet", Path(tmp) / "agg.pkl"
+            self.df.to_parquet(path)
+            self.assertEqual(load_aggregates(path, cache).rows, len(self.df))
+            written = cache.stat().st_mtime_ns
+            self.assertEqual(load_aggregates(path, cache).rows, len(self.df))
+            self.assertEqual(cache.stat().st_mtime_ns, written)  # served from the cache
+            self.df[:100].to_parquet(path)  # rewritten: stale entry is not reused
+            self.assertEqual(load_aggregates(path, cache).rows, 100)
+
+
+class TestApproxFigures(unittest.TestCase):
+    def test_labeled_approximate(self):
+        df = eda_frame()
+        figs = approx_figures(ApproxStats(per_stratum=100).update(df), points=200)
+        self.assertEqual(len(figs), 7)
+        for name, fig in figs.items():
+            self.assertTrue(name.endswith("_approx.png"), name)
+            self.assertIn("(approximate)", fig.axes[0].get_title())
+
+
+if __name__ == "__main__":
+    unittest.main()
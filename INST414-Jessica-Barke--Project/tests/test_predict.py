@@ -0,0 +1,77 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.features import model_matrix
+from inst414_project.modeling.predict import PLATFORM_CACHE_SIZE, Predictor, _platform_index
+from inst414_project.modeling.train import save_model, train
+from tests.test_train import clean_sample
+
+
+class TestPredictor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model_path = Path(cls.tmp.name) / "model.pkl"
+        bundle, _ = train(clean_sample(), ["logistic"], n_folds=2, max_workers=1)
+        save_model(bundle, cls.model_path)
+        cls.predictor = Predictor(cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_records_match_training_transform(self):
+        df = clean_sample(50, seed=3).drop(columns="acad_impact")
+        expected = self.predictor.model.predict_proba(model_matrix(df, self.predictor.scaler))[:, 1]
+        np.testing.assert_array_equal(self.predictor.predict_batch(df), expected)
+        records = df.assign(platform_group=df["platform_group"].astype(str)).to_dict("records")
+        np.testing.assert_allclose(self.predictor.predict_batch(records), expected)
+
+    def test_raw_platform_names(self):
+        rec = clean_sample(1).drop(columns=["acad_impact", "platform_group"]).iloc[0].to_dict()
+        by_raw = self.predictor.predict_batch([{**rec, "platform_primary": "TikTok"}])
+        by_group = self.predictor.predict_batch([{**rec, "platform_group": "Short-video"}])
+        self.assertEqual(by_raw[0], by_group[0])
+
+        groups = len(self.predictor._group_index)
+        names = [f"client-{i}" for i in range(PLATFORM_CACHE_SIZE + 10)]
+        self.predictor.predict_batch([{**rec, "platform_primary": n} for n in names])
+        self.assertEqual(len(self.predictor._group_index), groups)  # nothing kept per name
+        self.assertEqual(_platform_index.cache_info().currsize, PLATFORM_CACHE_SIZE)
+
+    def test_missing_input_raises(self):
+        rec = clean_sample(1).drop(columns="acad_impact").iloc[0].to_dict()
+        for bad in (
+            {"hours_social_media": 5.0},
+            {**rec, "sleep_hours": None},
+            {**rec, "sleep_hours": float("inf")},
+            {**rec, "sleep_hours": -float("inf")},
+        ):
+            with self.assertRaisesRegex(ValueError, "sleep_hours"):
+                self.predictor.predict_batch([rec, bad])
+        df = clean_sample(3).drop(columns="acad_impact")
+        df.loc[2, "addiction_score"] = np.nan
+        with self.assertRaisesRegex(ValueError, "record 2 has a missing or non-finite 'addiction"):
+            self.predictor.predict_batch(df)
+        df.loc[2, "addiction_score"] = np.inf
+        with self.assertRaisesRegex(ValueError, "1 of 3 records unusable"):
+            self.predictor.predict_batch(df)
+
+    def test_score_file_in_chunks(self):
+        df = clean_sample(120, seed=4)
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = Path(tmp) / "in.csv", Path(tmp) / "out.csv"
+            df.to_csv(src, index=False)
+            self.assertEqual(self.predictor.score_file(src, dst, chunksize=50), 120)
+            out = pd.read_csv(dst)
+        np.testing.assert_allclose(
+            out["acad_impact_proba"], self.predictor.predict_batch(df.drop(columns="acad_impact"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.dataset import clean_frame
+from inst414_project.schema import (
+    _alias_index,
+    compact,
+    downcast,
+    memory_report,
+    profile,
+    resolve,
+)
+from inst414_project.synthetic import make_raw, write_raw
+
+
+class TestCompactDtypes(unittest.TestCase):
+    def test_int8_falls_back(self):
+        self.assertEqual(downcast(pd.Series([0.0, 1.0]), "int8").dtype, "int8")
+        self.assertEqual(downcast(pd.Series([0.0, np.nan]), "int8").dtype, "Int8")
+        self.assertEqual(downcast(pd.Series([0.0, 0.5]), "int8").dtype, "float32")
+        self.assertEqual(downcast(pd.Series([300.0]), "int8").dtype, "float32")
+
+    def test_open_categories_sorted(self):
+        s = pd.Series(pd.Categorical(["b", "a"], categories=["b", "a"]))
+        self.assertEqual(list(downcast(s, "category").cat.categories), ["a", "b"])
+
+    def test_clean_frame_is_compact_and_4x_smaller(self):
+        df = compact(clean_frame(make_raw(20_000, seed=3)))
+        self.assertEqual(str(df["hours_social_media"].dtype), "float32")
+        self.assertEqual(str(df["heavy_user"].dtype), "int8")
+        self.assertEqual(str(df["platform_primary"].dtype), "category")
+        report = memory_report(df)
+        self.assertEqual(report["column"].tolist()[-1], "TOTAL")
+        self.assertGreaterEqual(report["reduction"].iloc[-1], 4)
+
+
+class TestRegistry(unittest.TestCase):
+    def test_resolve_aliases(self):
+        got = resolve(("Avg_Daily_Usage_Hours", "daily_social_media_time", "Sleep (hours)", "x"))
+        self.assertEqual(
+            got,
+            {
+                "Avg_Daily_Usage_Hours": "hours_social_media",
+                "daily_social_media_time": "hours_social_media",
+                "Sleep (hours)": "sleep_hours",
+            },
+        )
+        with self.assertRaises(ValueError):
+            _alias_index({"a": ["Same"], "b": ["same"]})
+
+    def test_profile_matches_pandas_and_is_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, cache = Path(tmp) / "raw.csv", Path(tmp) / "profiles.json"
+            write_raw(src, 5_000, seed=2, chunksize=2_000)
+            prof = profile(src, cache)
+            df = pd.read_csv(src)
+            self.assertEqual(prof.columns, list(df.columns))
+            self.assertEqual(prof.rows, len(df))
+            self.assertEqual(prof.missing, df.isna().sum().to_dict())
+            self.assertEqual(prof.canonical["hours_social_media"], "Avg_Daily_Usage_Hours")
+            expected = round(100 * df["Avg_Daily_Usage_Hours"].isna().mean(), 1)
+            self.assertEqual(prof.missing_pct("hours_social_media"), expected)
+
+            os.utime(src, ns=(1, 1))  # touched, same bytes: reused through the sha256
+            self.assertEqual(profile(src, cache).missing, prof.missing)
+            with open(src, "a") as f:
+                f.write("99999,20,Male,Graduate,UK,,,,,,,,\n")
+            grown = profile(src, cache)
+            self.assertEqual(grown.rows, prof.rows + 1)
+            self.assertEqual(grown.missing["Addicted_Score"], prof.missing["Addicted_Score"] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from inst414_project.modeling.predict import Predictor
+from inst414_project.modeling.serve import ScoreClient, ScoringServer
+from inst414_project.modeling.train import save_model, train
+from tests.test_train import clean_sample
+
+
+class TestScoringServer(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bundles = [
+            train(clean_sample(seed=seed), ["logistic"], n_folds=2, max_workers=1)[0]
+            for seed in (0, 1)
+        ]
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = Path(self.tmp.name) / "model.pkl"
+        save_model(self.bundles[0], self.model_path)
+        self.server = await ScoringServer(self.model_path, max_wait_ms=20).start(port=0)
+        df = clean_sample(40, seed=5).drop(columns="acad_impact")
+        self.records = df.assign(platform_group=df["platform_group"].astype(str)).to_dict(
+            "records"
+        )
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.tmp.cleanup()
+
+    async def score_each(self) -> list[dict]:
+        async def one(rec):
+            async with ScoreClient(port=self.server.port) as client:
+                return await client.score([rec])
+
+        return await asyncio.gather(*(one(rec) for rec in self.records))
+
+    async def test_concurrent_requests_are_batched(self):
+        results = await self.score_each()
+        expected = Predictor(self.model_path).predict_batch(self.records)
+        got = [r["acad_impact_proba"][0] for r in results]
+        np.testing.assert_allclose(got, expected)
+        batches = self.server.metrics.batch_rows
+        self.assertEqual(self.server.metrics.rows, len(self.records))
+        self.assertLess(batches.count, len(self.records))
+
+        async with ScoreClient(port=self.server.port) as client:
+            status, body = await client.request("POST", "/predict", self.records[0])
+            self.assertEqual((status, json.loads(body)["acad_impact_proba"]), (200, got[0]))
+            status, body = await client.request("GET", "/metrics")
+        text = body.decode()
+        self.assertEqual(status, 200)
+        self.assertIn('inst414_request_latency_seconds_bucket{le="+Inf"} 41', text)
+        self.assertIn("inst414_rows_scored_total 41", text)
+
+    async def test_hot_reload(self):
+        before = self.server.slot.predictor.version
+        save_model(self.bundles[1], self.model_path)
+        self.assertTrue(await self.server.slot.check())
+        results = await self.score_each()
+        self.assertNotEqual(results[0]["model_version"], before)
+        expected = Predictor(self.model_path).predict_batch(self.records)
+        np.testing.assert_allclose([r["acad_impact_proba"][0] for r in results], expected)
+
+        self.model_path.write_bytes(b"not a model")  # a bad file keeps the old model
+        self.assertFalse(await self.server.slot.check())
+        self.assertEqual(self.server.slot.errors, 1)
+        self.assertEqual(self.server.slot.predictor.version, results[0]["model_version"])
+
+    async def test_bad_record_fails_only_its_request(self):
+        predictor = self.server.slot.predictor
+        score = predictor.predict_batch
+        batch_sizes = []
+
+        def flaky(records):  # the model rejects any batch holding the "poison" record
+            batch_sizes.append(len(records))
+            if any("poison" in rec for rec in records):
+                raise ValueError("record rejected by the model")
+            return score(records)
+
+        async def post(rec):
+            async with ScoreClient(port=self.server.port) as client:
+                return await client.request("POST", "/predict", rec)
+
+        with mock.patch.object(predictor, "predict_batch", flaky):
+            (good_status, good_body), (bad_status, bad_body) = await asyncio.gather(
+                post(self.records[0]), post(self.records[1] | {"poison": True})
+            )
+        self.assertEqual(batch_sizes, [2, 1, 1])  # one batch, then each request alone
+        expected = Predictor(self.model_path).predict_batch(self.records[:1])[0]
+        self.assertEqual(good_status, 200)
+        self.assertAlmostEqual(json.loads(good_body)["acad_impact_proba"], expected)
+        self.assertEqual(bad_status, 400)
+        self.assertIn("rejected", json.loads(bad_body)["error"])
+
+    async def test_bad_requests(self):
+        async with ScoreClient(port=self.server.port) as client:
+            status, _ = await client.request("POST", "/predict", {"records": [{"sleep_ok": 1}]})
+            self.assertEqual(status, 400)
+            status, body = await client.request(
+                "POST", "/predict", self.records[0] | {"platform_group": [1]}
+            )
+            self.assertEqual(status, 400)
+            self.assertIn("platform_group", json.loads(body)["error"])
+            for value in (float("inf"), float("nan"), 10**400):  # Infinity, NaN, float overflow
+                status, body = await client.request(
+                    "POST", "/predict", self.records[0] | {"sleep_hours": value}
+                )
+                self.assertEqual(status, 400)
+                self.assertIn("sleep_hours must be a finite number", json.loads(body)["error"])
+            status, _ = await client.request("POST", "/predict", [])
+            self.assertEqual(status, 400)
+            status, _ = await client.request("GET", "/predict")
+            self.assertEqual(status, 405)
+            status, _ = await client.request("GET", "/nope")
+            self.assertEqual(status, 404)
+            status, body = await client.request("GET", "/healthz")
+        self.assertEqual(json.loads(body)["version"], self.server.slot.predictor.version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.stats import (
+    ApproxStats,
+    Moments,
+    QuantileSketch,
+    Resampler,
+    resample_group_means,
+)
+
+
+class TestMoments(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 3_000
+        self.df = pd.DataFrame(
+            {
+                "hours_social_media": rng.normal(5, 1.3, n).round(1),
+                "acad_impact": rng.integers(0, 2, n).astype(float),
+                "sleep_hours": rng.normal(7, 1, n).round(1),
+                "addiction_score": rng.integers(1, 10, n),
+                "heavy_user": pd.array(rng.integers(0, 2, n), dtype="Int64"),
+                "sleep_ok": pd.array(rng.integers(0, 2, n), dtype="Int64"),
+            }
+        )
+        self.df.loc[rng.random(n) < 0.1, "sleep_hours"] = np.nan
+        self.cols = ["hours_social_media", "acad_impact", "sleep_hours", "addiction_score"]
+
+    def merged(self, parts=4):
+        acc = Moments()
+        for idx in np.array_split(np.arange(len(self.df)), parts):
+            acc.merge(Moments().update(self.df.iloc[idx]))
+        return acc
+
+    def test_matches_pandas(self):
+        acc = self.merged()
+        pd.testing.assert_frame_equal(acc.summary(), self.df[self.cols].describe().T)
+        pd.testing.assert_frame_equal(acc.corr(), self.df[self.cols].corr())
+        expected = (
+            self.df.groupby(["heavy_user", "sleep_ok"])["acad_impact"]
+            .agg(["mean", "count", "std"])
+            .reset_index()
+        )
+        pd.testing.assert_frame_equal(acc.group_agg(), expected, check_dtype=False)
+
+
+class TestApproxParity(unittest.TestCase):
+    """Approximate mode against exact ``Moments`` on the same rows."""
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        n = 20_000
+        hours = rng.gamma(6, 0.8, n).round(2)
+        self.df = pd.DataFrame(
+            {
+                "hours_social_media": hours,
+                "acad_impact": (rng.random(n) < 0.2 + 0.08 * hours.clip(0, 9)).astype(float),
+                "sleep_hours": (9 - 0.3 * hours + rng.normal(0, 1, n)).round(1),
+                "addiction_score": rng.integers(1, 10, n),
+                "heavy_user": (hours >= np.quantile(hours, 0.75)).astype("int8"),
+                "sleep_ok": rng.integers(0, 2, n).astype("int8"),
+                "platform_group": pd.Categorical(
+                    rng.choice(["Short-video", "Image-centric", "Other"], n, p=[0.6, 0.3, 0.1])
+                ),
+            }
+        )
+        self.df.loc[rng.random(n) < 0.05, "sleep_hours"] = np.nan
+        self.exact = Moments().update(self.df)
+
+    def approx(self, per_stratum, parts=4):
+        acc = ApproxStats(per_stratum=per_stratum, seed=None)
+        for i, idx in enumerate(np.array_split(np.arange(len(self.df)), parts)):
+            acc.merge(ApproxStats(per_stratum=per_stratum, seed=i).update(self.df.iloc[idx]))
+        return acc
+
+    def test_sketch_quantiles_within_alpha(self):
+        x = self.df["sleep_hours"]
+        sk = QuantileSketch(0.01).update(x[:7_000]).merge(QuantileSketch(0.01).update(x[7_000:]))
+        self.assertEqual(sk.n, x.notna().sum())
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            exact = np.quantile(x.dropna(), q, method="lower")
+            self.assertLessEqual(abs(sk.quantile(q) - exact), 0.01 * abs(exact) + 1e-12)
+        counts, edges = sk.histogram(10)
+        self.assertEqual(counts.sum(), sk.n)
+        self.assertEqual((edges[0], edges[-1]), (x.min(), x.max()))
+
+    def test_full_sample_matches_exact(self):
+        acc = self.approx(per_stratum=len(self.df))
+        self.assertEqual(len(acc.sample.sample), len(self.df))
+        exact, approx = self.exact.summary(), acc.summary()
+        cols = ["count", "mean", "std", "min", "max"]
+        pd.testing.assert_frame_equal(approx[cols], exact[cols], rtol=1e-9)
+        self.assertTrue((approx["approx_se"].abs() < 1e-9).all())
+        pd.testing.assert_frame_equal(acc.corr(), self.exact.corr(), check_names=False, rtol=1e-9)
+        expected = self.exact.group_agg()
+        se = expected["std"] / np.sqrt(expected["count"])
+        got = acc.group_agg()
+        pd.testing.assert_series_equal(got["mean"], expected["mean"], rtol=1e-9)
+        np.testing.assert_allclose(got["ci_lo"], expected["mean"] - 1.96 * se, rtol=1e-9)
+        np.testing.assert_array_equal(got["count"], expected["count"])
+
+    def test_sample_brackets_exact(self):
+        acc = self.approx(per_stratum=300)
+        sizes = acc.sample.sample.groupby(acc.strata, observed=True).size()
+        self.assertLessEqual(sizes.max(), 300)
+        self.assertEqual(int(acc.sample.sizes.sum()), len(self.df))
+        exact, approx = self.exact.summary(), acc.summary()
+        np.testing.assert_array_equal(approx["count"], exact["count"])
+        err = (approx["mean"] - exact["mean"]).abs()
+        self.assertTrue((err <= 4 * approx["approx_se"]).all(), err / approx["approx_se"])
+        for p in ("25%", "50%", "75%"):  # sketches see every row
+            np.testing.assert_allclose(approx[p], exact[p], rtol=0.02)
+        grp, expected = acc.group_agg(), self.exact.group_agg()
+        err = (grp["mean"] - expected["mean"]).abs()
+        self.assertTrue((err <= 4 * grp["approx_se"]).all())
+        self.assertTrue((grp["ci_hi"] - grp["mean"] >= 1.96 * grp["approx_se"]).all())
+        ci = acc.corr_ci().merge(
+            self.exact.corr().stack().rename("exact").rename_axis(["var1", "var2"]).reset_index()
+        )
+        off = ci[ci["var1"] != ci["var2"]]
+        # within ~4 standard errors, as above (the 95% interval spans ~4)
+        self.assertTrue(((off["r"] - off["exact"]).abs() <= off["ci_hi"] - off["ci_lo"]).all())
+
+
+class TestResampling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        n = 4_000
+        self.df = pd.DataFrame(
+            {
+                "heavy_user": rng.integers(0, 2, n).astype("int8"),
+                "sleep_ok": rng.integers(0, 2, n).astype("int8"),
+                "acad_impact": rng.integers(0, 2, n).astype(float),
+            }
+        )
+        self.df.loc[:9, "acad_impact"] = np.nan
+
+    def test_seeded_independent_of_workers(self):
+        serial = resample_group_means(self.df, replicates=1_200, max_workers=1)
+        pooled = resample_group_means(self.df, replicates=1_200, max_workers=2)
+        for a, b in zip(serial, pooled):
+            pd.testing.assert_frame_equal(a, b)
+
+    def test_count_table_matches_row_resampling(self):
+        rng = np.random.default_rng(0)
+        table, rows = Resampler(self.df), Resampler(self.df, max_levels=0)
+        self.assertIsNotNone(table.table)
+        self.assertIsNone(rows.table)
+        p, n = table.means, table.n
+        for res in (table, rows):
+            boot = res.bootstrap(rng, 2_000)
+            np.testing.assert_allclose(boot.std(axis=0), np.sqrt(p * (1 - p) / n), rtol=0.1)
+            perm = res.permute(rng, 2_000)
+            np.testing.assert_allclose(perm.mean(axis=0), res.y.mean(), atol=0.01)
+        dealt = table._deal(rng, 50)
+        np.testing.assert_array_equal(dealt.sum(axis=2), np.tile(n, (50, 1)))
+        np.testing.assert_array_equal(dealt.sum(axis=1), np.tile(table.table.sum(axis=0), (50, 1)))
+
+    def test_permutation_p_values(self):
+        cells, tests = resample_group_means(self.df, replicates=999, max_workers=1)
+        self.assertEqual(cells["count"].sum(), len(self.df) - 10)
+        self.assertTrue((cells["ci_lo"] < cells["mean"]).all())
+        self.assertTrue((cells["mean"] < cells["ci_hi"]).all())
+        self.assertEqual(
+            tests["test"].tolist(),
+            ["between_cells", "heavy_user", "sleep_ok", "heavy_user_x_sleep_ok"],
+        )
+        self.assertTrue((tests["p_value"] > 0.01).all())  # no effect in the data
+
+        df = self.df.assign(acad_impact=self.df["heavy_user"].astype(float))
+        _, tests = resample_group_means(df, replicates=999, max_workers=1)
+        p = tests.set_index("test")["p_value"]
+        self.assertEqual(p["heavy_user"], 1 / 1_000)
+        self.assertGreater(p["sleep_ok"], 0.01)
+
+    def test_small_and_constant_cells(self):
+        df = self.df[~((self.df["heavy_user"] == 1) & (self.df["sleep_ok"] == 1))]
+        one = pd.DataFrame({"heavy_user": [1], "sleep_ok": [1], "acad_impact": [1.0]})
+        df = pd.concat([df, one], ignore_index=True)
+        df.loc[(df["heavy_user"] == 1) & (df["sleep_ok"] == 0), "acad_impact"] = 1.0
+        cells, tests = resample_group_means(df, replicates=499, max_workers=1)
+        cells = cells.set_index(["heavy_user", "sleep_ok"])
+        self.assertEqual(
+            cells["ci_method"].tolist(), ["percentile", "percentile", "wilson", "none"]
+        )
+        self.assertTrue(cells.loc[(1, 1), ["boot_se", "ci_lo", "ci_hi"]].isna().all())
+        n = cells.loc[(1, 0), "count"]  # all ones: Wilson [n / (n + z^2), 1]
+        self.assertAlmostEqual(cells.loc[(1, 0), "ci_lo"], n / (n + 1.959964**2), places=5)
+        self.assertAlmostEqual(cells.loc[(1, 0), "ci_hi"], 1.0)
+        # every effect uses the one-row cell: no bootstrap CI, but still a p-value
+        self.assertEqual(tests["small_cells"].tolist(), [1, 1, 1, 1])
+        self.assertTrue(tests[["boot_se", "ci_lo", "ci_hi"]].isna().all().all())
+        self.assertTrue(tests["p_value"].notna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from inst414_project.features import MODEL_FEATURES, PLATFORM_GROUPS, model_matrix
+from inst414_project.modeling import train as train_module
+from inst414_project.modeling.train import search, summarize, train
+
+
+def clean_sample(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(1, 9, n).round(1)
+    return pd.DataFrame(
+        {
+            "hours_social_media": hours,
+            "sleep_hours": rng.uniform(4, 9, n).round(1),
+            "addiction_score": rng.integers(1, 10, n),
+            "heavy_user": (hours > 6).astype("int64"),
+            "sleep_ok": rng.integers(0, 2, n),
+            "platform_group": pd.Categorical(rng.choice(["Short-video", "Other"], n)),
+            "acad_impact": (hours + rng.normal(0, 1, n) > 5).astype("float64"),
+        }
+    )
+
+
+class TestTrain(unittest.TestCase):
+    def test_one_hot_uses_every_group(self):
+        x = model_matrix(clean_sample(10))
+        self.assertEqual(x.shape, (10, len(MODEL_FEATURES)))
+        one_hot = [MODEL_FEATURES.index(f"platform_group_{g}") for g in PLATFORM_GROUPS]
+        self.assertTrue((x[:, one_hot].sum(axis=1) == 1).all())
+        inter = x[:, MODEL_FEATURES.index("heavy_user_x_sleep_ok")]
+        np.testing.assert_array_equal(inter, x[:, 3] * x[:, 4])
+
+    def test_pool_matches_serial(self):
+        df = clean_sample()
+        x, y = model_matrix(df), (df["acad_impact"] >= 0.5).to_numpy("int8")
+        cands = [("logistic", {"C": 1.0}), ("gbm", {"max_iter": 20})]
+        serial = search(x, y, cands, n_folds=3, max_workers=1)
+        pooled = search(x, y, cands, n_folds=3, max_workers=2)
+        key = ["model", "params", "fold"]
+        pd.testing.assert_frame_equal(
+            serial.sort_values(key, ignore_index=True).drop(columns=["fit_s", "score_s"]),
+            pooled.sort_values(key, ignore_index=True).drop(columns=["fit_s", "score_s"]),
+        )
+        self.assertEqual(len(summarize(serial, 3)), 2)
+
+    def test_failed_serial_fit_releases_arrays(self):
+        df = clean_sample()
+        x, y = model_matrix(df), (df["acad_impact"] >= 0.5).to_numpy("int8")
+        with self.assertRaises(ValueError):
+            search(x, y, [("logistic", {"C": -1.0})], n_folds=2, max_workers=1)
+        self.assertEqual(train_module._ARRAYS, {})
+
+    def test_bundle(self):
+        bundle, folds = train(clean_sample(), ["logistic"], n_folds=3, max_workers=1)
+        self.assertEqual(len(folds), 4 * 3)
+        self.assertEqual(bundle["features"], MODEL_FEATURES)
+        proba = bundle["model"].predict_proba(model_matrix(clean_sample(5, seed=1)))
+        self.assertEqual(proba.shape, (5, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()